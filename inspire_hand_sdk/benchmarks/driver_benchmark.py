@@ -0,0 +1,294 @@
+"""
+Throughput benchmark of the Python driver against the local hand simulator.
+
+Every configuration drives ModbusDataHandler.read() (Modbus reads, decode and
+DDS publish), the ctrl write callback and the bare DDS Write in a loop and
+reports cycles/s, cycle latency percentiles, per-transaction round-trip times
+and allocations per cycle. The simulator runs in a child process so that it
+neither competes for the GIL nor shows up in the allocation figures. Results
+are written as JSON; pass an earlier file with --compare to print the change
+of every configuration.
+
+    python benchmarks/driver_benchmark.py --duration 5 --out bench.json
+    python benchmarks/driver_benchmark.py --compare bench_1.0.0.json --out bench.json
+
+Configurations: transport (tcp, rtu) x states (full, reduced) x touch (on, off)
+x hands (single, double). The driver reads touch over RTU only from
+TOUCH_MIN_BAUDRATE (921600) up, so below that rate those combinations are
+reported as skipped; run with --baudrate 921600 to measure them.
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import multiprocessing
+import platform
+import socket
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pymodbus
+
+from inspire_sdkpy import inspire_sdk, inspire_sdk_double, inspire_hand_defaut
+from inspire_sdkpy.serial_baud import TOUCH_MIN_BAUDRATE
+from inspire_sdkpy.simulator import HandSimulator, LinkProfile
+
+FULL_STATES = [
+    ('pos_act', 1534, 6, 'short'),
+    ('angle_act', 1546, 6, 'short'),
+    ('force_act', 1582, 6, 'short'),
+    ('current', 1594, 6, 'short'),
+    ('err', 1606, 3, 'byte'),
+    ('status', 1612, 3, 'byte'),
+    ('temperature', 1618, 3, 'byte'),
+]
+REDUCED_STATES = [
+    ('angle_act', 1546, 6, 'short'),
+    ('force_act', 1582, 6, 'short'),
+    ('status', 1612, 3, 'byte'),
+]
+
+_dds_ready = False
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def serve(conn, args, tcp_port):
+    """Child process: run the simulator until the parent sends anything."""
+    sim = HandSimulator((1, 2), LinkProfile(args.latency, args.jitter, args.service_time, seed=0), seed=0)
+    try:
+        if tcp_port is not None:
+            sim.start_tcp('127.0.0.1', tcp_port)
+        conn.send(sim.start_rtu(args.baudrate) if 'rtu' in args.transport else None)
+        conn.recv()
+    finally:
+        sim.stop()
+
+
+def percentiles(samples):
+    if not samples:
+        return None
+    p50, p95, p99 = np.percentile(np.asarray(samples) * 1e3, [50, 95, 99])
+    return {'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99), 'n': len(samples)}
+
+
+def instrument(client, rtts):
+    """Time every read and write transaction of a pymodbus client."""
+    def timed(call):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return call(*args, **kwargs)
+            finally:
+                rtts.append(time.perf_counter() - start)
+        return wrapper
+    client.read_holding_registers = timed(client.read_holding_registers)
+    client.write_registers = timed(client.write_registers)
+    if hasattr(client, 'read_holding_registers_into'):
+        client.read_holding_registers_into = timed(client.read_holding_registers_into)
+
+
+def make_handler(config, tcp_port, rtu_port, baudrate, client='pymodbus'):
+    global _dds_ready
+    kwargs = {
+        'data': inspire_hand_defaut.data_sheet if config['touch'] else [],
+        'states_structure': FULL_STATES if config['states'] == 'full' else REDUCED_STATES,
+        'initDDS': not _dds_ready,
+        'max_retries': 1,
+        'transport': client,
+    }
+    if config['transport'] == 'tcp':
+        kwargs.update(ip='127.0.0.1', port=tcp_port)
+    else:
+        kwargs.update(use_serial=True, serial_port=rtu_port, baudrate=baudrate)
+    if config['hands'] == 'double':
+        handler = inspire_sdk_double.ModbusDataHandlerDouble(device_id=[1, 2], **kwargs)
+    else:
+        handler = inspire_sdk.ModbusDataHandler(device_id=1, LR='r', **kwargs)
+    _dds_ready = True
+    return handler
+
+
+def hands(handler):
+    """The single-hand handlers behind a handler (ModbusDataHandlerDouble holds two)."""
+    return getattr(handler, 'hands', [handler])
+
+
+def close_handler(handler):
+    if hasattr(handler, 'hands'):
+        handler.close()
+        return
+    handler.link.close()
+    handler.client.close()
+
+
+def publishers(handler):
+    pairs = []
+    for hand in hands(handler):
+        touch_pub = getattr(hand, 'pub', None)
+        if touch_pub is not None and hand.messages.touch is not None:
+            pairs.append((touch_pub, hand.messages.touch))
+        pairs.append((hand.state_pub, hand.messages.state))
+    return pairs
+
+
+def run_config(config, args, tcp_port, rtu_port):
+    handler = make_handler(config, tcp_port, rtu_port, args.baudrate, args.client)
+    try:
+        for _ in range(args.warmup):
+            handler.read()
+
+        rtts = []
+        for client in {id(hand.client): hand.client for hand in hands(handler)}.values():
+            instrument(client, rtts)
+
+        cycles = []
+        end = time.perf_counter() + args.duration
+        start = time.perf_counter()
+        while time.perf_counter() < end:
+            t = time.perf_counter()
+            handler.read()
+            cycles.append(time.perf_counter() - t)
+        elapsed = time.perf_counter() - start
+        read_rtts = list(rtts)
+
+        # allocations: peak traced bytes and net gc-tracked objects per cycle
+        alloc_bytes = []
+        gc.collect()
+        gc.disable()
+        tracemalloc.start()
+        try:
+            objects_before = gc.get_count()[0]
+            for _ in range(args.alloc_cycles):
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                handler.read()
+                alloc_bytes.append(tracemalloc.get_traced_memory()[1] - before)
+            objects = (gc.get_count()[0] - objects_before) / args.alloc_cycles
+        finally:
+            tracemalloc.stop()
+            gc.enable()
+
+        # ctrl callback, from message receipt to the registers being written
+        msg = inspire_hand_defaut.get_inspire_hand_ctrl()
+        msg.mode = 0b0001
+        writes = []
+        rtts.clear()
+        for i in range(args.writes):
+            msg.angle_set = [1000 - (i % 2) * 500] * 6
+            t = time.perf_counter()
+            hands(handler)[0].write_registers_callback(msg)
+            writes.append(time.perf_counter() - t)
+        write_rtts = list(rtts)
+
+        publish = []
+        for pub, message in publishers(handler):
+            for _ in range(args.writes):
+                t = time.perf_counter()
+                pub.Write(message)
+                publish.append(time.perf_counter() - t)
+
+        return {
+            'config': config,
+            'cycles_per_s': len(cycles) / elapsed,
+            'cycle': percentiles(cycles),
+            'read_rtt': percentiles(read_rtts),
+            'transactions_per_cycle': len(read_rtts) / max(len(cycles), 1),
+            'write_callback': percentiles(writes),
+            'write_rtt': percentiles(write_rtts),
+            'write_transactions_per_command': len(write_rtts) / max(args.writes, 1),
+            'dds_write': percentiles(publish),
+            'alloc_bytes_per_cycle': float(np.median(alloc_bytes)) if alloc_bytes else None,
+            'gc_objects_per_cycle': objects,
+        }
+    finally:
+        close_handler(handler)
+
+
+def configurations(args):
+    for transport, states, touch, hands in itertools.product(args.transport, ('full', 'reduced'), (True, False), ('single', 'double')):
+        yield {'transport': transport, 'states': states, 'touch': touch, 'hands': hands}
+
+
+def key(config):
+    return f"{config['transport']}/{config['states']}/touch-{'on' if config['touch'] else 'off'}/{config['hands']}"
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {key(r['config']): r for r in json.load(f)['results'] if 'cycles_per_s' in r}
+    print(f"\nChange against {baseline_path}:")
+    for result in results:
+        old = baseline.get(key(result['config']))
+        if old is None or 'cycles_per_s' not in result:
+            continue
+        rate = result['cycles_per_s'] / old['cycles_per_s'] - 1
+        p99 = result['cycle']['p99_ms'] / old['cycle']['p99_ms'] - 1
+        print(f"  {key(result['config']):34s} cycles/s {rate:+7.1%}   p99 {p99:+7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspire hand driver throughput benchmark")
+    parser.add_argument('--duration', type=float, default=3.0, help="measured seconds per configuration")
+    parser.add_argument('--warmup', type=int, default=20, help="cycles before measuring, also settles state_read='auto'")
+    parser.add_argument('--alloc-cycles', type=int, default=50)
+    parser.add_argument('--writes', type=int, default=200, help="ctrl callbacks and DDS writes timed per configuration")
+    parser.add_argument('--transport', nargs='+', choices=('tcp', 'rtu'), default=['tcp', 'rtu'])
+    parser.add_argument('--baudrate', type=int, default=115200, help="emulated RTU line rate")
+    parser.add_argument('--client', choices=('pymodbus', 'lean'), default='pymodbus', help="ModbusDataHandler transport")
+    parser.add_argument('--latency', type=float, default=0.0, help="simulated delay per transaction in seconds")
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--service-time', type=float, default=0.0, help="simulated per-request processing time in seconds")
+    parser.add_argument('--out', default='driver_benchmark.json')
+    parser.add_argument('--compare', default=None, help="earlier result file to compare against")
+    args = parser.parse_args()
+
+    tcp_port = free_port() if 'tcp' in args.transport else None
+    conn, child_conn = multiprocessing.Pipe()
+    sim = multiprocessing.Process(target=serve, args=(child_conn, args, tcp_port), daemon=True)
+    sim.start()
+    rtu_port = conn.recv()
+
+    results = []
+    try:
+        for config in configurations(args):
+            if config['transport'] == 'rtu' and config['touch'] and args.baudrate < TOUCH_MIN_BAUDRATE:
+                results.append({'config': config, 'skipped': f'touch is not read over RTU below {TOUCH_MIN_BAUDRATE} baud'})
+                continue
+            result = run_config(config, args, tcp_port, rtu_port)
+            results.append(result)
+            cycle = result['cycle']
+            print(f"{key(config):34s} {result['cycles_per_s']:8.1f} cycles/s  "
+                  f"p50 {cycle['p50_ms']:6.2f} ms  p95 {cycle['p95_ms']:6.2f} ms  p99 {cycle['p99_ms']:6.2f} ms  "
+                  f"{result['alloc_bytes_per_cycle']:.0f} B/cycle")
+    finally:
+        conn.send('stop')
+        sim.join(5.0)
+
+    report = {
+        'meta': {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'pymodbus': pymodbus.__version__,
+            'args': vars(args),
+        },
+        'results': results,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.out}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,24 +3,24 @@ import time
 
 if __name__ == "__main__":
     
-    ## publish All Data
-    # states_structure = [
-    #         ('pos_act', 1534, 6, 'short'),
-    #         ('angle_act', 1546, 6, 'short'),
-    #         ('force_act', 1582, 6, 'short'),
-    #         ('current', 1594, 6, 'short'),
-    #         ('err', 1606, 3, 'byte'),
-    #         ('status', 1612, 3, 'byte'),
-    #         ('temperature', 1618, 3, 'byte')
-    #     ]
-    
-    ## Only publish this data to increase publishing frequency
+    ## publish All Data (the state block is read in one transaction, so this costs about as much as a reduced list)
     states_structure = [
+            ('pos_act', 1534, 6, 'short'),
             ('angle_act', 1546, 6, 'short'),
-            # ('force_act', 1582, 6, 'short'),
+            ('force_act', 1582, 6, 'short'),
+            ('current', 1594, 6, 'short'),
+            ('err', 1606, 3, 'byte'),
             ('status', 1612, 3, 'byte'),
+            ('temperature', 1618, 3, 'byte')
         ]
     
+    ## Only publish this data to increase publishing frequency
+    # states_structure = [
+    #         ('angle_act', 1546, 6, 'short'),
+    #         # ('force_act', 1582, 6, 'short'),
+    #         ('status', 1612, 3, 'byte'),
+    #     ]
+    
     handler = inspire_sdk_double.ModbusDataHandlerDouble(device_id=[2,1], use_serial=True, serial_port='/dev/ttyUSB0',states_structure=states_structure) # l r
     time.sleep(0.5)
 
@@ -39,7 +39,10 @@ if __name__ == "__main__":
                 elapsed_time = time.perf_counter() - start_time  # 计算总耗时
                 frequency = call_count / elapsed_time  # 计算频率 (Hz)
                 print(f"当前频率: {frequency:.2f} Hz, 调用次数: {call_count}, 耗时: {elapsed_time:.6f} 秒")
+                for LR, hand in handler.stats().items():  # 每只手的周期与链路状态
+                    print(f"  {LR}: {hand['rate']:.2f} Hz, p99 {hand['cycle_p99_us'] / 1000:.2f} ms, {hand['link']}")
     except KeyboardInterrupt:
         elapsed_time = time.perf_counter() - start_time  # 计算总耗时
         frequency = call_count / elapsed_time if elapsed_time > 0 else 0  # 计算最终频率
         print(f"程序结束. 总调用次数: {call_count}, 总耗时: {elapsed_time:.6f} 秒, 最终频率: {frequency:.2f} Hz")
+        handler.close()
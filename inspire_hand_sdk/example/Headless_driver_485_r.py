@@ -3,25 +3,28 @@ import time
 
 if __name__ == "__main__":
     
-    ## publish All Data
-    # states_structure = [
-    #         ('pos_act', 1534, 6, 'short'),
-    #         ('angle_act', 1546, 6, 'short'),
-    #         ('force_act', 1582, 6, 'short'),
-    #         ('current', 1594, 6, 'short'),
-    #         ('err', 1606, 3, 'byte'),
-    #         ('status', 1612, 3, 'byte'),
-    #         ('temperature', 1618, 3, 'byte')
-    #     ]
-    
-    ## Only publish this data to increase publishing frequency
+    ## publish All Data (the state block is read in one transaction, so this costs about as much as a reduced list)
     states_structure = [
+            ('pos_act', 1534, 6, 'short'),
             ('angle_act', 1546, 6, 'short'),
             ('force_act', 1582, 6, 'short'),
+            ('current', 1594, 6, 'short'),
+            ('err', 1606, 3, 'byte'),
             ('status', 1612, 3, 'byte'),
+            ('temperature', 1618, 3, 'byte')
         ]
     
+    ## Only publish this data to increase publishing frequency
+    # states_structure = [
+    #         ('angle_act', 1546, 6, 'short'),
+    #         ('force_act', 1582, 6, 'short'),
+    #         ('status', 1612, 3, 'byte'),
+    #     ]
+    
     handler = inspire_sdk.ModbusDataHandler(LR='r', device_id=1, use_serial=True, serial_port='/dev/ttyUSB1',states_structure=states_structure)
+    ## Switch the hand and the port to 921600 baud (verified, saved to the hand) and also publish touch over RS-485;
+    ## transport='lean' frames the requests directly on pyserial, for a higher loop rate
+    # handler = inspire_sdk.ModbusDataHandler(LR='r', device_id=1, use_serial=True, serial_port='/dev/ttyUSB1',states_structure=states_structure, high_baudrate=921600, transport='lean')
 
     call_count = 0  # 记录调用次数
     start_time = time.perf_counter()  # 记录开始时间
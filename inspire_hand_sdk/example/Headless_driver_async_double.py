@@ -0,0 +1,20 @@
+import asyncio
+import sys
+from inspire_sdkpy import inspire_sdk_async
+
+async def main(network=None):
+    # Both hands run on one event loop; every read keeps several transactions in flight per hand
+    handler_r = inspire_sdk_async.AsyncModbusDataHandler(network=network, ip='192.168.123.211', LR='r', device_id=1)
+    handler_l = inspire_sdk_async.AsyncModbusDataHandler(ip='192.168.123.210', LR='l', device_id=1, initDDS=False)
+    await asyncio.gather(handler_r.connect(), handler_l.connect())
+    try:
+        await asyncio.gather(handler_r.run(report_every=100), handler_l.run(report_every=100))
+    finally:
+        handler_r.close()
+        handler_l.close()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else None))
+    except KeyboardInterrupt:
+        print("Program ended.")
@@ -0,0 +1,30 @@
+from inspire_sdkpy import inspire_sdk, inspire_hand_defaut
+from inspire_sdkpy.scheduler import MultiRateScheduler
+import time
+
+if __name__ == "__main__":
+    # Every field gets its own rate instead of commenting fields out of states_structure.
+    # Patterns are matched against the state attribute names and the data_sheet variable names.
+    rates = {
+        'angle_act': 500,
+        'force_act': 200,
+        'status': 50,
+        'finger*_tip_touch': 100,
+        'palm_touch': 20,
+        'temperature': 1,
+    }
+    handler = inspire_sdk.ModbusDataHandler(ip='192.168.123.210', LR='l', device_id=1)
+    scheduler = MultiRateScheduler(handler, rates, default_rate=10)
+    time.sleep(0.5)
+
+    last_report = time.perf_counter()
+    try:
+        while True:
+            delay = scheduler.step()
+            if delay > 0:
+                time.sleep(min(delay, 0.01))
+            if time.perf_counter() - last_report > 2.0:
+                last_report = time.perf_counter()
+                print(", ".join(f"{var}: {rate:.1f} Hz" for var, rate in scheduler.stats().items()))
+    except KeyboardInterrupt:
+        print("Program ended.")
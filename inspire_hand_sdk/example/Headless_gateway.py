@@ -0,0 +1,33 @@
+from inspire_sdkpy.gateway import HandGateway
+import time
+
+if __name__ == "__main__":
+    # All hands of all robots in one process: one DDS participant, one I/O thread per link.
+    # 'name' is the topic suffix (rt/inspire_hand/state/<name>, ctrl/<name>, ...).
+    hands = [
+        {'name': 'robot1/l', 'ip': '192.168.123.210'},
+        {'name': 'robot1/r', 'ip': '192.168.123.211'},
+        # two hands on one RS-485 bus take turns on it
+        {'name': 'robot2/l', 'use_serial': True, 'serial_port': '/dev/ttyUSB0', 'device_id': 1},
+        {'name': 'robot2/r', 'use_serial': True, 'serial_port': '/dev/ttyUSB0', 'device_id': 2},
+    ]
+    states_structure = [
+            ('angle_act', 1546, 6, 'short'),
+            ('force_act', 1582, 6, 'short'),
+            ('status', 1612, 3, 'byte'),
+        ]
+    # leave 20% of the serial bus free for ctrl writes
+    gateway = HandGateway(hands, states_structure=states_structure, budget={'/dev/ttyUSB0': 0.8})
+    gateway.start()
+
+    try:
+        while True:
+            time.sleep(2.0)
+            stats = gateway.stats()
+            for name, hand in stats['hands'].items():
+                print(f"{name}: {hand['rate']:.1f} Hz, p99 {hand['cycle_p99_us'] / 1000:.2f} ms, late {hand['late']}, errors {hand['errors']}, {hand['state']}")
+            for name, link in stats['links'].items():
+                print(f"  link {name}: {link['utilisation']:.0%} of budget {link['budget']:.0%}")
+    except KeyboardInterrupt:
+        gateway.stop()
+        print("Program ended.")
@@ -7,7 +7,8 @@ if __name__ == "__main__":
     app = qt_tabs.QApplication(sys.argv)
     # handler=inspire_sdk.ModbusDataHandler(ip=inspire_hand_defaut.defaut_ip,LR='r',device_id=1)
     handler=inspire_sdk.ModbusDataHandler(ip='192.168.123.210',LR='r',device_id=1)
-    window = qt_tabs.MainWindow(data_handler=handler,dt=20,name="Hand Vision Driver")
+    # Modbus I/O and publishing run at 100 Hz on their own thread, the window repaints every 20 ms
+    window = qt_tabs.MainWindow(data_handler=handler,dt=20,name="Hand Vision Driver",acquisition_rate=100)
     window.reflash()
     window.show()
     sys.exit(app.exec_())
\ No newline at end of file
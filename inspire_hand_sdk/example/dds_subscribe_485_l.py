@@ -1,6 +1,7 @@
 from unitree_sdk2py.core.channel import ChannelSubscriber, ChannelFactoryInitialize
 
 from inspire_sdkpy import inspire_hand_defaut,inspire_dds
+from inspire_sdkpy.touch_frame import TouchLayout
 
 import numpy as np
 import colorcet  
@@ -11,20 +12,30 @@ import threading
 
 class DDSHandler():
    
-    def __init__(self,network=None,sub_touch=True,LR='r'):
+    def __init__(self,network=None,sub_touch=True,LR='r',touch_frame=False):
         super().__init__()  # 调用父类的 __init__ 方法
         if network ==None:
             ChannelFactoryInitialize(0)
         else:
             ChannelFactoryInitialize(0, network)
         self.data=inspire_hand_defaut.data_sheet
+        self.touch={}
+        if touch_frame:
+            # flat frame topic (driver touch_format='frame'/'both'): one conversion per message,
+            # self.touch holds views into self.frame that are updated in place
+            self.layout=TouchLayout(self.data)
+            self.frame=self.layout.new_frame()
+            self.touch=self.layout.views(self.frame)
         if sub_touch:
-            self.sub_touch = ChannelSubscriber("rt/inspire_hand/touch/"+LR, inspire_dds.inspire_hand_touch)
-            self.sub_touch.Init(self.update_data_touch, 10)
+            if touch_frame:
+                self.sub_touch = ChannelSubscriber("rt/inspire_hand/touch_frame/"+LR, inspire_dds.inspire_hand_touch_frame)
+                self.sub_touch.Init(self.update_data_touch_frame, 10)
+            else:
+                self.sub_touch = ChannelSubscriber("rt/inspire_hand/touch/"+LR, inspire_dds.inspire_hand_touch)
+                self.sub_touch.Init(self.update_data_touch, 10)
         
         self.sub_states = ChannelSubscriber("rt/inspire_hand/state/"+LR, inspire_dds.inspire_hand_state)
         self.sub_states.Init(self.update_data_state, 10)
-        self.touch={}
         self.states={}
         self.data_touch_lock = threading.Lock()
         self.data_state_lock = threading.Lock()
@@ -42,6 +53,10 @@ class DDSHandler():
             elapsed_time = end_time - start_time  # 计算耗时
             # print(f"Data update time: {elapsed_time:.6f} seconds")  # 打印耗时
             
+    def update_data_touch_frame(self,msg:inspire_dds.inspire_hand_touch_frame):
+        with self.data_touch_lock:
+            self.layout.frame_from(msg.data,self.frame)
+
     def update_data_state(self,states_msg:inspire_dds.inspire_hand_state):
         with self.data_state_lock:
             self.states= {
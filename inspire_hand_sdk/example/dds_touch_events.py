@@ -0,0 +1,25 @@
+from unitree_sdk2py.core.channel import ChannelSubscriber, ChannelFactoryInitialize
+
+from inspire_sdkpy import inspire_dds
+
+import time
+
+# Contact events of the right hand; the driver must run with touch_events set, e.g.
+# ModbusDataHandler(..., touch_events={'palm_touch': 80, '*': 40}, event_spike=200)
+
+
+def on_events(msg: inspire_dds.inspire_hand_touch_events):
+    latency = (time.time() - msg.stamp) * 1000
+    for region, event, peak in zip(msg.region, msg.event, msg.peak):
+        print(f"#{msg.seq} {event:15s} {region:25s} peak {peak:5d}  ({latency:.1f} ms after decode)")
+
+
+if __name__ == "__main__":
+    ChannelFactoryInitialize(0)
+    sub = ChannelSubscriber("rt/inspire_hand/touch_events/r", inspire_dds.inspire_hand_touch_events)
+    sub.Init(on_events, 10)
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        print("Program ended.")
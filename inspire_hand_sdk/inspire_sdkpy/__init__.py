@@ -8,11 +8,34 @@
 from .inspire_hand_defaut import *
 from . import inspire_dds
 from .inspire_sdk import ModbusDataHandler
+from .inspire_sdk_async import AsyncModbusDataHandler
+from .read_planner import ReadPlan, ReadField
+from .scheduler import MultiRateScheduler
+from .acquisition import AcquisitionThread, Snapshot
+from .gateway import HandGateway
+from .touch_frame import TouchLayout
+from .touch_features import TouchFeatures
+from .touch_baseline import TouchBaseline
+from .touch_events import TouchEventDetector
+from .metrics import HandMetrics, LatencyHistogram
 from .qt_tabs import ImageTab,MainWindow,CurveTab
 
 __all__ = [
 	"inspire_dds",
 	"ModbusDataHandler",
+  "AsyncModbusDataHandler",
+  "ReadPlan",
+  "ReadField",
+  "MultiRateScheduler",
+  "AcquisitionThread",
+  "Snapshot",
+  "HandGateway",
+  "TouchLayout",
+  "TouchFeatures",
+  "TouchBaseline",
+  "TouchEventDetector",
+  "HandMetrics",
+  "LatencyHistogram",
   "ImageTab",
   "MainWindow",
   "CurveTab"
@@ -0,0 +1,140 @@
+"""
+Background acquisition for ModbusDataHandler.
+
+An AcquisitionThread runs ``handler.read()`` (which also publishes) on its own
+thread at its own rate. After every cycle it copies the frame into the back
+buffer of a double buffer and swaps it in with a single reference assignment,
+so ``latest()`` never takes a lock and never touches the bus. With two buffers
+the snapshot ``latest()`` returns is rewritten as soon as the cycle after it
+completes its read, so consumers that use the data for longer, like the GUI
+timer, take ``latest_copy()``. ModbusDataHandlerDouble.read() returns one
+result per hand; the snapshot then holds a list of them in the same order.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+
+class Snapshot:
+    """One acquired frame.
+
+    Attributes:
+        seq (int): Sequence number, increases by one per cycle.
+        timestamp (float): time.time() when the read finished.
+        data (dict or list): {'states': {...}, 'touch': {...}} with arrays owned by the snapshot, or a list of them (one per hand).
+    """
+    __slots__ = ('seq', 'timestamp', 'data')
+
+    def __init__(self, data):
+        self.seq = -1
+        self.timestamp = 0.0
+        self.data = data
+
+
+def _allocate_like(result):
+    if isinstance(result, list):
+        return [_allocate_like(hand) for hand in result]
+    return {
+        'states': {key: np.array(value, copy=True) for key, value in result['states'].items()},
+        'touch': {key: np.array(value, copy=True) for key, value in result['touch'].items()},
+    }
+
+
+def _copy_into(dst, src):
+    if isinstance(src, list):
+        for dst_hand, src_hand in zip(dst, src):
+            _copy_into(dst_hand, src_hand)
+        return
+    for key, value in src['states'].items():
+        np.copyto(dst['states'][key], value)
+    for key, value in src['touch'].items():
+        np.copyto(dst['touch'][key], value)
+
+
+class AcquisitionThread(threading.Thread):
+    """Run a handler's read/publish loop on a dedicated thread.
+
+    Args:
+        handler: Object with a read() returning the reused result dict
+            (ModbusDataHandler) or a list of them (ModbusDataHandlerDouble).
+        rate (float, optional): Target cycles per second, None runs flat out. Defaults to 100.
+        on_error (callable, optional): Called with the exception when a cycle
+            fails; the loop keeps running. Defaults to printing it.
+    """
+
+    def __init__(self, handler, rate=100, on_error=None):
+        super().__init__(daemon=True, name="inspire-acquisition")
+        self.handler = handler
+        self.period = 1.0 / rate if rate else 0.0
+        self.on_error = on_error or (lambda e: print(f"Acquisition error: {e}"))
+        self._stop_event = threading.Event()
+        self._buffers = None
+        self._front = None
+        self.cycle_time = 0.0
+
+    def latest(self):
+        """Newest Snapshot, or None before the first cycle completed.
+
+        The snapshot is not a copy: the next cycle writes the other buffer,
+        and once it has been published the cycle after it rewrites this one in
+        place, so a reader slower than one cycle can see a mix of two frames.
+        Use it to compare seq with a previous snapshot, or to read a few values
+        at once; use latest_copy() to keep or process the frame.
+        """
+        return self._front
+
+    def latest_copy(self):
+        """Consistent private copy of the newest frame as a Snapshot, or None.
+
+        Retries if the writer reused the buffer while it was being copied.
+        """
+        while True:
+            snapshot = self._front
+            if snapshot is None:
+                return None
+            seq = snapshot.seq
+            timestamp = snapshot.timestamp
+            data = _allocate_like(snapshot.data)
+            if seq >= 0 and snapshot.seq == seq:
+                copy = Snapshot(data)
+                copy.seq = seq
+                copy.timestamp = timestamp
+                return copy
+
+    def stop(self, timeout=1.0):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def run(self):
+        seq = 0
+        next_time = time.perf_counter()
+        while not self._stop_event.is_set():
+            start = time.perf_counter()
+            try:
+                result = self.handler.read()
+            except Exception as e:
+                self.on_error(e)
+                self._stop_event.wait(self.period or 0.01)
+                continue
+
+            if self._buffers is None:
+                self._buffers = [Snapshot(_allocate_like(result)), Snapshot(_allocate_like(result))]
+            back = self._buffers[seq & 1]
+            back.seq = -1  # being written, see latest_copy()
+            _copy_into(back.data, result)
+            back.timestamp = time.time()
+            back.seq = seq
+            self._front = back  # publish: a single reference swap
+            seq += 1
+            self.cycle_time = time.perf_counter() - start
+
+            if self.period:
+                next_time += self.period
+                delay = next_time - time.perf_counter()
+                if delay > 0:
+                    self._stop_event.wait(delay)
+                else:
+                    next_time = time.perf_counter()
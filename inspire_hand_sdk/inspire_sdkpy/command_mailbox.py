@@ -0,0 +1,132 @@
+"""
+Latest-wins mailbox for ctrl commands.
+
+Writing every ctrl message in arrival order makes the hand fall further and
+further behind whenever the publisher is faster than the bus. The mailbox keeps
+one slot per mode (angle, position, force, speed): a new message overwrites
+the slots of the modes it sets, and the acquisition loop takes whatever is in
+the mailbox at its own control rate. Entries older than the deadline are
+discarded instead of being written late.
+
+Position and angle are two ways of giving the same target, so a new value for
+one clears the other; the hand then always moves to the newest target.
+"""
+
+import threading
+import time
+
+from .inspire_hand_defaut import get_inspire_hand_ctrl
+
+# (mode bit, message attribute)
+MODES = (
+    (0b0001, 'angle_set'),
+    (0b0010, 'pos_set'),
+    (0b0100, 'force_set'),
+    (0b1000, 'speed_set'),
+)
+# setting one of these clears the other
+EXCLUSIVE = {0b0001: 0b0010, 0b0010: 0b0001}
+
+
+class CommandMailbox:
+    """Newest command per mode, taken at a fixed control rate.
+
+    Args:
+        control_rate (float, optional): Takes per second, None takes on every
+            call. Defaults to None.
+        deadline (float, optional): Seconds after receipt when a command is
+            stale and dropped, None keeps commands until taken. Defaults to 0.1.
+        clock (callable, optional): Time source. Defaults to time.perf_counter.
+
+    Attributes:
+        posted (int): Messages received.
+        superseded (int): Mode values overwritten by a newer message before being taken.
+        stale (int): Mode values dropped because they passed the deadline.
+        delivered (int): Takes that returned a command.
+    """
+
+    def __init__(self, control_rate=None, deadline=0.1, clock=None):
+        self.period = 1.0 / control_rate if control_rate else 0.0
+        self.deadline = deadline
+        self.clock = clock or time.perf_counter
+        self._lock = threading.Lock()
+        self._values = {bit: None for bit, name in MODES}
+        self._received = {bit: 0.0 for bit, name in MODES}
+        self._next_due = 0.0
+        # reused for every take(), only valid until the next one
+        self._msg = get_inspire_hand_ctrl()
+        self.posted = 0
+        self.superseded = 0
+        self.stale = 0
+        self.delivered = 0
+
+    def post(self, msg, received=None):
+        """Store the modes set in a ctrl message (called on the DDS thread)."""
+        if received is None:
+            received = self.clock()
+        with self._lock:
+            self.posted += 1
+            for bit, name in MODES:
+                if not msg.mode & bit:
+                    continue
+                if self._values[bit] is not None:
+                    self.superseded += 1
+                other = EXCLUSIVE.get(bit)
+                if other is not None and self._values[other] is not None:
+                    self._values[other] = None
+                    self.superseded += 1
+                self._values[bit] = [int(v) for v in getattr(msg, name)]
+                self._received[bit] = received
+
+    def due(self, now=None):
+        """True when the control rate allows the next take()."""
+        if not self.period:
+            return True
+        if now is None:
+            now = self.clock()
+        return now >= self._next_due
+
+    def take(self, now=None):
+        """Empty the mailbox.
+
+        Returns:
+            tuple: (msg, received) with a reused inspire_hand_ctrl holding the
+            fresh modes and the receipt time of the oldest of them, or None if
+            nothing fresh was waiting.
+        """
+        if now is None:
+            now = self.clock()
+        if self.period:
+            next_due = self._next_due + self.period
+            # fell behind: do not burst to catch up
+            self._next_due = next_due if next_due >= now else now + self.period
+        msg = self._msg
+        mode = 0
+        oldest = None
+        with self._lock:
+            for bit, name in MODES:
+                values = self._values[bit]
+                if values is None:
+                    continue
+                self._values[bit] = None
+                received = self._received[bit]
+                if self.deadline is not None and now - received > self.deadline:
+                    self.stale += 1
+                    continue
+                setattr(msg, name, values)
+                mode |= bit
+                if oldest is None or received < oldest:
+                    oldest = received
+        if not mode:
+            return None
+        msg.mode = mode
+        self.delivered += 1
+        return msg, oldest
+
+    def stats(self):
+        return {
+            'posted': self.posted,
+            'superseded': self.superseded,
+            'stale': self.stale,
+            'delivered': self.delivered,
+        }
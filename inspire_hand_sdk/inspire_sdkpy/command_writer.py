@@ -0,0 +1,149 @@
+"""
+Coalesced writes of the command block 1474-1533.
+
+The four set-point groups of a ctrl message lie back to back in one block:
+
+    1474 pos_set | 1486 angle_set | 1498 force_set | 1510 (reserved) | 1522 speed_set
+
+Instead of one write_registers per requested mode, CommandWriter writes each
+run of requested groups that are next to each other as a single transaction:
+angle and force together are one write of 1486-1509, position, angle and
+force one of 1474-1509. Only the groups a message sets are ever written, so
+a write never re-sends a value another writer may have changed since; the
+reserved group is never part of a write, and force_set with speed_set stays
+two transactions.
+
+The writer also keeps the last known value of the block, read once from the
+hand and updated with every write, for requests that have to send a group
+unchanged (the FC23 probe, see ModbusDataHandler.probe_combined).
+"""
+
+import time
+
+import numpy as np
+
+COMMAND_START = 1474
+COMMAND_REGISTERS = 30
+GROUP_REGISTERS = 6
+
+# (message attribute, first address, mode bit); None is the reserved group
+GROUPS = (
+    ('pos_set', 1474, 0b0010),
+    ('angle_set', 1486, 0b0001),
+    ('force_set', 1498, 0b0100),
+    (None, 1510, 0),
+    ('speed_set', 1522, 0b1000),
+)
+
+
+class CommandWriter:
+    """Turns ctrl messages into the fewest writes of the command block.
+
+    Args:
+        metrics (HandMetrics, optional): Receives the time of every write
+            transaction under the 'write' phase. Defaults to None.
+
+    Attributes:
+        cache (np.ndarray): Last known value of the 30 command registers.
+        known (list): Per group, whether cache holds its value.
+        commands (int): Commands written.
+        transactions (int): Write transactions used for them.
+        failures (int): Failed write transactions.
+    """
+
+    def __init__(self, metrics=None):
+        self.metrics = metrics
+        self.cache = np.zeros(COMMAND_REGISTERS, dtype=np.int64)
+        self.known = [False] * len(GROUPS)
+        self.commands = 0
+        self.transactions = 0
+        self.failures = 0
+
+    def load(self, registers):
+        """Fill the cache from a read of COMMAND_REGISTERS registers at COMMAND_START."""
+        self.cache[:] = np.asarray(registers, dtype=np.int64).astype(np.uint16).astype(np.int16)
+        self.known = [True] * len(GROUPS)
+
+    def load_from(self, read_registers):
+        """Fill the cache with read_registers(address, count) -> list or None; returns True on success."""
+        registers = read_registers(COMMAND_START, COMMAND_REGISTERS)
+        if registers is None or len(registers) != COMMAND_REGISTERS:
+            print("Could not read the command block, its last values are unknown")
+            return False
+        self.load(registers)
+        return True
+
+    def cached(self, address):
+        """Last known values of the group at `address` as unsigned ints, None if unknown."""
+        for i, (name, group_address, bit) in enumerate(GROUPS):
+            if group_address == address:
+                if not self.known[i]:
+                    return None
+                offset = (address - COMMAND_START) // 2
+                return [v & 0xFFFF for v in self.cache[offset:offset + GROUP_REGISTERS].tolist()]
+        raise ValueError(f"{address} is not the start of a command group")
+
+    def plan(self, msg):
+        """Writes for one ctrl message.
+
+        Returns:
+            list: [(address, values)], values as unsigned 16-bit ints ready for write_registers.
+        """
+        writes = []
+        values = []
+        start = None
+        for name, address, bit in GROUPS:
+            if not msg.mode & bit:
+                # not requested (or reserved): close the current span
+                if values:
+                    writes.append((start, values))
+                values, start = [], None
+                continue
+            if start is None:
+                start = address
+            values.extend(int(v) & 0xFFFF for v in getattr(msg, name))
+        if values:
+            writes.append((start, values))
+        return writes
+
+    def commit(self, address, values):
+        """Record a successful write in the cache."""
+        offset = (address - COMMAND_START) // 2
+        written = np.asarray(values, dtype=np.int64).astype(np.uint16).astype(np.int16)
+        self.cache[offset:offset + len(values)] = written
+        for i, (name, group_address, bit) in enumerate(GROUPS):
+            if address <= group_address and group_address + 2 * GROUP_REGISTERS <= address + 2 * len(values):
+                self.known[i] = True
+
+    def write(self, msg, write_registers):
+        """Write one ctrl message with write_registers(address, values) -> bool.
+
+        Returns:
+            bool: True if every transaction succeeded.
+        """
+        ok = True
+        for address, values in self.plan(msg):
+            start = time.perf_counter()
+            success = write_registers(address, values)
+            self.record(address, values, success, time.perf_counter() - start)
+            ok = ok and success
+        self.commands += 1
+        return ok
+
+    def record(self, address, values, ok, seconds=None):
+        """Account for one write transaction of a plan, however it was sent."""
+        self.transactions += 1
+        if seconds is not None and self.metrics is not None:
+            self.metrics.record('write', seconds)
+        if ok:
+            self.commit(address, values)
+        else:
+            self.failures += 1
+
+    def stats(self):
+        return {
+            'commands': self.commands,
+            'transactions': self.transactions,
+            'failures': self.failures,
+            'writes_per_command': self.transactions / self.commands if self.commands else 0.0,
+        }
@@ -0,0 +1,261 @@
+"""
+One process for any number of hands.
+
+Running every hand in its own process repeats the imports, the DDS
+participant and the connection setup per hand. HandGateway instead builds one
+ModbusDataHandler per hand in a single process that shares one DDS
+participant, and groups the hands by link: hands on the same RS-485 bus or
+behind the same TCP endpoint share one client, one lock and one supervisor.
+
+Each link is served by one I/O thread, so independent links run in parallel
+while the hands of one link take turns on it. Within a link, the scheduler
+reads the hand whose next read is due first (earliest deadline first, at the
+per-hand ``rate``; hands without a rate are read round robin as fast as the
+link allows). Every link also gets a time budget: the share of wall time it
+may spend reading, enforced as a token bucket. With a budget below 1 the bus
+stays free for part of each second, so ctrl writes from the DDS callbacks do
+not queue behind a flat-out read loop.
+"""
+
+import threading
+import time
+
+from .inspire_hand_defaut import link_key, defaut_ip
+from .inspire_sdk import ModbusDataHandler
+from unitree_sdk2py.core.channel import ChannelFactoryInitialize
+
+# most read time a link may bank while idle, in seconds of its budget
+MAX_CREDIT = 0.05
+
+
+class _Hand:
+    __slots__ = ('name', 'handler', 'period', 'next_due', 'cycles', 'late', 'errors')
+
+    def __init__(self, name, handler, rate):
+        self.name = name
+        self.handler = handler
+        self.period = 1.0 / rate if rate else 0.0
+        self.next_due = 0.0
+        self.cycles = 0
+        self.late = 0
+        self.errors = 0
+
+
+class _LinkWorker(threading.Thread):
+    """I/O thread of one link: reads its hands within the link's time budget."""
+
+    def __init__(self, key, hands, budget, on_error, clock):
+        super().__init__(daemon=True, name=f"inspire-gateway-{key[1]}")
+        self.key = key
+        self.hands = hands
+        self.budget = budget
+        self.on_error = on_error
+        self.clock = clock
+        self.busy = 0.0
+        self._credit = MAX_CREDIT
+        self._stop_event = threading.Event()
+
+    def next_hand(self):
+        """The hand with the earliest deadline; ties go to the one read longest ago."""
+        return min(self.hands, key=lambda hand: hand.next_due)
+
+    def step(self):
+        """Read at most one hand; returns seconds until the next read may start."""
+        now = self.clock()
+        if self._credit <= 0:
+            return -self._credit / self.budget
+        hand = self.next_hand()
+        if hand.next_due > now:
+            return hand.next_due - now
+
+        start = self.clock()
+        try:
+            hand.handler.read()
+        except Exception as e:
+            hand.errors += 1
+            self.on_error(hand.name, e)
+        end = self.clock()
+        spent = end - start
+
+        hand.cycles += 1
+        self.busy += spent
+        if self.budget < 1.0:
+            self._credit -= spent
+        if hand.period:
+            if not hand.next_due:
+                # first read: the schedule starts here
+                hand.next_due = start + hand.period
+            elif start - hand.next_due > hand.period:
+                # more than a whole period late: count it and do not burst to catch up
+                hand.late += 1
+                hand.next_due = end + hand.period
+            else:
+                hand.next_due = max(hand.next_due, start - hand.period) + hand.period
+        else:
+            hand.next_due = end
+        return 0.0
+
+    def stop(self, timeout=1.0):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def run(self):
+        last = self.clock()
+        while not self._stop_event.is_set():
+            now = self.clock()
+            self._credit = min(MAX_CREDIT, self._credit + (now - last) * self.budget)
+            last = now
+            delay = self.step()
+            if delay > 0:
+                self._stop_event.wait(delay)
+
+
+class HandGateway:
+    """Drive many hands, on any mix of TCP endpoints and serial buses, from one process.
+
+    Example:
+        gateway = HandGateway([
+            {'name': 'robot1/l', 'ip': '192.168.123.210'},
+            {'name': 'robot1/r', 'ip': '192.168.123.211'},
+            {'name': 'robot2/l', 'use_serial': True, 'serial_port': '/dev/ttyUSB0', 'device_id': 1},
+            {'name': 'robot2/r', 'use_serial': True, 'serial_port': '/dev/ttyUSB0', 'device_id': 2, 'rate': 100},
+        ], states_structure=states_structure)
+        gateway.start()
+
+    Args:
+        hands (list): One dict per hand with ModbusDataHandler keyword arguments,
+            plus 'name' (topic suffix, used as LR; defaults to LR or the index)
+            and 'rate' (target reads per second, None for as fast as the link
+            allows).
+        network (str, optional): Name of the DDS NIC. Defaults to None.
+        initDDS (bool, optional): Run ChannelFactoryInitialize, once for all hands. Defaults to True.
+        budget (float or dict, optional): Share of wall time each link may spend
+            reading, 0 < budget <= 1, or {link name: budget} where the link name
+            is 'ip:port' or the serial port (any name of the device, e.g. a
+            symlink). Defaults to 1.0.
+        on_error (callable, optional): Called with the hand name and the
+            exception when a read fails; the hand keeps being scheduled.
+            Defaults to printing it.
+        clock (callable, optional): Time source. Defaults to time.perf_counter.
+        **defaults: ModbusDataHandler keyword arguments applied to every hand
+            that does not set them itself.
+    Raises:
+        ValueError: raise when two hands have the same name, or a budget is not in (0, 1] or names no link
+        ConnectionError: raise when a link cannot be connected
+    """
+
+    def __init__(self, hands, network=None, initDDS=True, budget=1.0, on_error=None, clock=None, **defaults):
+        self.clock = clock or time.perf_counter
+        self.on_error = on_error or (lambda name, e: print(f"Gateway read error on {name}: {e}"))
+        if initDDS:
+            if network is None:
+                ChannelFactoryInitialize(0)
+            else:
+                ChannelFactoryInitialize(0, network)
+
+        self.hands = {}
+        links = {}
+        # serial links are named by the port the first hand on them configured
+        names = {}
+        for index, spec in enumerate(hands):
+            kwargs = dict(defaults)
+            kwargs.update(spec)
+            rate = kwargs.pop('rate', None)
+            name = str(kwargs.pop('name', kwargs.get('LR', index)))
+            if name in self.hands:
+                raise ValueError(f"two hands are named {name}")
+            kwargs['LR'] = name
+            kwargs['initDDS'] = False
+
+            ip = kwargs.get('ip')
+            serial_port = kwargs.get('serial_port', '/dev/ttyUSB0')
+            key = link_key(kwargs.get('use_serial', False), serial_port,
+                           ip or defaut_ip, kwargs.get('port', 6000) if ip else 6000)
+            first = links[key][0].handler if key in links else None
+            if first is not None:
+                # same bus or endpoint: reuse the connection of the first hand on it
+                kwargs['client'] = first.client
+                kwargs['link'] = first.link
+            hand = _Hand(name, ModbusDataHandler(**kwargs), rate)
+            self.hands[name] = hand
+            links.setdefault(key, []).append(hand)
+            names.setdefault(key, serial_port if key[0] == 'serial' else f"{key[1]}:{key[2]}")
+
+        # budgets by link identity, so a port given under another name (a symlink) finds its bus
+        budgets = {}
+        if isinstance(budget, dict):
+            for link_name, link_budget in budget.items():
+                host, colon, port = link_name.rpartition(':')
+                key = ('tcp', host, int(port)) if colon and port.isdigit() else link_key(True, link_name)
+                if key not in links:
+                    raise ValueError(f"budget given for {link_name}, which is not the link of any hand")
+                budgets[key] = link_budget
+
+        self.links = {}
+        for key, link_hands in links.items():
+            link_name = names[key]
+            link_budget = budgets.get(key, 1.0) if isinstance(budget, dict) else budget
+            if not 0 < link_budget <= 1:
+                raise ValueError(f"budget of {link_name} must be in (0, 1], got {link_budget}")
+            self.links[link_name] = _LinkWorker(key, link_hands, link_budget, self.on_error, self.clock)
+        self._start = None
+
+    def handler(self, name):
+        """The ModbusDataHandler of a hand, e.g. for its read_registers or metrics."""
+        return self.hands[name].handler
+
+    def start(self):
+        """Start one I/O thread per link."""
+        self._start = self.clock()
+        for worker in self.links.values():
+            worker.start()
+
+    def stop(self, timeout=1.0):
+        """Stop the I/O threads, save touch baselines and close every link."""
+        for worker in self.links.values():
+            worker.stop(timeout)
+        for worker in self.links.values():
+            for hand in worker.hands:
+                if hand.handler.touch_baseline is not None:
+                    hand.handler.touch_baseline.save()
+            first = worker.hands[0].handler
+            first.link.close()
+            first.client.close()
+
+    def stats(self):
+        """Per-hand and per-link figures since start().
+
+        Returns:
+            dict: {'hands': {name: {...}}, 'links': {link name: {...}}}; a hand
+            reports its link, cycles, rate, cycle p50/p99 in us, late cycles,
+            read errors, link state, command counts, mailbox counts (None
+            without control_rate) and touch filter counts (None without
+            touch_threshold), a link its budget,
+            utilisation and hands.
+        """
+        elapsed = self.clock() - self._start if self._start is not None else 0.0
+        hands = {}
+        links = {}
+        for link_name, worker in self.links.items():
+            links[link_name] = {
+                'budget': worker.budget,
+                'utilisation': worker.busy / elapsed if elapsed > 0 else 0.0,
+                'hands': [hand.name for hand in worker.hands],
+            }
+            for hand in worker.hands:
+                cycle = hand.handler.metrics.histograms['cycle'].summary()
+                hands[hand.name] = {
+                    'link': link_name,
+                    'cycles': hand.cycles,
+                    'rate': hand.cycles / elapsed if elapsed > 0 else 0.0,
+                    'cycle_p50_us': cycle['p50_us'],
+                    'cycle_p99_us': cycle['p99_us'],
+                    'late': hand.late,
+                    'errors': hand.errors,
+                    'state': hand.handler.link.state,
+                    'commands': hand.handler.commands.stats(),
+                    'mailbox': hand.handler.mailbox.stats() if hand.handler.mailbox is not None else None,
+                    'touch': hand.handler.touch_filter.stats() if hand.handler.touch_filter is not None else None,
+                }
+        return {'hands': hands, 'links': links}
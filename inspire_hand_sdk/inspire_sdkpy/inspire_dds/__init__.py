@@ -8,8 +8,16 @@
 from ._inspire_hand_ctrl import inspire_hand_ctrl
 from ._inspire_hand_touch import inspire_hand_touch
 from ._inspire_hand_state import inspire_hand_state
+from ._inspire_hand_metrics import inspire_hand_metrics
+from ._inspire_hand_touch_frame import inspire_hand_touch_frame
+from ._inspire_hand_touch_features import inspire_hand_touch_features
+from ._inspire_hand_touch_events import inspire_hand_touch_events
 __all__ = [
 	"inspire_hand_ctrl",
 	"inspire_hand_touch",
 	"inspire_hand_state",
+	"inspire_hand_metrics",
+	"inspire_hand_touch_frame",
+	"inspire_hand_touch_features",
+	"inspire_hand_touch_events",
 ]
@@ -0,0 +1,37 @@
+"""
+  Written by hand to match the IDL (not idlc output); regenerate with
+  idlc -l py when cyclonedds is available.
+  Module: inspire
+  IDL file: inspire_hand_metrics.idl
+
+"""
+
+from dataclasses import dataclass
+from enum import auto
+from typing import TYPE_CHECKING, Optional
+
+import cyclonedds.idl as idl
+import cyclonedds.idl.annotations as annotate
+import cyclonedds.idl.types as types
+
+# root module import for resolving types
+# import inspire_dds
+
+
+@dataclass
+@annotate.final
+@annotate.autoid("sequential")
+class inspire_hand_metrics(idl.IdlStruct, typename="inspire.inspire_hand_metrics"):
+    phase: types.sequence[str]
+    count: types.sequence[types.uint32]
+    mean_us: types.sequence[types.float32]
+    p50_us: types.sequence[types.float32]
+    p95_us: types.sequence[types.float32]
+    p99_us: types.sequence[types.float32]
+    max_us: types.sequence[types.float32]
+    window_s: types.float32
+    cycle_rate: types.float32
+    commands_superseded: types.uint32
+    commands_stale: types.uint32
+
+
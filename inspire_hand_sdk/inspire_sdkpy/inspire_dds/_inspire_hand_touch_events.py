@@ -0,0 +1,29 @@
+"""
+  Written by hand to match the IDL (not idlc output); regenerate with
+  idlc -l py when cyclonedds is available.
+  Module: inspire
+  IDL file: inspire_hand_touch_events.idl
+
+"""
+
+from dataclasses import dataclass
+from enum import auto
+from typing import TYPE_CHECKING, Optional
+
+import cyclonedds.idl as idl
+import cyclonedds.idl.annotations as annotate
+import cyclonedds.idl.types as types
+
+# root module import for resolving types
+# import inspire_dds
+
+
+@dataclass
+@annotate.final
+@annotate.autoid("sequential")
+class inspire_hand_touch_events(idl.IdlStruct, typename="inspire.inspire_hand_touch_events"):
+    seq: types.uint32
+    stamp: types.float64
+    region: types.sequence[str]
+    event: types.sequence[str]
+    peak: types.sequence[types.int16]
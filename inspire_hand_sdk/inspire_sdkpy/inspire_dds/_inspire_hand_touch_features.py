@@ -0,0 +1,31 @@
+"""
+  Written by hand to match the IDL (not idlc output); regenerate with
+  idlc -l py when cyclonedds is available.
+  Module: inspire
+  IDL file: inspire_hand_touch_features.idl
+
+"""
+
+from dataclasses import dataclass
+from enum import auto
+from typing import TYPE_CHECKING, Optional
+
+import cyclonedds.idl as idl
+import cyclonedds.idl.annotations as annotate
+import cyclonedds.idl.types as types
+
+# root module import for resolving types
+# import inspire_dds
+
+
+@dataclass
+@annotate.final
+@annotate.autoid("sequential")
+class inspire_hand_touch_features(idl.IdlStruct, typename="inspire.inspire_hand_touch_features"):
+    seq: types.uint32
+    total: types.sequence[types.float32, 17]
+    peak: types.sequence[types.int16, 17]
+    area: types.sequence[types.int16, 17]
+    centroid_row: types.sequence[types.float32, 17]
+    centroid_col: types.sequence[types.float32, 17]
+    contact: types.sequence[bool, 17]
@@ -0,0 +1,26 @@
+"""
+  Written by hand to match the IDL (not idlc output); regenerate with
+  idlc -l py when cyclonedds is available.
+  Module: inspire
+  IDL file: inspire_hand_touch_frame.idl
+
+"""
+
+from dataclasses import dataclass
+from enum import auto
+from typing import TYPE_CHECKING, Optional
+
+import cyclonedds.idl as idl
+import cyclonedds.idl.annotations as annotate
+import cyclonedds.idl.types as types
+
+# root module import for resolving types
+# import inspire_dds
+
+
+@dataclass
+@annotate.final
+@annotate.autoid("sequential")
+class inspire_hand_touch_frame(idl.IdlStruct, typename="inspire.inspire_hand_touch_frame"):
+    seq: types.uint32
+    data: types.sequence[types.int16, 1062]
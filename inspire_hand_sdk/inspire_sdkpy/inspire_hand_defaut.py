@@ -1,9 +1,35 @@
 
 
-from .inspire_dds import inspire_hand_touch,inspire_hand_ctrl,inspire_hand_state
+from .inspire_dds import inspire_hand_touch,inspire_hand_ctrl,inspire_hand_state,inspire_hand_touch_frame,inspire_hand_touch_features,inspire_hand_touch_events
+import os
 import threading
+# Kept for compatibility with code that locks around its own client calls.
+# The handlers use link_lock() instead, so independent links do not serialize.
 modbus_lock = threading.Lock()
 
+_link_locks = {}
+_link_locks_guard = threading.Lock()
+
+def link_key(use_serial=False, serial_port=None, ip=None, port=None):
+    """Identity of a physical link: the serial device, or the TCP endpoint"""
+    if use_serial:
+        return ('serial', os.path.realpath(serial_port))
+    return ('tcp', ip, port)
+
+def link_lock(key):
+    """Return the lock shared by every handler in this process that uses the link `key`.
+
+    One Modbus transaction (one request and its response) is done while holding
+    the lock, never a whole sweep, so a control write waits for at most one block
+    read. Handlers on different links get different locks and run in parallel;
+    handlers sharing an RS-485 bus get the same lock and take turns on it.
+    """
+    with _link_locks_guard:
+        lock = _link_locks.get(key)
+        if lock is None:
+            lock = _link_locks[key] = threading.Lock()
+        return lock
+
 # 数据定义   
 data_sheet = [
     ("小拇指指端触觉数据", 3000, 18, (3, 3), "fingerone_tip_touch"),      # 小拇指指端触觉数据
@@ -85,6 +111,32 @@ def get_inspire_hand_touch():
         fingerfive_palm_touch=[0 for _ in range(96)],     # 大拇指指腹触觉数据
         palm_touch=[0 for _ in range(112)]                # 掌心触觉数据
     )
+
+def get_inspire_hand_touch_frame():
+    return inspire_hand_touch_frame(
+        seq=0,
+        data=[0 for _ in range(1062)],                    # 全部触觉数据, data_sheet 地址顺序
+    )
+
+def get_inspire_hand_touch_features():
+    return inspire_hand_touch_features(
+        seq=0,
+        total=[0.0 for _ in range(17)],                   # 各区域压力总和, data_sheet 地址顺序
+        peak=[0 for _ in range(17)],                      # 各区域最大值
+        area=[0 for _ in range(17)],                      # 各区域接触点数
+        centroid_row=[0.0 for _ in range(17)],            # 各区域压力中心 (行)
+        centroid_col=[0.0 for _ in range(17)],            # 各区域压力中心 (列)
+        contact=[False for _ in range(17)],               # 各区域是否接触
+    )
+
+def get_inspire_hand_touch_events():
+    return inspire_hand_touch_events(
+        seq=0,
+        stamp=0.0,                                        # 帧解码时间 (秒, epoch)
+        region=[],                                        # 事件区域
+        event=[],                                         # touch_on / touch_off / pressure_spike
+        peak=[],                                          # 区域最大值
+    )
     
 def get_inspire_hand_state():
     return inspire_hand_state(
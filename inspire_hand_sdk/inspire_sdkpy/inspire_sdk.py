@@ -1,23 +1,40 @@
 
 from .inspire_hand_defaut import *
-from .inspire_dds import inspire_hand_touch,inspire_hand_ctrl,inspire_hand_state
+from .read_planner import ReadPlan, AdaptiveReadPlan, fields_from_data_sheet, fields_from_states_structure
+from .register_codec import RegisterDecoder, decode_registers, FIELD_DTYPES
+from .message_pool import MessagePool
+from .link_supervisor import LinkSupervisor
+from .metrics import HandMetrics
+from .command_writer import CommandWriter
+from .command_mailbox import CommandMailbox
+from .serial_baud import switch_baudrate, host_baudrate, TOUCH_MIN_BAUDRATE
+from .rtu_transport import RtuTransport
+from .tcp_transport import TcpTransport
+from .touch_filter import TouchChangeFilter
+from .touch_frame import TouchLayout
+from .touch_features import TouchFeatures
+from .touch_baseline import TouchBaseline, DEFAULT_BASELINE_DIR, baseline_path
+from .touch_events import TouchEventDetector
+from .inspire_dds import inspire_hand_touch,inspire_hand_ctrl,inspire_hand_state,inspire_hand_metrics,inspire_hand_touch_frame,inspire_hand_touch_features,inspire_hand_touch_events
 from unitree_sdk2py.core.channel import ChannelPublisher, ChannelFactoryInitialize
 from unitree_sdk2py.core.channel import ChannelSubscriber, ChannelFactoryInitialize
 from unitree_sdk2py.utils.thread import Thread
 
 from pymodbus.client import ModbusTcpClient
 from pymodbus.client import ModbusSerialClient
+from pymodbus.exceptions import ModbusException
+from pymodbus.pdu import ExceptionResponse
 
+import collections
 import numpy as np
-import struct
 import sys
 import time
 class ModbusDataHandler:
-    def __init__(self, data=data_sheet, history_length=100, network=None, ip=None, port=6000, device_id=1, LR='r', use_serial=False, serial_port='/dev/ttyUSB0', baudrate=115200, states_structure=None, initDDS=True, max_retries=5, retry_delay=2):
+    def __init__(self, data=data_sheet, history_length=100, network=None, ip=None, port=6000, device_id=1, LR='r', use_serial=False, serial_port='/dev/ttyUSB0', baudrate=115200, states_structure=None, initDDS=True, max_retries=5, retry_delay=2, read_gap=0, state_read='auto', lock=None, metrics_interval=1.0, combined_cycle=False, control_rate=None, command_deadline=0.1, client=None, link=None, high_baudrate=None, persist_baudrate=True, transport='pymodbus', touch_threshold=None, touch_keyframe=1.0, touch_format='regions', contact_threshold=None, contact_min_area=1, touch_baseline=None, baseline_threshold=20, baseline_dir=DEFAULT_BASELINE_DIR, hand_serial=None, touch_events=None, event_off=None, event_spike=200):
         """_summary_
         Calling self.read() in a loop reads and returns the data, and publishes the DDS message at the same time        
         Args:
-            data (dict, optional): Tactile sensor register definition. Defaults to data_sheet.
+            data (dict, optional): Tactile sensor register definition, empty to skip touch. Defaults to data_sheet.
             history_length (int, optional): Hand state history_length. Defaults to 100.
             network (str, optional): Name of the DDS NIC. Defaults to None.
             ip (str, optional): ModbusTcp IP. Defaults to None will use 192.1686.11.210.
@@ -31,10 +48,40 @@ class ModbusDataHandler:
             initDDS (bool, optional): Run ChannelFactoryInitialize(0),only need run once in all program
             max_retries (int, optional): Number of retries for connecting to Modbus server. Defaults to 3.
             retry_delay (int, optional): Delay between retries in seconds. Defaults to 2.
+            read_gap (int, optional): Largest hole in registers the touch read planner may bridge to merge regions. Defaults to 0.
+            state_read (str, optional): 'wide' reads the whole state block in one transaction, 'narrow' reads each group of adjacent fields separately, 'auto' times both and keeps the faster. Defaults to 'auto'.
+            lock (threading.Lock, optional): Lock guarding the Modbus link. Defaults to None, which shares link_lock() with every handler on the same serial port or TCP endpoint.
+            metrics_interval (float, optional): Seconds between messages on rt/inspire_hand/metrics/<LR>, None disables the topic (self.metrics still records). Defaults to 1.0.
+            combined_cycle (bool, optional): Send the pending ctrl write and the state read of read() as one Read/Write Multiple Registers (FC23) transaction, if a probe at startup shows the hand supports it; commands then take effect at the next read(). Otherwise ctrl messages are written from the DDS callback. Defaults to False.
+            control_rate (float, optional): Keep only the newest ctrl command per mode in a mailbox and write it from read(), at most control_rate times per second. None writes every message from the DDS callback in arrival order. Defaults to None.
+            command_deadline (float, optional): With control_rate, seconds after which an unsent command is dropped as stale, None never drops. Defaults to 0.1.
+            client (optional): Connected pymodbus client of another handler on the same link (e.g. a second hand on one RS-485 bus), used instead of opening the port again. Defaults to None.
+            link (LinkSupervisor, optional): Supervisor of that shared client. Defaults to None, a new one.
+            high_baudrate (int, optional): Managed serial mode: at startup move the hand and the port from baudrate to this rate (e.g. 921600), verify it and revert on failure, see serial_baud.py. Touch is read over serial when the link runs at TOUCH_MIN_BAUDRATE or faster. Defaults to None, stay at baudrate.
+            persist_baudrate (bool, optional): Save a verified high_baudrate to the hand's flash, so the next start finds it there. Defaults to True.
+            transport (str, optional): 'pymodbus' uses the pymodbus clients; 'lean' frames the requests itself with prebuilt frames and preallocated receive buffers: RtuTransport on pyserial for serial links (baud-derived timeouts, no FC23), TcpTransport on a raw socket for TCP. Defaults to 'pymodbus'.
+            touch_threshold (int or dict, optional): Publish a touch frame only when some region changed by more than this since the last published frame (or {region pattern: threshold}), see touch_filter.py. None publishes every frame. Defaults to None.
+            touch_keyframe (float, optional): With touch_threshold, seconds after which an unchanged frame is published anyway, None never. Defaults to 1.0.
+            touch_format (str, optional): 'regions' publishes inspire_hand_touch on rt/inspire_hand/touch/<LR>, 'frame' the flat int16[1062] inspire_hand_touch_frame on rt/inspire_hand/touch_frame/<LR> (see touch_frame.py; a data sheet with only some regions sends just their taxels, packed), 'both' both. Defaults to 'regions'.
+            contact_threshold (int or dict, optional): Publish per-region contact features (total, peak, contact area, centroid, contact flag) of every touch frame on rt/inspire_hand/touch_features/<LR>, counting a taxel as in contact above this value (or {region pattern: value}), see touch_features.py. None disables the topic. Defaults to None.
+            contact_min_area (int, optional): Taxels in contact for a region's contact flag. Defaults to 1.
+            touch_baseline (float, optional): Drift compensation: publish every taxel minus a running baseline that follows the raw value with this time constant in seconds while its region is not in contact, see touch_baseline.py. The raw frame stays in self.touch_raw. None publishes raw values. Defaults to None.
+            baseline_threshold (int or dict, optional): Compensated value above which a region counts as in contact and its baseline is held (or {region pattern: value}). Defaults to 20.
+            baseline_dir (str, optional): Directory the baseline of each hand is saved to and loaded from at startup, None does not persist it. Defaults to DEFAULT_BASELINE_DIR (~/.inspire_hand/touch_baseline).
+            hand_serial (str, optional): Name of the hand's baseline file, e.g. the serial number on the hand. Defaults to None, the link and device_id (the file then follows the port, not the hand).
+            touch_events (int or dict, optional): Publish touch_on/touch_off/pressure_spike events per region on rt/inspire_hand/touch_events/<LR>, detected in read() right after the touch sweep; a region is touched when its peak exceeds this value (or {region pattern: value}, unlisted regions use 30), see touch_events.py. None disables the topic. Defaults to None.
+            event_off (int or dict, optional): Peak below which a touched region is released. Defaults to None, half of touch_events.
+            event_spike (int or dict, optional): Peak rise between two frames reported as pressure_spike, None for none. Defaults to 200.
         Raises:
             ConnectionError: raise when connection fails after max_retries
         """        
         self.data = data
+        # touch is read over TCP, or over serial at TOUCH_MIN_BAUDRATE and up, and not at all with an empty data sheet
+        self.read_touch = bool(data) and (not use_serial or max(baudrate, high_baudrate or 0) >= TOUCH_MIN_BAUDRATE)
+        self.touch_plan = ReadPlan(fields_from_data_sheet(data), max_gap=read_gap) if self.read_touch else None
+        self.touch_decoder = RegisterDecoder(self.touch_plan.fields) if self.read_touch else None
+        # decoder the touch sweeps fill; a separate raw one with touch_baseline
+        self.touch_input = self.touch_decoder
         self.history_length = history_length
         self.history = {
             'POS_ACT': [np.zeros(history_length) for _ in range(6)],
@@ -56,20 +103,56 @@ class ModbusDataHandler:
             ('status', 1612, 3, 'byte'),
             ('temperature', 1618, 3, 'byte')
         ]
-        if self.use_serial:
-            self.client = ModbusSerialClient(method='rtu', port=serial_port, baudrate=baudrate, timeout=1)
+        self.state_plan = AdaptiveReadPlan(fields_from_states_structure(self.states_structure), mode=state_read)
+        self.state_decoder = RegisterDecoder(self.state_plan.fields)
+        self.messages = MessagePool(self.state_decoder, self.touch_decoder)
+        # phase timing, see metrics.py; _io_time is the time spent in read_registers during one fill
+        self.metrics = HandMetrics(metrics_interval)
+        self._io_time = 0.0
+        if client is not None:
+            self.client = client
+            key = link_key(use_serial, serial_port, ip or defaut_ip, port if ip else 6000)
+        elif self.use_serial:
+            if transport == 'lean':
+                self.client = RtuTransport(serial_port, baudrate)
+            else:
+                self.client = ModbusSerialClient(method='rtu', port=serial_port, baudrate=baudrate, timeout=1)
             print("will use serial")
+            key = link_key(True, serial_port)
         else:
+            tcp_client = TcpTransport if transport == 'lean' else ModbusTcpClient
             if ip==None:
-                self.client = ModbusTcpClient(defaut_ip, port=6000)
+                self.client = tcp_client(defaut_ip, port=6000)
                 print("will use defautl Tcp")
+                key = link_key(False, ip=defaut_ip, port=6000)
             else:
-                self.client = ModbusTcpClient(ip, port=port)
+                self.client = tcp_client(ip, port=port)
                 print("will use Tcp")
+                key = link_key(False, ip=ip, port=port)
+        # one transaction at a time per link, see link_lock()
+        self.lock = lock or link_lock(key)
+        # transports that receive straight into the register buffers skip the register lists
+        if hasattr(self.client, 'read_holding_registers_into'):
+            self._state_sweep = lambda plan: self.state_decoder.fill_into(plan, self.read_registers_into)
+            self._touch_sweep = lambda: self.touch_input.fill_into(self.touch_plan, self.read_registers_into)
+        else:
+            self._state_sweep = lambda plan: self.state_decoder.fill(plan, self.read_registers)
+            self._touch_sweep = lambda: self.touch_input.fill(self.touch_plan, self.read_registers)
 
         # Try to connect to Modbus server with retry mechanism
-        self.connect_to_modbus(max_retries, retry_delay)
+        if client is None:
+            self.connect_to_modbus(max_retries, retry_delay)
         self.device_id = device_id
+        self.LR = LR
+        self.baudrate = baudrate
+        if use_serial and high_baudrate:
+            with self.lock:
+                if switch_baudrate(self.client, device_id, high_baudrate, current=baudrate, persist=persist_baudrate):
+                    self.baudrate = high_baudrate
+        if self.read_touch and use_serial and self.baudrate < TOUCH_MIN_BAUDRATE:
+            self._stop_touch()
+        # after the first connection, outages are handled in the background
+        self.link = link or LinkSupervisor(self.client, name=LR, probe=self.probe, lock=self.lock)
 
                 
        # 初始化 ChannelFactory
@@ -84,17 +167,88 @@ class ModbusDataHandler:
             # Can add logging or other recovery mechanisms here
             return
         
-        self.client.write_register(1004,1,self.device_id) #reser error
-        if not self.use_serial:
+        with self.lock:
+            self.client.write_register(1004,1,self.device_id) #reser error
+        # ctrl messages are merged into the fewest writes of 1474-1533, see command_writer.py
+        self.commands = CommandWriter(self.metrics)
+        self.commands.load_from(self.read_registers)
+        # (address, values, receipt time) of command writes waiting for the next read(), combined_cycle only
+        self._pending_writes = collections.deque()
+        self.combined_cycle = bool(combined_cycle) and self.probe_combined()
+        # latest-wins commands drained by read(), see command_mailbox.py
+        self.mailbox = CommandMailbox(control_rate, command_deadline) if control_rate else None
+        if touch_format not in ('regions', 'frame', 'both'):
+            raise ValueError(f"touch_format must be 'regions', 'frame' or 'both', got {touch_format!r}")
+        self.touch_format = touch_format
+        self.frame_pub = None
+        if self.read_touch:
             self.pub = ChannelPublisher("rt/inspire_hand/touch/"+LR, inspire_hand_touch)
             self.pub.Init()
+            if touch_format != 'regions':
+                self.frame_pub = ChannelPublisher("rt/inspire_hand/touch_frame/"+LR, inspire_hand_touch_frame)
+                self.frame_pub.Init()
+            # flat int16[1062] frame, the same memory as the region views in read()['touch']
+            self.touch_layout = TouchLayout(data)
+            self.touch_frame = self.messages.touch_frame.data
+            # gaps between the configured regions are not taxels: publish the packed taxels instead, gathered in publish_touch()
+            self.frame_packed = self.touch_layout.new_packed() if self.frame_pub is not None else None
+            if self.frame_packed is not None:
+                self.messages.touch_frame.data = self.frame_packed
+        # drift compensation: sweeps go to a raw decoder, the published frame is raw - baseline, see touch_baseline.py
+        self.touch_baseline = None
+        if self.read_touch and touch_baseline is not None:
+            self.touch_input = RegisterDecoder(self.touch_plan.fields)
+            self.touch_raw = self.touch_input.registers.view(FIELD_DTYPES['short'])
+            if hand_serial is None:
+                hand_serial = '-'.join(str(part) for part in key[1:]) + f'-{device_id}'
+            path = baseline_path(baseline_dir, hand_serial) if baseline_dir is not None else None
+            self.touch_baseline = TouchBaseline(self.touch_raw, self.touch_frame, self.touch_layout, touch_baseline, baseline_threshold, path)
+        # contact events, see touch_events.py
+        self.touch_events = None
+        if self.read_touch and touch_events is not None:
+            self.touch_events = TouchEventDetector(self.touch_frame, self.touch_layout, touch_events, event_off, event_spike)
+            self.events_pub = ChannelPublisher("rt/inspire_hand/touch_events/"+LR, inspire_hand_touch_events)
+            self.events_pub.Init()
+        # per-region contact summaries, see touch_features.py
+        self.touch_features = None
+        if self.read_touch and contact_threshold is not None:
+            self.touch_features = TouchFeatures(self.touch_frame, self.touch_layout, contact_threshold, contact_min_area)
+            self.features_pub = ChannelPublisher("rt/inspire_hand/touch_features/"+LR, inspire_hand_touch_features)
+            self.features_pub.Init()
+        # change-driven touch publishing, see touch_filter.py
+        self.touch_filter = None
+        if self.read_touch and touch_threshold is not None:
+            self.touch_filter = TouchChangeFilter(self.touch_frame, self.touch_layout, touch_threshold, touch_keyframe)
 
         self.state_pub = ChannelPublisher("rt/inspire_hand/state/"+LR, inspire_hand_state)
         self.state_pub.Init()
+
+        self.metrics_pub = None
+        if metrics_interval is not None:
+            self.metrics_pub = ChannelPublisher("rt/inspire_hand/metrics/"+LR, inspire_hand_metrics)
+            self.metrics_pub.Init()
             
         self.sub = ChannelSubscriber("rt/inspire_hand/ctrl/"+LR, inspire_hand_ctrl)
         self.sub.Init(self.write_registers_callback, 10)       
             
+    def sync_baudrate(self):
+        """Take over the current rate of a serial link another hand on the bus moved (see serial_baud._revert); touch stops below TOUCH_MIN_BAUDRATE."""
+        if not self.use_serial:
+            return
+        with self.lock:
+            self.baudrate = host_baudrate(self.client)
+        if self.read_touch and self.baudrate < TOUCH_MIN_BAUDRATE:
+            self._stop_touch()
+
+    def _stop_touch(self):
+        """Make the handler state-only, the serial link is too slow for the tactile registers."""
+        print(f"Serial link stays at {self.baudrate} baud, touch will not be read")
+        self.read_touch = False
+        self.touch_plan = self.touch_decoder = self.touch_input = None
+        self.pub = self.frame_pub = None
+        self.touch_baseline = self.touch_events = self.touch_features = self.touch_filter = None
+        self.messages = MessagePool(self.state_decoder, None)
+
     def connect_to_modbus(self, max_retries, retry_delay):
         """Connect to Modbus server and retry on failure"""
         retries = 0
@@ -114,78 +268,259 @@ class ModbusDataHandler:
                     print("Max retries reached. Could not connect.")
                     raise   
     def write_registers_callback(self,msg:inspire_hand_ctrl):
-        with modbus_lock:
-            if msg.mode & 0b0001:  # Mode 1 - Angle
-                self.client.write_registers(1486, msg.angle_set, self.device_id)
-                # print('angle_set')
-            if msg.mode & 0b0010:  # Mode 2 - Position
-                self.client.write_registers(1474, msg.pos_set, self.device_id)
-                # print('pos_set')
-
-            if msg.mode & 0b0100:  # Mode 4 - Force control
-                self.client.write_registers(1498, msg.force_set, self.device_id)
-                # print('force_set')
-
-            if msg.mode & 0b1000:  # Mode 8 - Speed
-                self.client.write_registers(1522, msg.speed_set, self.device_id)
+        # Mode bits: 1 angle, 2 position, 4 force, 8 speed. All requested modes
+        # go out in as few write transactions as possible, usually one.
+        start = time.perf_counter()
+        if self.mailbox is not None:
+            # taken by read() at the control rate
+            self.mailbox.post(msg, start)
+            return
+        self._send_command(msg, start)
+
+    def _send_command(self, msg, received):
+        if self.combined_cycle:
+            # sent by read(), together with the state read
+            self._pending_writes.extend((address, values, received) for address, values in self.commands.plan(msg))
+            self.commands.commands += 1
+            return
+        self.commands.write(msg, self.write_registers)
+        self.metrics.record('command', time.perf_counter() - received)
+
+    def write_registers(self, start_address, values):
+        """Write holding registers as one transaction under the link lock, returns True on success"""
+        if not self.link.available:
+            return False
+        try:
+            with self.lock:
+                response = self.client.write_registers(start_address, values, self.device_id)
+        except ModbusException as e:
+            self.link.error(f"Error writing registers: {e}")
+            self.link.record(False)
+            return False
+        # an exception response still proves the hand is reachable
+        self.link.record(not response.isError() or isinstance(response, ExceptionResponse))
+        if response.isError():
+            self.link.error("Error writing registers")
+            return False
+        return True
+
+    def probe_combined(self):
+        """Check whether the hand answers Read/Write Multiple Registers (FC23).
+
+        The probe rewrites force_set with its current value, so it has no effect on the hand.
+        """
+        values = self.commands.cached(1498)
+        if values is None:
+            print("Combined write/read (FC23) not probed, the command block is unknown")
+            return False
+        try:
+            with self.lock:
+                response = self.client.readwrite_registers(read_address=1000, read_count=1, write_address=1498, values=values, slave=self.device_id)
+        except ModbusException as e:
+            print(f"Combined write/read (FC23) probe failed: {e}")
+            return False
+        supported = not response.isError() and len(response.registers) == 1
+        print("Combined write/read (FC23) " + ("supported" if supported else "not supported, using separate requests"))
+        return supported
+
+    def probe(self):
+        """Check that the hand answers, used by the link supervisor after a reconnect; the caller holds the link lock"""
+        response = self.client.read_holding_registers(1000, 1, self.device_id)
+        return not response.isError()
                 
     def read(self):
-        if not self.use_serial:
-            touch_msg = get_inspire_hand_touch()
-            matrixs = {}
-            for i, (name, addr, length, size, var) in enumerate(self.data):
-                value = self.read_and_parse_registers(addr, length // 2,'short')
-                if value is not None:
-                    setattr(touch_msg, var, value)
-                    matrix = np.array(value).reshape(size)
-                    matrixs[var]=matrix
-            self.pub.Write(touch_msg)
-        else:
-            matrixs = {}
+        """Read touch and state data once and publish them.
+
+        The returned dict and its arrays are reused: they are views on the
+        handler's register buffers and are overwritten by the next read(); copy
+        them to keep a frame.
+        """
+        # Only complete sweeps are published; while the link is down, read()
+        # returns at once with the last values and self.link.state tells why.
+        metrics = self.metrics
+        start = time.perf_counter()
+        self.send_commands(start)
+        if self.read_touch:
+            self._io_time = 0.0
+            t0 = time.perf_counter()
+            complete = self._touch_sweep()
+            t = time.perf_counter()
+            metrics.record('decode', t - t0 - self._io_time)
+            if complete:
+                self.process_touch(t)
+                metrics.record('dds_write', time.perf_counter() - t)
         # Read the states for POS_ACT, ANGLE_ACT, etc.
-        states_msg = get_inspire_hand_state()
+        self._io_time = 0.0
+        t0 = time.perf_counter()
+        if self._pending_writes:
+            complete = self._combined_state_sweep()
+        else:
+            complete = self.state_plan.run(self._state_sweep)
+        t = time.perf_counter()
+        metrics.record('decode', t - t0 - self._io_time)
+        if complete:
+            self.state_pub.Write(self.messages.state)
+            metrics.record('dds_write', time.perf_counter() - t)
 
-        for attr_name, start_address, length, data_type in self.states_structure:
-            setattr(states_msg, attr_name, self.read_and_parse_registers(start_address, length, data_type))
-            
-        self.state_pub.Write(states_msg)
-
-        return {'states':{
-            'POS_ACT': states_msg.pos_act,
-            'ANGLE_ACT': states_msg.angle_act,
-            'FORCE_ACT': states_msg.force_act,
-            'CURRENT': states_msg.current,
-            'ERROR': states_msg.err,
-            'STATUS': states_msg.status,
-            'TEMP': states_msg.temperature
-        },'touch':matrixs
-                }
+        end = time.perf_counter()
+        metrics.record('cycle', end - start)
+        if self.metrics_pub is not None and metrics.due(end):
+            self.metrics_pub.Write(metrics.message(end, self.mailbox))
+        return self.messages.result
+
+    def send_commands(self, now=None):
+        """Write the newest mailbox command if the control rate allows one now (control_rate only)."""
+        if self.mailbox is None:
+            return
+        if now is None:
+            now = time.perf_counter()
+        if self.mailbox.due(now):
+            command = self.mailbox.take(now)
+            if command is not None:
+                self._send_command(*command)
+
+    def process_touch(self, now=None):
+        """Per-frame touch stages on freshly decoded registers: drift compensation, contact events, contact features, then the change filter and publishing."""
+        if self.touch_baseline is not None:
+            self.touch_baseline.update(now)
+        if self.touch_events is not None:
+            events = self.touch_events.update()
+            if events is not None:
+                self.events_pub.Write(events)
+        if self.touch_features is not None:
+            self.features_pub.Write(self.touch_features.update())
+        if self.touch_filter is None or self.touch_filter.update(now):
+            self.publish_touch()
+
+    def publish_touch(self):
+        """Write the current touch data in the configured touch_format."""
+        if self.touch_format != 'frame':
+            self.pub.Write(self.messages.touch)
+        if self.frame_pub is not None:
+            frame = self.messages.touch_frame
+            if self.frame_packed is not None:
+                self.touch_layout.pack(self.touch_frame, self.frame_packed)
+            frame.seq = (frame.seq + 1) & 0xFFFFFFFF
+            self.frame_pub.Write(frame)
+
+    def flush_writes(self, keep=0):
+        """Send pending command writes (combined_cycle) as separate write transactions, oldest first, until `keep` are left."""
+        pending = self._pending_writes
+        commands = self.commands
+        while len(pending) > keep:
+            address, values, received = pending.popleft()
+            start = time.perf_counter()
+            ok = self.write_registers(address, values)
+            end = time.perf_counter()
+            commands.record(address, values, ok, end - start)
+            self.metrics.record('command', end - received)
+
+    def _combined_state_sweep(self, plan=None):
+        """State read carrying the newest pending command write (FC23); older pending writes go out first.
+
+        Args:
+            plan (ReadPlan, optional): State fields to read. Defaults to None, the whole state block in one transaction.
+        """
+        self.flush_writes(keep=1)
+        pending = self._pending_writes
+        commands = self.commands
+        address, values, received = pending.popleft()
+        sent = False
+
+        def read_block(read_address, count):
+            nonlocal sent
+            if sent:
+                return self.read_registers(read_address, count)
+            sent = True
+            start = time.perf_counter()
+            registers = self.read_write_registers(read_address, count, address, values)
+            end = time.perf_counter()
+            commands.record(address, values, registers is not None, end - start)
+            self.metrics.record('command', end - received)
+            return registers
+
+        # the wide plan reads the whole state block in one transaction
+        return self.state_decoder.fill(plan or self.state_plan.wide, read_block)
+
+    def read_write_registers(self, read_address, read_count, write_address, values):
+        """Write then read holding registers in one FC23 transaction, returns the read registers or None on error"""
+        if not self.link.available:
+            return None
+        start = time.perf_counter()
+        try:
+            with self.lock:
+                acquired = time.perf_counter()
+                response = self.client.readwrite_registers(read_address=read_address, read_count=read_count,
+                                                           write_address=write_address, values=values, slave=self.device_id)
+        except ModbusException as e:
+            self.link.error(f"Error reading/writing registers: {e}")
+            self.link.record(False)
+            return None
+        end = time.perf_counter()
+        self._io_time += end - start
+        self.metrics.record('lock_wait', acquired - start)
+        self.metrics.record('rtt', end - acquired)
+        if response.isError():
+            self.link.error("Error reading/writing registers")
+            self.link.record(isinstance(response, ExceptionResponse))
+            return None
+        self.link.record(True)
+        return response.registers
+
+    def read_registers(self, start_address, num_registers):
+        """Read raw holding registers, returns the register list or None on error"""
+        if not self.link.available:
+            return None
+        start = time.perf_counter()
+        try:
+            with self.lock:
+                acquired = time.perf_counter()
+                response = self.client.read_holding_registers(start_address, num_registers, self.device_id)
+        except ModbusException as e:
+            self.link.error(f"Error reading registers: {e}")
+            self.link.record(False)
+            return None
+        end = time.perf_counter()
+        self._io_time += end - start
+        self.metrics.record('lock_wait', acquired - start)
+        self.metrics.record('rtt', end - acquired)
+        if response.isError():
+            self.link.error("Error reading registers")
+            self.link.record(isinstance(response, ExceptionResponse))
+            return None
+        self.link.record(True)
+        return response.registers
+
+    def read_registers_into(self, start_address, num_registers, out):
+        """Read holding registers into the writable uint8 buffer `out` (2 bytes per register), returns True on success"""
+        if not self.link.available:
+            return False
+        start = time.perf_counter()
+        try:
+            with self.lock:
+                acquired = time.perf_counter()
+                ok = self.client.read_holding_registers_into(start_address, num_registers, self.device_id, out)
+        except ModbusException as e:
+            self.link.error(f"Error reading registers: {e}")
+            self.link.record(False)
+            return False
+        end = time.perf_counter()
+        self._io_time += end - start
+        self.metrics.record('lock_wait', acquired - start)
+        self.metrics.record('rtt', end - acquired)
+        # only a valid response counts as a success
+        self.link.record(ok)
+        if not ok:
+            self.link.error("Error reading registers")
+        return ok
 
     def read_and_parse_registers(self, start_address, num_registers, data_type='short'):
-         with modbus_lock:
-            # Read registers
-            response = self.client.read_holding_registers(start_address, num_registers, self.device_id)
-
-            if not response.isError():
-                if data_type == 'short':
-                    # Pack the read registers into binary data
-                    packed_data = struct.pack('>' + 'H' * num_registers, *response.registers)
-                    # Unpack registers into signed 16-bit integers (short)
-                    angles = struct.unpack('>' + 'h' * num_registers, packed_data)
-                    return angles
-                elif data_type == 'byte':
-                    # Split each 16-bit register into two 8-bit (uint8) data
-                    byte_list = []
-                    for reg in response.registers:
-                        high_byte = (reg >> 8) & 0xFF  # High 8 bits
-                        low_byte = reg & 0xFF          # Low 8 bits
-                        byte_list.append(high_byte)
-                        byte_list.append(low_byte)
-                    return byte_list
-            else:
-                print("Error reading registers")
-                return None
-            
+        registers = self.read_registers(start_address, num_registers)
+        if registers is None:
+            return None
+        return decode_registers(registers, data_type)
+
+
 
 if __name__ == "__main__":
     import qt_tabs 
@@ -0,0 +1,324 @@
+
+from .inspire_hand_defaut import *
+from .read_planner import ReadPlan, MAX_READ_REGISTERS, fields_from_data_sheet, fields_from_states_structure
+from .register_codec import RegisterDecoder
+from .message_pool import MessagePool
+from .command_writer import CommandWriter, COMMAND_START, COMMAND_REGISTERS
+from .link_supervisor import LinkSupervisor
+from .inspire_dds import inspire_hand_touch,inspire_hand_ctrl,inspire_hand_state
+from unitree_sdk2py.core.channel import ChannelPublisher, ChannelFactoryInitialize
+from unitree_sdk2py.core.channel import ChannelSubscriber, ChannelFactoryInitialize
+
+import asyncio
+import itertools
+import socket
+import struct
+import time
+
+import numpy as np
+
+MBAP = struct.Struct('>HHHB')        # transaction id, protocol id, length, unit id
+READ_REQUEST = struct.Struct('>BHH')  # function code, address, count
+
+
+class PipelinedModbusTcpClient(asyncio.Protocol):
+    """ModbusTCP client that keeps several transactions in flight on one connection.
+
+    pymodbus' AsyncModbusTcpClient holds a lock from request to response, so it
+    never has more than one transaction outstanding. This client frames the
+    requests itself and matches responses to requests by MBAP transaction id,
+    which is what ModbusTCP servers answer with.
+
+    Args:
+        host (str): Hand IP.
+        port (int, optional): ModbusTcp port. Defaults to 6000.
+        max_in_flight (int, optional): Outstanding transactions allowed. Defaults to 4.
+        timeout (float, optional): Seconds to wait for one response. Defaults to 1.0.
+    """
+
+    def __init__(self, host, port=6000, max_in_flight=4, timeout=1.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+        self.transport = None
+        self._buffer = bytearray()
+        self._pending = {}
+        self._tids = itertools.cycle(range(1, 0x10000))
+        self._slots = None
+
+    @property
+    def connected(self):
+        return self.transport is not None and not self.transport.is_closing()
+
+    async def connect(self):
+        loop = asyncio.get_running_loop()
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        await asyncio.wait_for(loop.create_connection(lambda: self, self.host, self.port), self.timeout)
+        return True
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+
+    async def reconnect(self):
+        """Drop what is left of the connection and connect again."""
+        if self.transport is not None:
+            self.transport.abort()
+            # connection_lost() of the old transport runs on a later loop iteration
+            while self.transport is not None:
+                await asyncio.sleep(0.01)
+        return await self.connect()
+
+    # asyncio.Protocol
+    def connection_made(self, transport):
+        self.transport = transport
+        sock = transport.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def data_received(self, data):
+        buffer = self._buffer
+        buffer += data
+        while len(buffer) >= MBAP.size:
+            tid, pid, length, unit = MBAP.unpack_from(buffer)
+            end = 6 + length
+            if len(buffer) < end:
+                break
+            future = self._pending.pop(tid, None)
+            if future is not None and not future.done():
+                future.set_result(bytes(buffer[MBAP.size:end]))
+            del buffer[:end]
+
+    def connection_lost(self, exc):
+        self.transport = None
+        self._buffer.clear()
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Modbus connection lost"))
+        self._pending.clear()
+
+    async def execute(self, unit, pdu):
+        """Send one request PDU and return the response PDU (bytes)."""
+        async with self._slots:
+            if not self.connected:
+                raise ConnectionError("Modbus client is not connected")
+            tid = next(self._tids)
+            future = asyncio.get_running_loop().create_future()
+            self._pending[tid] = future
+            self.transport.write(MBAP.pack(tid, 0, len(pdu) + 1, unit) + pdu)
+            try:
+                return await asyncio.wait_for(future, self.timeout)
+            finally:
+                self._pending.pop(tid, None)
+
+    async def read_holding_registers_into(self, address, count, unit, out):
+        """FC3 read, copying the 2 * count payload bytes into the writable buffer `out`.
+
+        Returns False on an exception response or a malformed one (wrong length or function code).
+        """
+        pdu = await self.execute(unit, READ_REQUEST.pack(3, address, count))
+        if len(pdu) != 2 + 2 * count or pdu[0] != 3 or pdu[1] != 2 * count:
+            return False
+        out[:] = memoryview(pdu)[2:]
+        return True
+
+    async def write_registers(self, address, values, unit):
+        """FC16 write of signed or unsigned 16-bit values, returns False on an exception or malformed response."""
+        count = len(values)
+        pdu = struct.pack(f'>BHHB{count}H', 16, address, count, 2 * count, *[v & 0xFFFF for v in values])
+        response = await self.execute(unit, pdu)
+        return len(response) == 5 and response[0] == 16
+
+
+class AsyncModbusDataHandler:
+    def __init__(self, data=data_sheet, network=None, ip=None, port=6000, device_id=1, LR='r', states_structure=None, initDDS=True, read_gap=0, max_in_flight=4, timeout=1.0):
+        """Asyncio counterpart of ModbusDataHandler for ModbusTCP hands.
+
+        The blocks of the touch sweep and the state read are all sent at once and
+        overlap their round-trips, up to max_in_flight per connection. Several
+        handlers can run on one event loop. Data is published on the same
+        rt/inspire_hand/touch|state|ctrl/<LR> topics as ModbusDataHandler.
+
+        Usage:
+            handler = AsyncModbusDataHandler(ip='192.168.123.210', LR='l')
+            await handler.connect()
+            await handler.run()
+
+        Args:
+            data (list, optional): Tactile sensor register definition, empty to skip touch. Defaults to data_sheet.
+            network (str, optional): Name of the DDS NIC. Defaults to None.
+            ip (str, optional): ModbusTcp IP. Defaults to None will use defaut_ip.
+            port (int, optional): ModbusTcp IP port. Defaults to 6000.
+            device_id (int, optional): Hand ID. Defaults to 1.
+            LR (str, optional): Topic suffix l or r. Defaults to 'r'.
+            states_structure (list, optional): State registers as in ModbusDataHandler. If None, will publish All Data.
+            initDDS (bool, optional): Run ChannelFactoryInitialize(0), only need run once in all program.
+            read_gap (int, optional): Largest hole in registers the touch read planner may bridge. Defaults to 0.
+            max_in_flight (int, optional): Outstanding Modbus transactions per connection. Defaults to 4.
+            timeout (float, optional): Seconds to wait for one response. Defaults to 1.0.
+        """
+        self.data = data
+        self.device_id = device_id
+        self.LR = LR
+        self.states_structure = states_structure or [
+            ('pos_act', 1534, 6, 'short'),
+            ('angle_act', 1546, 6, 'short'),
+            ('force_act', 1582, 6, 'short'),
+            ('current', 1594, 6, 'short'),
+            ('err', 1606, 3, 'byte'),
+            ('status', 1612, 3, 'byte'),
+            ('temperature', 1618, 3, 'byte')
+        ]
+        self.read_touch = bool(data)
+        self.touch_plan = ReadPlan(fields_from_data_sheet(data), max_gap=read_gap) if self.read_touch else None
+        self.touch_decoder = RegisterDecoder(self.touch_plan.fields) if self.read_touch else None
+        # round-trips overlap, so the state block is always fetched as one span
+        self.state_plan = ReadPlan(fields_from_states_structure(self.states_structure), max_gap=MAX_READ_REGISTERS)
+        self.state_decoder = RegisterDecoder(self.state_plan.fields)
+        self.messages = MessagePool(self.state_decoder, self.touch_decoder)
+
+        self.client = PipelinedModbusTcpClient(ip or defaut_ip, port, max_in_flight=max_in_flight, timeout=timeout)
+        self.commands = CommandWriter()
+        self.loop = None
+        self.reconnects = 0
+        # only for its rate-limited error log; run() does the reconnecting here
+        self.link = LinkSupervisor(self.client, name=LR)
+
+        if initDDS:
+            if network is None:
+                ChannelFactoryInitialize(0)
+            else:
+                ChannelFactoryInitialize(0, network)
+
+        self.pub = None
+        if self.read_touch:
+            self.pub = ChannelPublisher("rt/inspire_hand/touch/"+LR, inspire_hand_touch)
+            self.pub.Init()
+        self.state_pub = ChannelPublisher("rt/inspire_hand/state/"+LR, inspire_hand_state)
+        self.state_pub.Init()
+        self.sub = None
+
+    async def connect(self, max_retries=5, retry_delay=2):
+        """Connect with retries, reset errors and start listening for commands."""
+        for attempt in range(max_retries):
+            try:
+                await self.client.connect()
+                print("Modbus client connected successfully.")
+                break
+            except (OSError, asyncio.TimeoutError) as e:
+                print(f"Connection attempt {attempt + 1} failed: {e}")
+                if attempt + 1 == max_retries:
+                    print("Max retries reached. Could not connect.")
+                    raise ConnectionError("Failed to connect to Modbus server.") from e
+                print(f"Retrying in {retry_delay} seconds...")
+                await asyncio.sleep(retry_delay)
+
+        self.loop = asyncio.get_running_loop()
+        await self.client.write_registers(1004, [1], self.device_id)  # reset error
+        command_block = np.zeros(2 * COMMAND_REGISTERS, dtype=np.uint8)
+        if await self._read_block(COMMAND_START, COMMAND_REGISTERS, command_block):
+            self.commands.load(command_block.view('>u2'))
+        else:
+            print("Could not read the command block, its last values are unknown")
+        if self.sub is None:
+            self.sub = ChannelSubscriber("rt/inspire_hand/ctrl/"+self.LR, inspire_hand_ctrl)
+            self.sub.Init(self.write_registers_callback, 10)
+
+    def write_registers_callback(self, msg:inspire_hand_ctrl):
+        # called on the DDS thread, hand the command over to the event loop
+        if self.loop is not None:
+            asyncio.run_coroutine_threadsafe(self.write_command(msg), self.loop)
+
+    async def write_command(self, msg:inspire_hand_ctrl):
+        # requested modes merged into the fewest writes of 1474-1533, see command_writer.py
+        writes = self.commands.plan(msg)
+        results = await asyncio.gather(*[self.client.write_registers(address, values, self.device_id) for address, values in writes],
+                                       return_exceptions=True)
+        self.commands.commands += 1
+        for (address, values), result in zip(writes, results):
+            self.commands.record(address, values, result is True)
+            if result is not True:
+                self.link.error(f"Error writing registers: {result}" if isinstance(result, Exception) else "Error writing registers")
+        return all(result is True for result in results)
+
+    async def _read_block(self, address, count, raw):
+        try:
+            ok = await self.client.read_holding_registers_into(address, count, self.device_id, raw)
+        except (ConnectionError, asyncio.TimeoutError) as e:
+            self.link.error(f"Error reading registers: {e}")
+            return False
+        if not ok:
+            self.link.error("Error reading registers")
+        return ok
+
+    async def read(self):
+        """Read touch and state data once, with all block reads in flight together, and publish them.
+
+        As in ModbusDataHandler.read(), only complete sweeps are published;
+        blocks that failed keep their last values and are marked stale.
+        Returns the same reused dict as ModbusDataHandler.read().
+        """
+        touch = self.touch_decoder.targets(self.touch_plan) if self.read_touch else []
+        state = self.state_decoder.targets(self.state_plan)
+        results = await asyncio.gather(*[self._read_block(address, count, raw) for address, count, index, block, raw in touch + state])
+
+        groups = [(self.state_decoder, self.state_plan, state, results[len(touch):], self.state_pub, self.messages.state)]
+        if self.read_touch:
+            groups.insert(0, (self.touch_decoder, self.touch_plan, touch, results[:len(touch)], self.pub, self.messages.touch))
+        for decoder, plan, targets, ok, pub, message in groups:
+            failed = {target[2] for target, success in zip(targets, ok) if not success}
+            decoder.mark(plan, failed or None)
+            if not failed:
+                pub.Write(message)
+        return self.messages.result
+
+    async def reconnect(self, initial_backoff=0.1, max_backoff=5.0):
+        """Reopen a lost connection, retrying with capped exponential backoff until it succeeds."""
+        delay = initial_backoff
+        print(f"{self.LR} Modbus connection lost, reconnecting")
+        while True:
+            try:
+                await self.client.reconnect()
+                break
+            except (OSError, asyncio.TimeoutError) as e:
+                print(f"{self.LR} Reconnect failed: {e}, retrying in {delay:.1f} seconds")
+                await asyncio.sleep(delay)
+                delay = min(2 * delay, max_backoff)
+        self.reconnects += 1
+        print(f"{self.LR} Modbus client reconnected.")
+
+    async def run(self, rate=None, report_every=0, max_backoff=5.0):
+        """Read and publish in a loop, reconnecting whenever the connection is lost.
+
+        Args:
+            rate (float, optional): Target cycles per second, None runs as fast as the link allows.
+            report_every (int, optional): Print the cycle rate every N cycles, 0 disables.
+            max_backoff (float, optional): Longest wait in seconds between two reconnect attempts. Defaults to 5.0.
+        """
+        period = 1.0 / rate if rate else 0.0
+        count = 0
+        start = time.perf_counter()
+        next_time = start
+        while True:
+            if not self.client.connected:
+                # reads would fail at once and spin the loop: wait for the hand instead
+                await self.reconnect(max_backoff=max_backoff)
+                next_time = time.perf_counter()
+            await self.read()
+            count += 1
+            if report_every and count % report_every == 0:
+                elapsed = time.perf_counter() - start
+                print(f"{self.LR} Current frequency: {count / elapsed:.2f} Hz, calls: {count}")
+            if period:
+                next_time += period
+                delay = next_time - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    next_time = time.perf_counter()
+            else:
+                await asyncio.sleep(0)
+
+    def close(self):
+        self.client.close()
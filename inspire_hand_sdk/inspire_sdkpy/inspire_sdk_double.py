@@ -1,232 +1,158 @@
 
 from .inspire_hand_defaut import *
-from .inspire_dds import inspire_hand_touch,inspire_hand_ctrl,inspire_hand_state
-from unitree_sdk2py.core.channel import ChannelPublisher, ChannelFactoryInitialize
-from unitree_sdk2py.core.channel import ChannelSubscriber, ChannelFactoryInitialize
-from unitree_sdk2py.utils.thread import Thread
+from .inspire_sdk import ModbusDataHandler
+from .register_codec import decode_registers
 
-from pymodbus.client import ModbusTcpClient
-from pymodbus.client import ModbusSerialClient
-
-import numpy as np
-import struct
-import sys
+import concurrent.futures
 import time
- 
+
 class ModbusDataHandlerDouble:
-    def __init__(self, data=data_sheet, history_length=100, network=None, ip=None, port=6000, device_id=[1,2], use_serial=False, serial_port='/dev/ttyUSB0', baudrate=115200, states_structure=None, initDDS=True, max_retries=5, retry_delay=2):
-        """_summary_
-        Calling self.read() in a loop reads and returns the data, and publishes the DDS message at the same time        
+    def __init__(self, data=data_sheet, ip=None, port=6000, device_id=[1,2], use_serial=False, serial_port='/dev/ttyUSB0', initDDS=True, hand_serial=None, **kwargs):
+        """Driver for a left and a right hand.
+
+        Each hand is a ModbusDataHandler with its own topics (touch/state/ctrl/metrics
+        l and r): a command on ctrl/l only moves device_id[0], one on ctrl/r only
+        device_id[1]. read() reads both hands at the same time. Hands on one link
+        (the same RS-485 bus, or the same TCP gateway) share one client and take
+        turns per transaction, so one hand's requests go out while the other
+        decodes and publishes; hands on different links run fully in parallel.
+
+        The per-hand handlers are in self.hands ([left, right]). Of the single
+        handler this class used to be, client, history, states_structure,
+        connect_to_modbus() and write_registers_callback() remain: client is the
+        left hand's (the shared one on a single link), history the left hand's,
+        and a ctrl message passed to write_registers_callback() still moves both
+        hands. The publishers and the subscriber (pub, pub2, state_pub,
+        state_pub2, sub) are now those of the hands, e.g. hands[1].state_pub.
+
         Args:
-            data (dict, optional): Tactile sensor register definition. Defaults to data_sheet.
-            history_length (int, optional): Hand state history_length. Defaults to 100.
-            network (str, optional): Name of the DDS NIC. Defaults to None.
-            ip (str, optional): ModbusTcp IP. Defaults to None will use 192.1686.11.210.
-            port (int, optional): ModbusTcp IP port. Defaults to 6000.
-            device_id (int, optional): Hand ID. Defaults to 1.
-            LR (str, optional): Topic suffix l or r. Defaults to 'r'.
+            data (dict, optional): Tactile sensor register definition, empty to skip touch. Defaults to data_sheet.
+            ip (str or list, optional): ModbusTcp IP, or [left IP, right IP] for hands on separate links. Defaults to None will use 192.1686.11.210.
+            port (int or list, optional): ModbusTcp IP port, or one per hand. Defaults to 6000.
+            device_id (list, optional): Hand IDs [left, right]. Defaults to [1, 2].
             use_serial (bool, optional): Whether to use serial mode. Defaults to False.
-            serial_port (str, optional): Serial port name. Defaults to '/dev/ttyUSB0'.
-            baudrate (int, optional): Serial baud rate. Defaults to 115200.
-            states_structure (list, optional): List of tuples for state registers. Each tuple should contain (attribute_name, start_address, length, data_type). If None ,will publish All Data
+            serial_port (str or list, optional): Serial port name, or [left port, right port] for two buses. Defaults to '/dev/ttyUSB0'.
             initDDS (bool, optional): Run ChannelFactoryInitialize(0),only need run once in all program
-            max_retries (int, optional): Number of retries for connecting to Modbus server. Defaults to 3.
-            retry_delay (int, optional): Delay between retries in seconds. Defaults to 2.
+            hand_serial (list, optional): [left, right] names of the hands' baseline files. Defaults to None, derived from link and device_id.
+            **kwargs: Any other ModbusDataHandler argument (history_length, baudrate, high_baudrate, transport, touch_format, ...), the same for both hands.
         Raises:
             ConnectionError: raise when connection fails after max_retries
-        """        
+        """
+        def per_hand(value):
+            return list(value) if isinstance(value, (list, tuple)) else [value, value]
+
         self.data = data
-        self.history_length = history_length
-        self.history = {
-            'POS_ACT': [np.zeros(history_length) for _ in range(6)],
-            'ANGLE_ACT': [np.zeros(history_length) for _ in range(6)],
-            'FORCE_ACT': [np.zeros(history_length) for _ in range(6)],
-            'CURRENT': [np.zeros(history_length) for _ in range(6)],
-            'ERROR': [np.zeros(history_length) for _ in range(6)],
-            'STATUS': [np.zeros(history_length) for _ in range(6)],
-            'TEMP': [np.zeros(history_length) for _ in range(6)]
-        }
         self.use_serial = use_serial
-        
-        self.states_structure = states_structure or [
-            ('pos_act', 1534, 6, 'short'),
-            ('angle_act', 1546, 6, 'short'),
-            ('force_act', 1582, 6, 'short'),
-            ('current', 1594, 6, 'short'),
-            ('err', 1606, 3, 'byte'),
-            ('status', 1612, 3, 'byte'),
-            ('temperature', 1618, 3, 'byte')
-        ]
-        if self.use_serial:
-            self.client = ModbusSerialClient(method='rtu', port=serial_port, baudrate=baudrate, timeout=1)
-        else:
-            if ip==None:
-                self.client = ModbusTcpClient(defaut_ip, port=6000)
-            else:
-                self.client = ModbusTcpClient(ip, port=port)
-                
-        # Try to connect to Modbus server with retry mechanism
-        self.connect_to_modbus(max_retries, retry_delay)     
         self.device_id = device_id
-       # 初始化 ChannelFactory
-        try:
-            if initDDS:
-                if network is None:
-                    ChannelFactoryInitialize(0, network)
-                else:
-                    ChannelFactoryInitialize(0)
-                
-        except Exception as e:
-            print(f"Error during ChannelFactory initialization: {e}")
-            # 这里可以添加日志记录或其他恢复机制
-            return
-        
-        self.client.write_register(1004,1,self.device_id[0]) #reser error
-        self.client.write_register(1004,1,self.device_id[1]) #reser error
-
-        if not self.use_serial:
-            self.pub = ChannelPublisher("rt/inspire_hand/touch/l", inspire_hand_touch)
-            self.pub.Init()
-
-            self.pub2 = ChannelPublisher("rt/inspire_hand/touch/r", inspire_hand_touch)
-            self.pub2.Init()
-
-        self.state_pub = ChannelPublisher("rt/inspire_hand/state/l", inspire_hand_state)
-        self.state_pub.Init()
-        
-        self.state_pub2 = ChannelPublisher("rt/inspire_hand/state/r", inspire_hand_state)
-        self.state_pub2.Init()  
-         
-        self.sub = ChannelSubscriber("rt/inspire_hand/ctrl/l", inspire_hand_ctrl)
-        self.sub.Init(self.write_registers_callback, 10)
-        
-        self.sub = ChannelSubscriber("rt/inspire_hand/ctrl/r", inspire_hand_ctrl)
-        self.sub.Init(self.write_registers_callback, 10)           
-                   
+        ips, ports, serial_ports = per_hand(ip), per_hand(port), per_hand(serial_port)
+        hand_serials = per_hand(hand_serial)
+        keys = [link_key(use_serial, serial_ports[i], ips[i] or defaut_ip, ports[i] if ips[i] else 6000) for i in range(2)]
+        # both hands on one link: the second hand reuses the client and the supervisor of the first
+        self.shared_link = keys[0] == keys[1]
+
+        self.hands = []
+        for i, LR in enumerate(('l', 'r')):
+            first = self.hands[0] if self.hands and self.shared_link else None
+            self.hands.append(ModbusDataHandler(
+                data=data, ip=ips[i], port=ports[i], device_id=device_id[i], LR=LR, use_serial=use_serial,
+                serial_port=serial_ports[i], initDDS=initDDS and i == 0, hand_serial=hand_serials[i],
+                client=first.client if first else None, link=first.link if first else None, **kwargs))
+        if self.shared_link:
+            # a failed switch of the right hand takes the bus, the left hand included, back to the old rate
+            self.hands[0].sync_baudrate()
+
+        self.messages = [hand.messages for hand in self.hands]
+        self.metrics = [hand.metrics for hand in self.hands]
+        self.commands = [hand.commands for hand in self.hands]
+        self._results = [hand.messages.result for hand in self.hands]
+        # the right hand is read on this thread while the caller reads the left one
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="inspire-double")
+        self._start = None
+
+    @property
+    def client(self):
+        return self.hands[0].client
+
+    @property
+    def history(self):
+        return self.hands[0].history
+
+    @property
+    def states_structure(self):
+        return self.hands[0].states_structure
+
     def connect_to_modbus(self, max_retries, retry_delay):
-        """Connect to Modbus server and retry on failure"""
-        retries = 0
-        while retries < max_retries:
-            try:
-                if not self.client.connect():
-                    raise ConnectionError("Failed to connect to Modbus server.")
-                print("Modbus client connected successfully.")
-                return
-            except ConnectionError as e:
-                print(f"Connection attempt {retries + 1} failed: {e}")
-                retries += 1
-                if retries < max_retries:
-                    print(f"Retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
-                else:
-                    print("Max retries reached. Could not connect.")
-                    raise   
-    def write_registers_callback(self,msg:inspire_hand_ctrl):
-        with modbus_lock:
-            if msg.mode & 0b0001:  # Mode 1 - Angle
-                self.client.write_registers(1486, msg.angle_set, self.device_id[0])
-                self.client.write_registers(1486, msg.angle_set, self.device_id[1])
-
-                # print('angle_set')
-            if msg.mode & 0b0010:  # Mode 2 - Position
-                self.client.write_registers(1474, msg.pos_set, self.device_id[0])
-                self.client.write_registers(1474, msg.pos_set, self.device_id[1])
-
-                # print('pos_set')
-
-            if msg.mode & 0b0100:  # Mode 4 - Force control
-                self.client.write_registers(1498, msg.force_set, self.device_id[0])
-                self.client.write_registers(1498, msg.force_set, self.device_id[1])
-
-                # print('force_set')
-
-            if msg.mode & 0b1000:  # Mode 8 - Speed
-                self.client.write_registers(1522, msg.speed_set, self.device_id[0])
-                self.client.write_registers(1522, msg.speed_set, self.device_id[1])
+        """Connect the client of every link, see ModbusDataHandler.connect_to_modbus"""
+        for hand in self._link_owners():
+            hand.connect_to_modbus(max_retries, retry_delay)
 
-    def read(self):
-        if not self.use_serial:
-            touch_msg = get_inspire_hand_touch()
-            touch_msg2 = get_inspire_hand_touch()
-
-            matrixs = {}
-            matrixs2 = {}
-
-            for i, (name, addr, length, size, var) in enumerate(self.data):
-                value = self.read_and_parse_registers(addr, length // 2,'short',device_id=self.device_id[0])
-                value2 = self.read_and_parse_registers(addr, length // 2,'short',device_id=self.device_id[1])
-
-                if value is not None:
-                    setattr(touch_msg, var, value)
-                    setattr(touch_msg2, var, value2)
-
-                    matrix = np.array(value).reshape(size)
-                    matrixs2 = np.array(value2).reshape(size)
-
-                    matrixs[var]=matrix
-                    matrixs2[var]=matrixs2
-
-                    # matrixs.append(matrix)
-            self.pub.Write(touch_msg)
-            self.pub2.Write(touch_msg2)
-
-        else:
-            matrixs = {}
-        # Read the states for POS_ACT, ANGLE_ACT, etc.
-        states_msg = get_inspire_hand_state()
-        states_msg2 = get_inspire_hand_state()
-
-        for attr_name, start_address, length, data_type in self.states_structure:
-            setattr(states_msg, attr_name, self.read_and_parse_registers(start_address, length, data_type,device_id=self.device_id[0]))
-            setattr(states_msg2, attr_name, self.read_and_parse_registers(start_address, length, data_type,device_id=self.device_id[1]))
-
-        self.state_pub.Write(states_msg)
-        self.state_pub2.Write(states_msg2)
-
-        return [{'states':{
-            'POS_ACT': states_msg.pos_act,
-            'ANGLE_ACT': states_msg.angle_act,
-            'FORCE_ACT': states_msg.force_act,
-            'CURRENT': states_msg.current,
-            'ERROR': states_msg.err,
-            'STATUS': states_msg.status,
-            'TEMP': states_msg.temperature
-        },'touch':matrixs
-                },{'states':{
-            'POS_ACT': states_msg2.pos_act,
-            'ANGLE_ACT': states_msg2.angle_act,
-            'FORCE_ACT': states_msg2.force_act,
-            'CURRENT': states_msg2.current,
-            'ERROR': states_msg2.err,
-            'STATUS': states_msg2.status,
-            'TEMP': states_msg2.temperature
-        },'touch':matrixs
-                }]
+    def write_registers_callback(self, msg):
+        """Apply one ctrl message to both hands"""
+        for hand in self.hands:
+            hand.write_registers_callback(msg)
 
-    def read_and_parse_registers(self, start_address, num_registers, data_type='short',device_id=1):
-         with modbus_lock:
-            # Read registers
-            response = self.client.read_holding_registers(start_address, num_registers, device_id)
-
-            if not response.isError():
-                if data_type == 'short':
-                    # Pack the read registers into binary data
-                    packed_data = struct.pack('>' + 'H' * num_registers, *response.registers)
-                    # Unpack registers into signed 16-bit integers (short)
-                    angles = struct.unpack('>' + 'h' * num_registers, packed_data)
-                    return angles
-                elif data_type == 'byte':
-                    # Split each 16-bit register into two 8-bit (uint8) data
-                    byte_list = []
-                    for reg in response.registers:
-                        high_byte = (reg >> 8) & 0xFF  # High 8 bits
-                        low_byte = reg & 0xFF          # Low 8 bits
-                        byte_list.append(high_byte)
-                        byte_list.append(low_byte)
-                    return byte_list
-            else:
-                print("Error reading registers")
-                return None
-            
+    def _link_owners(self):
+        """The hands that own a link: both, or only the left one when they share it."""
+        return self.hands[:1] if self.shared_link else self.hands
+
+    def _hand(self, device_id):
+        for hand in self.hands:
+            if hand.device_id == device_id:
+                return hand
+        raise ValueError(f"device_id {device_id} is not one of the hands {list(self.device_id)}")
 
+    def write_registers(self, start_address, values, device_id=1):
+        """Write holding registers of one hand as one transaction under the link lock, returns True on success; raises ValueError for an unknown device_id"""
+        return self._hand(device_id).write_registers(start_address, values)
 
+    def read(self):
+        """Read touch and state data of both hands once and publish them.
+
+        The returned list, dicts and arrays are reused: they are views on the
+        handler's register buffers and are overwritten by the next read(); copy
+        them to keep a frame.
+        """
+        if self._start is None:
+            self._start = time.perf_counter()
+        right = self._executor.submit(self.hands[1].read)
+        self.hands[0].read()
+        right.result()
+        return self._results
+
+    def stats(self):
+        """Per-hand throughput since the first read(): cycles, cycles/s, cycle time, link state, command, mailbox (None without control_rate) and touch filter counts."""
+        elapsed = time.perf_counter() - self._start if self._start is not None else 0.0
+        stats = {}
+        for hand in self.hands:
+            cycle = hand.metrics.histograms['cycle'].summary()
+            stats[hand.LR] = {
+                'cycles': cycle['count'],
+                'rate': cycle['count'] / elapsed if elapsed > 0 else 0.0,
+                'cycle_p50_us': cycle['p50_us'],
+                'cycle_p99_us': cycle['p99_us'],
+                'link': hand.link.state,
+                'commands': hand.commands.stats(),
+                'mailbox': hand.mailbox.stats() if hand.mailbox is not None else None,
+                'touch': hand.touch_filter.stats() if hand.touch_filter is not None else None,
+            }
+        return stats
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        for hand in self.hands:
+            if hand.touch_baseline is not None:
+                hand.touch_baseline.save()
+        # a shared link and its client belong to the left hand, close them once
+        for hand in self._link_owners():
+            hand.link.close()
+            hand.client.close()
+
+    def read_registers(self, start_address, num_registers, device_id=1):
+        """Read raw holding registers of one hand, returns the register list or None on error; raises ValueError for an unknown device_id"""
+        return self._hand(device_id).read_registers(start_address, num_registers)
+
+    def read_and_parse_registers(self, start_address, num_registers, data_type='short',device_id=1):
+        registers = self.read_registers(start_address, num_registers, device_id)
+        if registers is None:
+            return None
+        return decode_registers(registers, data_type)
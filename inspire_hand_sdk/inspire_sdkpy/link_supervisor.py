@@ -0,0 +1,160 @@
+"""
+Health tracking and background reconnection for one Modbus link.
+
+The handler reports the outcome of every transaction. Consecutive failures
+move the link from CONNECTED to DEGRADED and then to RECONNECTING; while
+reconnecting, transactions are refused immediately instead of waiting for
+timeouts, and a background thread reopens the client with capped exponential
+backoff. Nothing here sleeps on the caller's thread, so a dropped hand never
+stalls the loops of other hands. The supervisor is the only place that
+reopens the client: it holds the link lock while it closes, reconnects and
+probes, so no transaction of another handler on the link runs in between, and
+the transports do not reconnect on their own behind its backoff. Failed transactions are logged through
+error(), at most one line per log_interval, so an outage does not flood
+stdout at the read rate.
+"""
+
+import collections
+import threading
+import time
+
+CONNECTED = 'connected'
+DEGRADED = 'degraded'
+RECONNECTING = 'reconnecting'
+
+
+class LinkSupervisor:
+    """Link health state machine with background reconnect.
+
+    Args:
+        client: pymodbus client (anything with connect() and close()).
+        name (str, optional): Label used in log lines. Defaults to ''.
+        probe (callable, optional): probe() -> bool run after a reconnect, with
+            the link lock held, to confirm the hand answers. Defaults to None
+            (connect() is enough).
+        lock (threading.Lock, optional): Link lock held around close, connect
+            and probe, see link_lock(). Defaults to None, a lock of its own.
+        degraded_after (int, optional): Consecutive failures before DEGRADED. Defaults to 1.
+        lost_after (int, optional): Consecutive failures before RECONNECTING. Defaults to 5.
+        initial_backoff (float, optional): First retry delay in seconds. Defaults to 0.1.
+        max_backoff (float, optional): Retry delay cap in seconds. Defaults to 5.0.
+        history (int, optional): Finished outages kept for reporting. Defaults to 100.
+        log_interval (float, optional): Seconds between two transaction error lines, see error(). Defaults to 5.0.
+    """
+
+    def __init__(self, client, name='', probe=None, lock=None, degraded_after=1, lost_after=5, initial_backoff=0.1, max_backoff=5.0, history=100, log_interval=5.0):
+        self.client = client
+        self.name = name
+        self.probe = probe
+        self.lock = lock if lock is not None else threading.Lock()
+        self.degraded_after = degraded_after
+        self.lost_after = lost_after
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.state = CONNECTED
+        self.failures = 0
+        self.reconnects = 0
+        self.outages = collections.deque(maxlen=history)  # (start time.time(), duration s)
+        self._outage_start = None
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._guard = threading.Lock()
+        self.log_interval = log_interval
+        self.errors = 0
+        self._last_log = None
+        self._suppressed = 0
+
+    @property
+    def available(self):
+        """False while reconnecting: callers should skip the transaction."""
+        return self.state != RECONNECTING
+
+    def record(self, ok):
+        """Report the outcome of one transaction."""
+        if ok:
+            if self.state != CONNECTED:
+                with self._guard:
+                    if self.state == DEGRADED:
+                        self._set_state(CONNECTED)
+            self.failures = 0
+            return
+        with self._guard:
+            if self.state == RECONNECTING:
+                return
+            self.failures += 1
+            if self._outage_start is None:
+                self._outage_start = time.time()
+            if self.failures >= self.lost_after:
+                self._set_state(RECONNECTING)
+                self._start_reconnect()
+            elif self.failures >= self.degraded_after and self.state == CONNECTED:
+                self._set_state(DEGRADED)
+
+    def error(self, message):
+        """Log a failed transaction: one line per log_interval at most, counting the errors left out in between."""
+        self.errors += 1
+        now = time.monotonic()
+        if self._last_log is not None and now - self._last_log < self.log_interval:
+            self._suppressed += 1
+            return
+        if self._suppressed:
+            message = f"{message} ({self._suppressed} more errors since the last report)"
+        print(f"Modbus link {self.name}: {message}")
+        self._last_log = now
+        self._suppressed = 0
+
+    def _set_state(self, state):
+        if state == self.state:
+            return
+        print(f"Modbus link {self.name}: {self.state} -> {state}")
+        self.state = state
+        if state == CONNECTED and self._outage_start is not None:
+            duration = time.time() - self._outage_start
+            self.outages.append((self._outage_start, duration))
+            print(f"Modbus link {self.name}: outage of {duration:.3f} s")
+            self._outage_start = None
+
+    def _start_reconnect(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._reconnect_loop, daemon=True, name=f"inspire-reconnect-{self.name}")
+        self._thread.start()
+
+    def _reconnect_loop(self):
+        delay = self.initial_backoff
+        while not self._stop_event.is_set():
+            try:
+                with self.lock:
+                    self.client.close()
+                    ok = bool(self.client.connect()) and (self.probe is None or self.probe())
+            except Exception as e:
+                print(f"Modbus link {self.name}: reconnect failed: {e}")
+                ok = False
+            if ok:
+                with self._guard:
+                    self.failures = 0
+                    self.reconnects += 1
+                    self._set_state(CONNECTED)
+                return
+            self._stop_event.wait(delay)
+            delay = min(delay * 2, self.max_backoff)
+
+    def current_outage(self):
+        """Seconds since the running outage began, 0.0 if the link is healthy."""
+        start = self._outage_start
+        return time.time() - start if start is not None else 0.0
+
+    def stats(self):
+        durations = [duration for start, duration in self.outages]
+        return {
+            'state': self.state,
+            'reconnects': self.reconnects,
+            'outages': len(durations),
+            'outage_total': sum(durations),
+            'outage_max': max(durations) if durations else 0.0,
+            'current_outage': self.current_outage(),
+            'errors': self.errors,
+        }
+
+    def close(self):
+        self._stop_event.set()
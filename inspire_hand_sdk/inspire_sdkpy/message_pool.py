@@ -0,0 +1,59 @@
+"""
+Reusable DDS messages for the publish path.
+
+The touch and state messages of a hand are created once and their sequence
+fields are bound to the RegisterDecoder views, so refilling the register
+buffers is all it takes to update them. The dict returned by read() is built
+once as well and points at the same views.
+"""
+
+from .inspire_hand_defaut import get_inspire_hand_touch, get_inspire_hand_state, get_inspire_hand_touch_frame
+from .register_codec import FIELD_DTYPES
+
+STATE_KEYS = (
+    ('POS_ACT', 'pos_act'),
+    ('ANGLE_ACT', 'angle_act'),
+    ('FORCE_ACT', 'force_act'),
+    ('CURRENT', 'current'),
+    ('ERROR', 'err'),
+    ('STATUS', 'status'),
+    ('TEMP', 'temperature'),
+)
+
+
+class MessagePool:
+    """Touch/state messages and read() result of one hand, refilled in place.
+
+    Args:
+        state_decoder (RegisterDecoder): Decoder holding the state fields.
+        touch_decoder (RegisterDecoder, optional): Decoder holding the tactile
+            regions, None when touch is not read (serial mode below
+            TOUCH_MIN_BAUDRATE).
+
+    Attributes:
+        touch (inspire_hand_touch): Touch message, None without touch_decoder.
+        touch_frame (inspire_hand_touch_frame): The same taxels as one flat
+            frame (the decoder's whole register array), None without touch_decoder.
+        state (inspire_hand_state): State message.
+        result (dict): {'states': {...}, 'touch': {...}} as returned by read().
+    """
+
+    def __init__(self, state_decoder, touch_decoder=None):
+        self.state = get_inspire_hand_state()
+        for var, value in state_decoder.values.items():
+            setattr(self.state, var, value)
+
+        if touch_decoder is not None:
+            self.touch = get_inspire_hand_touch()
+            for var, value in touch_decoder.values.items():
+                setattr(self.touch, var, value)
+            matrices = touch_decoder.matrices
+            self.touch_frame = get_inspire_hand_touch_frame()
+            self.touch_frame.data = touch_decoder.registers.view(FIELD_DTYPES['short'])
+        else:
+            self.touch = None
+            self.touch_frame = None
+            matrices = {}
+
+        self.states = {key: getattr(self.state, var) for key, var in STATE_KEYS}
+        self.result = {'states': self.states, 'touch': matrices}
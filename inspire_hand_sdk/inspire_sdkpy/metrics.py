@@ -0,0 +1,205 @@
+"""
+Hot-path phase timing of the driver.
+
+Every phase of a cycle is recorded into a fixed-size latency histogram:
+logarithmic buckets, eight per octave from 1 us to about 16 s, so recording
+is an index computation and an increment and memory never grows. Most
+phases are only recorded by the acquisition thread, but ``command`` and
+``write`` are also recorded on the DDS callback thread when commands are
+written from it, while the acquisition thread reads and restarts windows, so
+every histogram takes its own (uncontended, allocation-free) lock.
+
+``HandMetrics.snapshot()`` returns the figures since start (or since
+reset()), ``HandMetrics.message()`` the figures of the window since the
+previous message, for the ``rt/inspire_hand/metrics/<LR>`` topic.
+"""
+
+import math
+import threading
+import time
+
+from .inspire_dds import inspire_hand_metrics
+
+PHASES = (
+    'cycle',      # one read(): every Modbus read, decode and DDS write
+    'lock_wait',  # waiting for the link lock before a read transaction
+    'rtt',        # one read transaction, request to decoded response
+    'decode',     # storing responses in the register buffers
+    'dds_write',  # one touch or state Write()
+    'command',    # ctrl message received to its registers written
+    'write',      # one command write transaction
+)
+
+BUCKETS_PER_OCTAVE = 8
+OCTAVES = 24
+
+
+class LatencyHistogram:
+    """Fixed-memory histogram of durations in seconds.
+
+    Percentiles are reported as the upper bound of their bucket, i.e. at most
+    9% (2 ** (1/8)) above the true value.
+    """
+
+    SIZE = BUCKETS_PER_OCTAVE * OCTAVES + 1  # bucket 0 holds everything below 1 us
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self.counts = [0] * self.SIZE
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        # state at the start of the current window
+        self._mark_counts = [0] * self.SIZE
+        self._mark_count = 0
+        self._mark_total = 0.0
+        self._window_max = 0.0
+
+    def record(self, seconds):
+        us = seconds * 1e6
+        if us < 1.0:
+            index = 0
+        else:
+            index = int(math.log2(us) * BUCKETS_PER_OCTAVE) + 1
+            if index >= self.SIZE:
+                index = self.SIZE - 1
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+            if seconds > self._window_max:
+                self._window_max = seconds
+
+    @staticmethod
+    def upper_us(index):
+        """Upper bound of a bucket in microseconds."""
+        return 2.0 ** (index / BUCKETS_PER_OCTAVE)
+
+    @classmethod
+    def _percentile(cls, counts, count, q):
+        if count == 0:
+            return 0.0
+        rank = q / 100.0 * count
+        seen = 0
+        for index, n in enumerate(counts):
+            seen += n
+            if seen >= rank and n:
+                return cls.upper_us(index)
+        return cls.upper_us(cls.SIZE - 1)
+
+    @classmethod
+    def _summary(cls, counts, count, total, peak):
+        return {
+            'count': count,
+            'mean_us': total / count * 1e6 if count else 0.0,
+            'p50_us': cls._percentile(counts, count, 50),
+            'p95_us': cls._percentile(counts, count, 95),
+            'p99_us': cls._percentile(counts, count, 99),
+            'max_us': peak * 1e6,
+        }
+
+    def summary(self):
+        """Figures since start or reset()."""
+        with self._lock:
+            counts, count, total, peak = list(self.counts), self.count, self.total, self.max
+        return self._summary(counts, count, total, peak)
+
+    def window(self):
+        """Figures since the previous window() call, then start a new window."""
+        with self._lock:
+            counts = [n - m for n, m in zip(self.counts, self._mark_counts)]
+            count, total, peak = self.count - self._mark_count, self.total - self._mark_total, self._window_max
+            self._mark_counts[:] = self.counts
+            self._mark_count = self.count
+            self._mark_total = self.total
+            self._window_max = 0.0
+        return self._summary(counts, count, total, peak)
+
+    def reset(self):
+        with self._lock:
+            self._clear()
+
+
+class HandMetrics:
+    """Phase histograms of one hand.
+
+    Args:
+        interval (float, optional): Seconds between metrics messages, None
+            disables them. Defaults to 1.0.
+        clock (callable, optional): Time source. Defaults to time.perf_counter.
+
+    Attributes:
+        histograms (dict): Phase name -> LatencyHistogram, see PHASES.
+    """
+
+    def __init__(self, interval=1.0, clock=None):
+        self.interval = interval
+        self.clock = clock or time.perf_counter
+        self.histograms = {phase: LatencyHistogram() for phase in PHASES}
+        self._window_start = self.clock()
+        self._message = inspire_hand_metrics(
+            phase=list(PHASES),
+            count=[0] * len(PHASES),
+            mean_us=[0.0] * len(PHASES),
+            p50_us=[0.0] * len(PHASES),
+            p95_us=[0.0] * len(PHASES),
+            p99_us=[0.0] * len(PHASES),
+            max_us=[0.0] * len(PHASES),
+            window_s=0.0,
+            cycle_rate=0.0,
+            commands_superseded=0,
+            commands_stale=0,
+        )
+
+    def record(self, phase, seconds):
+        self.histograms[phase].record(seconds)
+
+    def snapshot(self):
+        """{phase: {'count', 'mean_us', 'p50_us', 'p95_us', 'p99_us', 'max_us'}} since start or reset()."""
+        return {phase: histogram.summary() for phase, histogram in self.histograms.items()}
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
+        self._window_start = self.clock()
+
+    def due(self, now=None):
+        """True when the next metrics message should be sent."""
+        if self.interval is None:
+            return False
+        if now is None:
+            now = self.clock()
+        return now - self._window_start >= self.interval
+
+    def message(self, now=None, mailbox=None):
+        """Fill and return the reused inspire_hand_metrics message with the current window.
+
+        Args:
+            now (float, optional): End of the window. Defaults to None, clock().
+            mailbox (CommandMailbox, optional): Source of the superseded/stale command counts. Defaults to None, leaving them 0.
+        """
+        if now is None:
+            now = self.clock()
+        msg = self._message
+        for i, phase in enumerate(PHASES):
+            window = self.histograms[phase].window()
+            msg.count[i] = window['count']
+            msg.mean_us[i] = window['mean_us']
+            msg.p50_us[i] = window['p50_us']
+            msg.p95_us[i] = window['p95_us']
+            msg.p99_us[i] = window['p99_us']
+            msg.max_us[i] = window['max_us']
+            if phase == 'cycle':
+                cycles = window['count']
+        msg.window_s = now - self._window_start
+        msg.cycle_rate = cycles / msg.window_s if msg.window_s > 0 else 0.0
+        if mailbox is not None:
+            msg.commands_superseded = mailbox.superseded & 0xFFFFFFFF
+            msg.commands_stale = mailbox.stale & 0xFFFFFFFF
+        self._window_start = now
+        return msg
@@ -2,6 +2,7 @@ import pyqtgraph as pg
 from PyQt5 import QtCore
 from PyQt5.QtWidgets import QApplication, QMainWindow, QTabWidget, QWidget, QGridLayout,QLabel,QVBoxLayout
 from .inspire_hand_defaut import *
+from .acquisition import AcquisitionThread
 import colorcet  # 确保安装 colorcet 库
 import numpy as np
 import time
@@ -146,7 +147,13 @@ class CurveTab(QWidget):
   
   
 class MainWindow(QMainWindow):
-    def __init__(self, data_handler, data=data_sheet,dt=100,name="Qt with PyQtGraph",Plot_touch=True,run_time=False):
+    def __init__(self, data_handler, data=data_sheet,dt=100,name="Qt with PyQtGraph",Plot_touch=True,run_time=False,acquisition_rate=None):
+        """
+        Args:
+            acquisition_rate (float, optional): If set, data_handler.read() runs on an AcquisitionThread
+                at this rate and the plot timer only picks up its latest snapshot, so a slow read
+                never blocks the window. Defaults to None, which reads on the Qt timer.
+        """
         super().__init__()
         self.setWindowTitle(name)
         self.setGeometry(100, 100, 800, 600)
@@ -154,6 +161,11 @@ class MainWindow(QMainWindow):
         self.data_handler = data_handler
         self.Plot_touch_=Plot_touch
         self.run_time=run_time
+        self.acquisition = None
+        self.last_seq = None
+        if acquisition_rate:
+            self.acquisition = AcquisitionThread(data_handler, rate=acquisition_rate)
+            self.acquisition.start()
         self.tabs = QTabWidget()
         self.image_tab = ImageTab(data)
         self.curve_tab = CurveTab(data)
@@ -165,7 +177,16 @@ class MainWindow(QMainWindow):
         
     def update_plot(self):
         start_time = time.time()  # 记录开始时间
-        data_dict =self.data_handler.read()
+        if self.acquisition is not None:
+            snapshot = self.acquisition.latest()
+            if snapshot is None or snapshot.seq == self.last_seq:
+                return
+            # plotting takes longer than an acquisition cycle, so plot a private copy
+            snapshot = self.acquisition.latest_copy()
+            self.last_seq = snapshot.seq
+            data_dict = snapshot.data
+        else:
+            data_dict =self.data_handler.read()
         end_time = time.time()  # 记录结束时间
         self.curve_tab.update_plot(data_dict['states'])
         if self.Plot_touch_:
@@ -177,4 +198,9 @@ class MainWindow(QMainWindow):
     def reflash(self):
         self.timer = QtCore.QTimer()
         self.timer.timeout.connect(self.update_plot)
-        self.timer.start(self.dt)  # Update every 100 ms
\ No newline at end of file
+        self.timer.start(self.dt)  # Update every 100 ms
+
+    def closeEvent(self, event):
+        if self.acquisition is not None:
+            self.acquisition.stop()
+        super().closeEvent(event)
\ No newline at end of file
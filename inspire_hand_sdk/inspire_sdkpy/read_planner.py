@@ -0,0 +1,275 @@
+"""
+Read planner for the Inspire hand register map.
+
+The register map is laid out in byte addresses: a field that holds ``n``
+registers starting at ``addr`` ends at ``addr + 2 * n`` (``data_sheet`` lists
+18 bytes / 9 registers at 3000 and the next region at 3018). The planner merges
+fields that are adjacent or separated by at most ``max_gap`` registers into
+spans, and cuts every span into as few ``read_holding_registers`` requests as
+the 125-register Modbus limit allows. The register values of one span are
+collected in order, so a field is a plain slice of its span no matter how many
+requests were needed to fetch it.
+"""
+
+import time
+
+MAX_READ_REGISTERS = 125   # Modbus FC3 limit per request
+REGISTER_BYTES = 2         # address units covered by one register
+
+
+class ReadField:
+    """One named field of the register map.
+
+    Args:
+        var (str): Attribute name in the DDS message (e.g. "palm_touch").
+        address (int): Start address.
+        count (int): Number of registers.
+        data_type (str): 'short' or 'byte', as in states_structure.
+        shape (tuple, optional): Matrix shape of the field, for tactile regions.
+    """
+    __slots__ = ('var', 'address', 'count', 'data_type', 'shape')
+
+    def __init__(self, var, address, count, data_type='short', shape=None):
+        self.var = var
+        self.address = address
+        self.count = count
+        self.data_type = data_type
+        self.shape = shape
+
+    @property
+    def end(self):
+        """First address after the field."""
+        return self.address + self.count * REGISTER_BYTES
+
+    def __repr__(self):
+        return f"ReadField({self.var!r}, {self.address}, {self.count}, {self.data_type!r})"
+
+
+def fields_from_data_sheet(data):
+    """Build ReadFields from a data_sheet style list (name, addr, length, size, var)."""
+    return [ReadField(var, addr, length // 2, 'short', size) for name, addr, length, size, var in data]
+
+
+def fields_from_states_structure(states_structure):
+    """Build ReadFields from a states_structure style list (attr, addr, length, type)."""
+    return [ReadField(attr, addr, length, data_type) for attr, addr, length, data_type in states_structure]
+
+
+class ReadSpan:
+    """A contiguous run of registers covering one or more fields.
+
+    Attributes:
+        address (int): Start address of the span.
+        count (int): Number of registers in the span.
+        fields (list): (ReadField, register offset in the span) pairs.
+    """
+    __slots__ = ('address', 'count', 'fields')
+
+    def __init__(self, field):
+        self.address = field.address
+        self.count = field.count
+        self.fields = [(field, 0)]
+
+    @property
+    def end(self):
+        return self.address + self.count * REGISTER_BYTES
+
+    def add(self, field):
+        offset = (field.address - self.address) // REGISTER_BYTES
+        self.count = max(self.count, offset + field.count)
+        self.fields.append((field, offset))
+
+
+class ReadPlan:
+    """Compiled set of block reads for a list of fields.
+
+    Args:
+        fields (list): ReadField list, in any order.
+        max_gap (int, optional): Largest hole, in registers, that may be read
+            and discarded to merge two fields into one span. Defaults to 0,
+            which only merges fields that touch.
+        max_registers (int, optional): Register limit of one request.
+            Defaults to MAX_READ_REGISTERS.
+
+    Attributes:
+        spans (list): ReadSpan list, sorted by address.
+        blocks (list): (address, count, span index, register offset in span)
+            for every request of one sweep, in address order.
+    """
+
+    def __init__(self, fields, max_gap=0, max_registers=MAX_READ_REGISTERS):
+        if max_gap < 0:
+            raise ValueError("max_gap must be >= 0")
+        if max_registers < 1 or max_registers > MAX_READ_REGISTERS:
+            raise ValueError(f"max_registers must be in 1..{MAX_READ_REGISTERS}")
+        self.fields = list(fields)
+        self.max_gap = max_gap
+        self.max_registers = max_registers
+
+        self.spans = []
+        for field in sorted(self.fields, key=lambda f: f.address):
+            if self.spans:
+                span = self.spans[-1]
+                gap = (field.address - span.end) // REGISTER_BYTES
+                if gap <= max_gap:
+                    span.add(field)
+                    continue
+            self.spans.append(ReadSpan(field))
+
+        self.blocks = []
+        for index, span in enumerate(self.spans):
+            for offset in range(0, span.count, max_registers):
+                count = min(max_registers, span.count - offset)
+                self.blocks.append((span.address + offset * REGISTER_BYTES, count, index, offset))
+
+    def __len__(self):
+        return len(self.blocks)
+
+    @property
+    def register_count(self):
+        """Total number of registers transferred by one sweep."""
+        return sum(span.count for span in self.spans)
+
+    def execute(self, read_block):
+        """Run every block of the plan and slice the result back into fields.
+
+        Args:
+            read_block (callable): read_block(address, count) returning a list
+                of raw register values, or None on error.
+
+        Returns:
+            dict: var -> list of raw (unsigned) register values. Fields whose
+            span could not be read completely are left out.
+        """
+        spans = [[] for _ in self.spans]
+        failed = set()
+        for address, count, index, offset in self.blocks:
+            if index in failed:
+                continue
+            registers = read_block(address, count)
+            if registers is None:
+                failed.add(index)
+                continue
+            spans[index].extend(registers)
+
+        values = {}
+        for index, span in enumerate(self.spans):
+            if index in failed:
+                continue
+            registers = spans[index]
+            for field, offset in span.fields:
+                values[field.var] = registers[offset:offset + field.count]
+        return values
+
+    def describe(self):
+        """Human readable summary of the plan."""
+        lines = [f"{len(self.fields)} fields -> {len(self.spans)} spans, {len(self.blocks)} reads, "
+                 f"{self.register_count} registers (max_gap={self.max_gap})"]
+        for address, count, index, offset in self.blocks:
+            lines.append(f"  read {address}..{address + count * REGISTER_BYTES - 1} ({count} registers)")
+        return "\n".join(lines)
+
+
+class AdaptiveReadPlan:
+    """Chooses between one wide span read and several narrow reads by measured cost.
+
+    A wide read fetches everything between the first and the last field in as
+    few requests as possible, at the price of transferring the holes between
+    them; narrow reads only fetch the fields themselves. Which one is cheaper
+    depends on the link (RTT on TCP, bytes on the wire on RTU), so both are timed
+    for `trials` sweeps each and the faster one by median is kept. The choice is
+    re-checked every `reprobe_interval` sweeps.
+
+    Args:
+        fields (list): ReadField list.
+        mode (str, optional): 'auto', 'wide' or 'narrow'. Defaults to 'auto'.
+        trials (int, optional): Timed sweeps per candidate. Defaults to 10.
+        reprobe_interval (int, optional): Sweeps between re-checks, 0 disables. Defaults to 5000.
+        clock (callable, optional): Time source. Defaults to time.perf_counter.
+    """
+
+    def __init__(self, fields, mode='auto', trials=10, reprobe_interval=5000, clock=None):
+        if mode not in ('auto', 'wide', 'narrow'):
+            raise ValueError("mode must be 'auto', 'wide' or 'narrow'")
+        fields = list(fields)
+        self.wide = ReadPlan(fields, max_gap=MAX_READ_REGISTERS)
+        self.narrow = ReadPlan(fields, max_gap=0)
+        self.mode = mode
+        self.trials = trials
+        self.reprobe_interval = reprobe_interval
+        self.clock = clock or time.perf_counter
+        if mode == 'narrow' or len(self.wide) == len(self.narrow):
+            self.plan = self.narrow
+        else:
+            self.plan = self.wide
+        self.costs = {}
+        self._samples = None
+        self._sweeps = 0
+        if mode == 'auto' and self.plan is not self.narrow:
+            self._start_probe()
+
+    @property
+    def fields(self):
+        return self.plan.fields
+
+    def __len__(self):
+        return len(self.plan)
+
+    def _start_probe(self):
+        self._samples = {id(self.wide): [], id(self.narrow): []}
+
+    def _next_candidate(self):
+        wide, narrow = self._samples[id(self.wide)], self._samples[id(self.narrow)]
+        return self.wide if len(wide) <= len(narrow) else self.narrow
+
+    def _finish_probe(self):
+        def median(samples):
+            samples = sorted(samples)
+            return samples[len(samples) // 2]
+        wide = median(self._samples[id(self.wide)])
+        narrow = median(self._samples[id(self.narrow)])
+        self.plan = self.wide if wide <= narrow else self.narrow
+        self.costs = {'wide': wide, 'narrow': narrow}
+        self._samples = None
+
+    def run(self, sweep):
+        """Run one sweep with the plan chosen for it.
+
+        Args:
+            sweep (callable): sweep(plan) performing the reads of `plan` and
+                returning True when every block was read. Only complete sweeps
+                are timed.
+
+        Returns:
+            The return value of sweep.
+        """
+        if self._samples is None:
+            self._sweeps += 1
+            if self.mode == 'auto' and self.reprobe_interval and self._sweeps >= self.reprobe_interval \
+                    and len(self.wide) != len(self.narrow):
+                self._sweeps = 0
+                self._start_probe()
+            else:
+                return sweep(self.plan)
+
+        plan = self._next_candidate()
+        start = self.clock()
+        complete = sweep(plan)
+        if complete:
+            self._samples[id(plan)].append(self.clock() - start)
+            if all(len(s) >= self.trials for s in self._samples.values()):
+                self._finish_probe()
+        return complete
+
+    def execute(self, read_block):
+        """Same contract as ReadPlan.execute."""
+        values = {}
+
+        def sweep(plan):
+            values.update(plan.execute(read_block))
+            return len(values) == len(plan.fields)
+        self.run(sweep)
+        return values
+
+    def describe(self):
+        return f"mode={self.mode}, using {'wide' if self.plan is self.wide else 'narrow'}\n" + self.plan.describe()
@@ -0,0 +1,154 @@
+"""
+Zero-copy decoding of Inspire hand register payloads.
+
+A RegisterDecoder owns one preallocated big-endian ``>u2`` array covering the
+address range of its fields. Block reads are copied straight into that array
+and every field is a fixed NumPy view on it: ``>i2`` for 'short' fields and
+``u1`` for 'byte' fields (high byte first, as the hand packs them), reshaped to
+the ``data_sheet`` matrix shape for tactile regions. The views never change, so
+decoding a sweep is nothing more than filling the register array.
+"""
+
+import numpy as np
+
+from .read_planner import REGISTER_BYTES
+
+REGISTER_DTYPE = np.dtype('>u2')
+FIELD_DTYPES = {
+    'short': np.dtype('>i2'),
+    'byte': np.dtype('u1'),
+}
+
+
+class RegisterDecoder:
+    """Preallocated register storage with per-field views.
+
+    Args:
+        fields (list): ReadField list (see read_planner).
+
+    Attributes:
+        registers (np.ndarray): Raw ``>u2`` register array, indexed by
+            ``(address - base) // 2``.
+        values (dict): var -> flat view of the field ('short' -> ``>i2``,
+            'byte' -> ``u1`` with two values per register).
+        matrices (dict): var -> view reshaped to the field shape, for fields
+            that have one (tactile regions).
+    """
+
+    def __init__(self, fields):
+        fields = list(fields)
+        if not fields:
+            raise ValueError("RegisterDecoder needs at least one field")
+        self.fields = fields
+        self.base = min(f.address for f in fields)
+        size = (max(f.end for f in fields) - self.base) // REGISTER_BYTES
+        self.registers = np.zeros(size, dtype=REGISTER_DTYPE)
+        self.values = {}
+        self.matrices = {}
+        for field in fields:
+            start = self.index(field.address)
+            raw = self.registers[start:start + field.count]
+            view = raw.view(FIELD_DTYPES[field.data_type])
+            self.values[field.var] = view
+            if field.shape is not None:
+                self.matrices[field.var] = view.reshape(field.shape)
+        # fields whose last sweep was incomplete, refreshed by fill()
+        self.stale = set()
+        # plan -> [(address, count, span index, >u2 view, byte view)], so a
+        # sweep does not build any view or tuple
+        self._targets = {}
+
+    def index(self, address):
+        """Register index of an address in self.registers."""
+        return (address - self.base) // REGISTER_BYTES
+
+    def block(self, address, count):
+        """Writable ``>u2`` view of `count` registers starting at `address`."""
+        start = self.index(address)
+        return self.registers[start:start + count]
+
+    def block_bytes(self, address, count):
+        """Writable byte view of a block, in wire (big-endian) order."""
+        return self.block(address, count).view(np.uint8)
+
+    def targets(self, plan):
+        """Precomputed block destinations of a plan."""
+        targets = self._targets.get(plan)
+        if targets is None:
+            targets = [(address, count, index, self.block(address, count), self.block_bytes(address, count))
+                       for address, count, index, offset in plan.blocks]
+            self._targets[plan] = targets
+        return targets
+
+    def forget(self, plan):
+        """Drop the cached block destinations of a plan that will not run again."""
+        self._targets.pop(plan, None)
+
+    def fill(self, plan, read_block):
+        """Run the blocks of a ReadPlan and store the results in place.
+
+        Args:
+            plan (ReadPlan): Plan whose fields are a subset of this decoder's fields.
+            read_block (callable): read_block(address, count) returning the raw
+                registers (any sequence of ints), or None on error.
+
+        Returns:
+            bool: True if every block was read. Fields of spans that failed keep
+            their previous values and are listed in self.stale.
+        """
+        failed = None
+        for address, count, index, block, raw in self.targets(plan):
+            if failed is not None and index in failed:
+                continue
+            registers = read_block(address, count)
+            if registers is None:
+                if failed is None:
+                    failed = set()
+                failed.add(index)
+                continue
+            block[:] = registers
+        return self.mark(plan, failed)
+
+    def fill_into(self, plan, read_into):
+        """Like fill(), for transports that receive straight into a buffer.
+
+        Args:
+            plan (ReadPlan): Plan to run.
+            read_into (callable): read_into(address, count, out) writing the
+                2 * count payload bytes of the response into the writable
+                uint8 array `out`; returns False on error.
+        """
+        failed = None
+        for address, count, index, block, raw in self.targets(plan):
+            if failed is not None and index in failed:
+                continue
+            if not read_into(address, count, raw):
+                if failed is None:
+                    failed = set()
+                failed.add(index)
+        return self.mark(plan, failed)
+
+    def mark(self, plan, failed):
+        """Record the outcome of a sweep of `plan`; `failed` is None or a set of span indices."""
+        if failed is None:
+            if self.stale:
+                self.stale.clear()
+            return True
+        self.stale.clear()
+        for index in failed:
+            for field, offset in plan.spans[index].fields:
+                self.stale.add(field.var)
+        return False
+
+    def load(self, address, registers):
+        """Store registers read outside of a plan (e.g. by a combined transaction)."""
+        self.block(address, len(registers))[:] = registers
+
+    def copy(self):
+        """Dict of var -> independent copy of every field, in matrix shape where available."""
+        return {var: (self.matrices.get(var, view)).copy() for var, view in self.values.items()}
+
+
+def decode_registers(registers, data_type='short'):
+    """Decode one register list into a new array ('short' -> int16, 'byte' -> uint8 pairs)."""
+    return np.asarray(registers, dtype=REGISTER_DTYPE).view(FIELD_DTYPES[data_type])
@@ -0,0 +1,236 @@
+"""
+Lean Modbus RTU transport on pyserial.
+
+The driver only ever sends a handful of request shapes: FC3 reads of fixed
+(address, count) blocks and FC16/FC6 writes of the command block and a few
+config registers. At the 1-3 ms frame times of a 921600 baud link, the
+generic client's per-request work (request and response objects, framer
+state machine, polling receive loop and its 1 s timeout) costs about as much
+as the frame itself. RtuTransport instead:
+
+* builds each FC3 request frame, CRC included, once per (unit, address,
+  count) and reuses the bytes;
+* computes CRC16 with a 256-entry table;
+* reads the response with two blocking ``readinto`` calls of the exact
+  expected length into one preallocated buffer, and copies the payload into
+  the caller's register buffer (``read_holding_registers_into``). This is not
+  zero-copy: pyserial's readinto reads into a new bytes object and copies it,
+  but no request, response or register list objects are built;
+* derives the inter-frame gap and the response timeout from the baud rate
+  (the largest frames times the character time plus the hand's turnaround)
+  instead of a fixed 1 s. The timeout is set on the port once per rate, as
+  pyserial reconfigures the port (tcsetattr) whenever it changes.
+
+A port closed after a serial error stays closed until connect(), which the
+handler's LinkSupervisor calls with backoff.
+
+It also provides the pymodbus client methods the rest of the SDK calls
+(read_holding_registers, write_registers, write_register, connect, close), so
+it drops in as ``ModbusDataHandler.client``.
+"""
+
+import struct
+import time
+
+import serial
+
+from pymodbus.exceptions import ModbusException, ModbusIOException
+from pymodbus.pdu import ExceptionResponse
+from pymodbus.register_read_message import ReadHoldingRegistersResponse
+from pymodbus.register_write_message import WriteMultipleRegistersResponse, WriteSingleRegisterResponse
+
+
+def _crc_table():
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+CRC_TABLE = _crc_table()
+
+READ_REQUEST = struct.Struct('>BBHH')    # unit, function code, address, count
+WRITE_REQUEST = struct.Struct('>BBHHB')  # unit, function code, address, count, byte count
+SINGLE_REQUEST = struct.Struct('>BBHH')  # unit, function code, address, value
+HEADER_BYTES = 3                          # unit, function code, byte count (or exception code)
+CRC_BYTES = 2
+MAX_FRAME_BYTES = 256
+BITS_PER_CHAR = 10                        # start, 8 data, stop
+
+
+def crc16(data, crc=0xFFFF):
+    """Modbus CRC16 of `data` (bytes-like), lower byte first on the wire."""
+    table = CRC_TABLE
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def with_crc(frame):
+    crc = crc16(frame)
+    return bytes(frame) + bytes((crc & 0xFF, crc >> 8))
+
+
+class RtuTransport:
+    """Modbus RTU master for the Inspire hand's fixed request shapes.
+
+    Args:
+        port (str): Serial port name.
+        baudrate (int, optional): Line rate. Defaults to 115200.
+        turnaround (float, optional): Longest time the hand takes between the
+            end of a request and the start of its response, in seconds.
+            Defaults to 0.02.
+        frame_gap (float, optional): Silence before each request, None for
+            3.5 character times at the current baudrate. Defaults to None.
+        retries (int, optional): Extra attempts after a timeout or a bad
+            frame. Defaults to 0, the link supervisor handles failures.
+    """
+
+    def __init__(self, port, baudrate=115200, turnaround=0.02, frame_gap=None, retries=0):
+        self.port = port
+        self.turnaround = turnaround
+        self.retries = retries
+        self._frame_gap = frame_gap
+        self.socket = None
+        self._frames = {}
+        self._rx = bytearray(MAX_FRAME_BYTES)
+        self._rx_view = memoryview(self._rx)
+        self._last_end = 0.0
+        self._flush = False
+        self.set_baudrate(baudrate)
+
+    def set_baudrate(self, baudrate):
+        """Retune the port; also used for the next connect()."""
+        self.baudrate = baudrate
+        self.char_time = BITS_PER_CHAR / baudrate
+        self.frame_gap = self._frame_gap if self._frame_gap is not None else 3.5 * self.char_time
+        # covers any request and response: a missing response is only detected later
+        self.response_timeout = self.timeout(MAX_FRAME_BYTES, MAX_FRAME_BYTES)
+        if self.socket is not None:
+            self.socket.baudrate = baudrate
+            self.socket.timeout = self.response_timeout
+            self.socket.reset_input_buffer()
+
+    @property
+    def connected(self):
+        return self.socket is not None and self.socket.is_open
+
+    def connect(self):
+        if self.connected:
+            return True
+        try:
+            self.socket = serial.Serial(self.port, self.baudrate, timeout=self.response_timeout)
+        except serial.SerialException as e:
+            print(f"Could not open {self.port}: {e}")
+            self.socket = None
+            return False
+        return True
+
+    def close(self):
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+
+    def timeout(self, request_bytes, response_bytes):
+        """Time from sending a request to the end of its response."""
+        return (request_bytes + response_bytes) * self.char_time + self.turnaround
+
+    # framing
+    def _transact(self, request, unit, function, response_bytes):
+        """Send a request frame and receive its response into self._rx.
+
+        Returns:
+            int: 0 for a normal response of response_bytes, or the Modbus
+            exception code of an exception response.
+        Raises:
+            ModbusIOException: no response, or a garbled one, within the timeout
+        """
+        if not self.connected:
+            raise ModbusIOException(f"{self.port} is not open")
+        sock = self.socket
+        view = self._rx_view
+        for attempt in range(self.retries + 1):
+            if self._flush:
+                sock.reset_input_buffer()
+                self._flush = False
+            idle = time.perf_counter() - self._last_end
+            if idle < self.frame_gap:
+                time.sleep(self.frame_gap - idle)
+            try:
+                sock.write(request)
+                # unit, function code and the first byte after it; an
+                # exception response is complete two CRC bytes later
+                n = sock.readinto(view[:HEADER_BYTES])
+                if n == HEADER_BYTES and view[0] == unit and view[1] == function | 0x80:
+                    length = HEADER_BYTES + CRC_BYTES
+                else:
+                    length = response_bytes
+                if n == HEADER_BYTES:
+                    n += sock.readinto(view[HEADER_BYTES:length])
+            except serial.SerialException as e:
+                self.close()
+                raise ModbusIOException(f"{self.port}: {e}")
+            self._last_end = time.perf_counter()
+            if n == length and view[0] == unit and crc16(view[:length - CRC_BYTES]) == view[length - 2] | view[length - 1] << 8:
+                if view[1] == function:
+                    return 0
+                if view[1] == function | 0x80:
+                    return view[2]
+            # timeout, noise or a late answer to an earlier request: resync
+            self._flush = True
+        raise ModbusIOException(f"No valid response from unit {unit} (function {function})")
+
+    def _read_request(self, address, count, unit):
+        key = (unit, address, count)
+        request = self._frames.get(key)
+        if request is None:
+            request = self._frames[key] = with_crc(READ_REQUEST.pack(unit, 3, address, count))
+        return request
+
+    # hot path
+    def read_holding_registers_into(self, address, count, unit, out):
+        """FC3 read, copying the 2 * count payload bytes into the writable buffer `out`.
+
+        Returns:
+            bool: True on success, False on an exception response (the hand
+            answered but refused the read).
+        Raises:
+            ModbusIOException: no valid response
+        """
+        size = 2 * count
+        if self._transact(self._read_request(address, count, unit), unit, 3, HEADER_BYTES + size + CRC_BYTES):
+            return False
+        if self._rx[2] != size:
+            self._flush = True
+            raise ModbusIOException(f"Unit {unit} returned {self._rx[2]} bytes for {count} registers")
+        out[:] = self._rx_view[HEADER_BYTES:HEADER_BYTES + size]
+        return True
+
+    # pymodbus client subset
+    def read_holding_registers(self, address, count=1, slave=1):
+        size = 2 * count
+        code = self._transact(self._read_request(address, count, slave), slave, 3, HEADER_BYTES + size + CRC_BYTES)
+        if code:
+            return ExceptionResponse(3, code)
+        return ReadHoldingRegistersResponse(list(struct.unpack_from(f'>{count}H', self._rx, HEADER_BYTES)))
+
+    def write_registers(self, address, values, slave=1):
+        count = len(values)
+        frame = WRITE_REQUEST.pack(slave, 16, address, count, 2 * count) + struct.pack(f'>{count}H', *[v & 0xFFFF for v in values])
+        # echo of unit, function code, address and count
+        code = self._transact(with_crc(frame), slave, 16, 8)
+        if code:
+            return ExceptionResponse(16, code)
+        return WriteMultipleRegistersResponse(address, count)
+
+    def write_register(self, address, value, slave=1):
+        code = self._transact(with_crc(SINGLE_REQUEST.pack(slave, 6, address, value & 0xFFFF)), slave, 6, 8)
+        if code:
+            return ExceptionResponse(6, code)
+        return WriteSingleRegisterResponse(address, value)
+
+    def readwrite_registers(self, read_address=0, read_count=0, write_address=0, values=(), slave=1):
+        raise ModbusException("RtuTransport does not implement Read/Write Multiple Registers (FC23)")
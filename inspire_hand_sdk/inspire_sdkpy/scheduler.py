@@ -0,0 +1,184 @@
+"""
+Multi-rate acquisition for one hand.
+
+Instead of reading every field each cycle, every state field and tactile region
+gets its own target rate. Each step reads the fields that are due, earliest
+deadline first, and stops adding fields once the step would exceed
+``max_reads`` Modbus transactions, so a bulky palm region never holds back
+``angle_act``. Only the messages that received new data are published; their
+other fields keep their last values.
+
+With the handler's control_rate, every step first writes the newest command
+from the handler's mailbox when the control rate allows one. With the
+handler's combined_cycle, ctrl commands wait in the handler until a
+step reads state fields and go out with the first of those reads (FC23); a
+step that reads no state sends them as plain writes, so no command waits for
+a slow state rate.
+"""
+
+import collections
+import fnmatch
+import time
+
+from .read_planner import ReadPlan, MAX_READ_REGISTERS
+
+# read plans kept for reuse, least recently used first out: a schedule repeats
+# a few sets of due fields, but there are 2 ** fields possible sets
+MAX_PLANS = 64
+
+
+class _Entry:
+    __slots__ = ('field', 'group', 'bit', 'period', 'next_due', 'count', 'last_update')
+
+    def __init__(self, field, group, bit, rate):
+        self.field = field
+        self.group = group
+        self.bit = bit
+        self.period = 1.0 / rate
+        self.next_due = 0.0
+        self.count = 0
+        self.last_update = None
+
+
+class MultiRateScheduler:
+    """Declarative per-field read rates on top of a ModbusDataHandler.
+
+    Example:
+        scheduler = MultiRateScheduler(handler, {
+            'angle_act': 500, 'force_act': 200,
+            'finger*_tip_touch': 100, 'palm_touch': 20,
+            'temperature': 1,
+        })
+        scheduler.run()
+
+    Args:
+        handler (ModbusDataHandler): Handler providing the link, decoders and publishers.
+        rates (dict): Field name or fnmatch pattern -> rate in Hz. The first
+            matching pattern wins, in dict order.
+        default_rate (float, optional): Rate of fields no pattern matches, None
+            leaves them out. Defaults to None.
+        max_reads (int, optional): Transactions allowed per step. Defaults to 2.
+        state_gap (int, optional): max_gap for state read plans. Defaults to
+            MAX_READ_REGISTERS, i.e. due state fields are read as one span.
+        touch_gap (int, optional): max_gap for touch read plans. Defaults to 0.
+        clock (callable, optional): Time source. Defaults to time.perf_counter.
+    """
+
+    def __init__(self, handler, rates, default_rate=None, max_reads=2, state_gap=MAX_READ_REGISTERS, touch_gap=0, clock=None):
+        self.handler = handler
+        self.max_reads = max_reads
+        self.clock = clock or time.perf_counter
+        self.gaps = {'state': state_gap, 'touch': touch_gap}
+
+        groups = [('state', handler.state_decoder)]
+        if getattr(handler, 'pub', None) is not None:
+            groups.append(('touch', handler.touch_input))
+        self.decoders = dict(groups)
+
+        self.entries = []
+        bits = {'state': 1, 'touch': 1}
+        for group, decoder in groups:
+            for field in decoder.fields:
+                rate = self._rate(field.var, rates, default_rate)
+                if rate is None:
+                    continue
+                if rate <= 0:
+                    raise ValueError(f"rate of {field.var} must be > 0")
+                self.entries.append(_Entry(field, group, bits[group], rate))
+                bits[group] <<= 1
+        if not self.entries:
+            raise ValueError("no field matches the schedule")
+        self._plans = collections.OrderedDict()
+        self._start = None
+
+    @staticmethod
+    def _rate(var, rates, default_rate):
+        for pattern, rate in rates.items():
+            if fnmatch.fnmatchcase(var, pattern):
+                return rate
+        return default_rate
+
+    def _plan(self, group, mask):
+        key = (group, mask)
+        plan = self._plans.get(key)
+        if plan is not None:
+            self._plans.move_to_end(key)
+            return plan
+        fields = [e.field for e in self.entries if e.group == group and e.bit & mask]
+        plan = self._plans[key] = ReadPlan(fields, max_gap=self.gaps[group])
+        if len(self._plans) > MAX_PLANS:
+            (old_group, old_mask), old = self._plans.popitem(last=False)
+            # the decoder caches block views per plan, drop them with it
+            self.decoders[old_group].forget(old)
+        return plan
+
+    def step(self, now=None):
+        """Read and publish whatever is due.
+
+        Returns:
+            float: Seconds until the next field is due (0 if something is overdue).
+        """
+        if now is None:
+            now = self.clock()
+        if self._start is None:
+            self._start = now
+            for entry in self.entries:
+                entry.next_due = now
+
+        handler = self.handler
+        # mailbox and command receipt times use perf_counter, whatever self.clock is
+        handler.send_commands()
+        due = [e for e in self.entries if e.next_due <= now]
+        if due:
+            due.sort(key=lambda e: e.next_due)
+            masks = {'state': 0, 'touch': 0}
+            selected = []
+            for entry in due:
+                trial = dict(masks)
+                trial[entry.group] |= entry.bit
+                reads = sum(len(self._plan(g, m)) for g, m in trial.items() if m)
+                if selected and reads > self.max_reads:
+                    continue
+                masks = trial
+                selected.append(entry)
+
+            for group, mask in masks.items():
+                if not mask:
+                    continue
+                plan = self._plan(group, mask)
+                if group == 'state' and handler._pending_writes:
+                    complete = handler._combined_state_sweep(plan)
+                else:
+                    complete = self.decoders[group].fill(plan, handler.read_registers)
+                if not complete:
+                    continue
+                if group == 'state':
+                    handler.state_pub.Write(handler.messages.state)
+                else:
+                    handler.process_touch()
+
+            for entry in selected:
+                entry.count += 1
+                entry.last_update = now
+                entry.next_due += entry.period
+                if entry.next_due < now:  # fell behind, do not burst to catch up
+                    entry.next_due = now + entry.period
+
+        if handler._pending_writes:
+            # combined_cycle commands that no state read carried this step
+            handler.flush_writes()
+        return max(0.0, min(e.next_due for e in self.entries) - self.clock())
+
+    def run(self, max_sleep=0.01):
+        """Step forever, sleeping until the next field is due."""
+        while True:
+            delay = self.step()
+            if delay > 0:
+                time.sleep(min(delay, max_sleep))
+
+    def stats(self):
+        """Achieved rate in Hz per field since the first step."""
+        if self._start is None:
+            return {}
+        elapsed = max(self.clock() - self._start, 1e-9)
+        return {e.field.var: e.count / elapsed for e in self.entries}
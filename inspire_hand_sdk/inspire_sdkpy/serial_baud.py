@@ -0,0 +1,174 @@
+"""
+Managed RS-485 line rate.
+
+The hand keeps its line rate as an index in register 1002 (REDU_RATIO, see
+BAUD_RATES); a write takes effect after the reply, which still goes out at
+the old rate. ``switch_baudrate`` moves the hand and the host together:
+
+1. find the rate the hand answers at (the configured one first, then the
+   target, in case an earlier run already switched and saved it);
+2. write the new index to 1002 and retune the host port;
+3. verify with reads of HAND_ID (1000) at the new rate;
+4. on success optionally save to flash (1005), on failure write the old index
+   back at both rates and return the host to the old rate.
+
+Hands on one bus are switched one after the other on the same client. When
+one of them fails, the hands the client already moved are put back to the
+old rate together with it, so the whole bus stays at one rate; the ones that
+had saved the new rate save the old one again, so they also come back up at
+the bus rate after a power cycle.
+
+At 115200 baud one sweep of the 1062 tactile registers takes about 190 ms of
+line time; at 921600 about 25 ms, which is why touch is only read over RTU at
+TOUCH_MIN_BAUDRATE or faster.
+"""
+
+import time
+import weakref
+
+from pymodbus.exceptions import ModbusException
+
+HAND_ID, REDU_RATIO, SAVE = 1000, 1002, 1005
+
+BAUD_RATES = {
+    0: 115200,
+    1: 57600,
+    2: 19200,
+    3: 921600,
+}
+BAUD_INDEX = {rate: index for index, rate in BAUD_RATES.items()}
+
+# slowest line rate at which the tactile registers are read over RTU
+TOUCH_MIN_BAUDRATE = 921600
+
+# client -> {device_id: (rate, saved to flash)} of the hands switch_baudrate() moved on that bus
+_moved = weakref.WeakKeyDictionary()
+
+
+def host_baudrate(client):
+    """Current line rate of a ModbusSerialClient or RtuTransport."""
+    if hasattr(client, 'set_baudrate'):
+        return client.baudrate
+    return client.comm_params.baudrate
+
+
+def set_host_baudrate(client, baudrate):
+    """Retune a connected pymodbus ModbusSerialClient or RtuTransport, also for later reconnects."""
+    if hasattr(client, 'set_baudrate'):
+        client.set_baudrate(baudrate)
+        return
+    client.comm_params.baudrate = baudrate
+    # same frame timing rules as ModbusSerialClient.__init__ and connect()
+    client._t0 = float(1 + client.comm_params.bytesize + client.comm_params.stopbits) / baudrate
+    # the response is polled every 4 bytes, at least 1 ms apart
+    client._recv_interval = max(client._t0 * 4, 0.001)
+    if baudrate > 19200:
+        client.inter_byte_timeout = 0
+        client.silent_interval = 1.75 / 1000
+    else:
+        client.inter_byte_timeout = 1.5 * client._t0
+        client.silent_interval = round(3.5 * client._t0, 6)
+    if client.socket is not None:
+        client.socket.baudrate = baudrate
+        if client.strict:
+            client.socket.inter_byte_timeout = client.inter_byte_timeout
+        client.socket.reset_input_buffer()
+
+
+def _request(call, *args):
+    try:
+        response = call(*args)
+    except ModbusException:
+        return None
+    if response.isError():
+        return None
+    return response
+
+
+def responds(client, device_id, reads=1):
+    """True when `reads` consecutive reads of HAND_ID succeed at the current host rate."""
+    for _ in range(reads):
+        if _request(client.read_holding_registers, HAND_ID, 1, device_id) is None:
+            return False
+    return True
+
+
+def find_baudrate(client, device_id, candidates):
+    """Set the host to the first rate in `candidates` the hand answers at; returns it, or None."""
+    for baudrate in candidates:
+        set_host_baudrate(client, baudrate)
+        if responds(client, device_id):
+            return baudrate
+    return None
+
+
+def switch_baudrate(client, device_id, baudrate, current=None, persist=True, verify_reads=3, settle=0.05):
+    """Move the hand on `client` and the host port to `baudrate`.
+
+    The caller holds the link lock; every hand on the bus has to be moved
+    before the bus is used again at the new rate. If this hand cannot be
+    moved, the hands this client already moved to `baudrate` are moved back
+    to the old rate with it.
+
+    Args:
+        client (ModbusSerialClient or RtuTransport): Connected client.
+        device_id (int): Hand ID.
+        baudrate (int): Target rate, one of BAUD_RATES.
+        current (int, optional): Rate the hand is expected at. Defaults to None, the host's current rate.
+        persist (bool, optional): Save the new rate to flash once verified. Defaults to True.
+        verify_reads (int, optional): Consecutive reads that must succeed at the new rate. Defaults to 3.
+        settle (float, optional): Seconds given to the hand to retune after the write. Defaults to 0.05.
+    Returns:
+        bool: True if the hand answers at `baudrate`, False if it was left (or put back) at the old rate.
+    Raises:
+        ValueError: raise when `baudrate` is not a rate of the hand
+    """
+    if baudrate not in BAUD_INDEX:
+        raise ValueError(f"{baudrate} is not one of the hand's rates {sorted(BAUD_INDEX)}")
+    old = current or host_baudrate(client)
+    found = find_baudrate(client, device_id, [old, baudrate] if old != baudrate else [baudrate])
+    if found is None:
+        print(f"Hand {device_id} does not answer at {old} or {baudrate} baud")
+        _revert(client, [], baudrate, old, settle)
+        return False
+    if found == baudrate:
+        # already there, most likely saved by an earlier run
+        _moved.setdefault(client, {})[device_id] = (baudrate, persist)
+        return True
+
+    # the reply to this write comes at the old rate and may be lost while the hand retunes
+    _request(client.write_register, REDU_RATIO, BAUD_INDEX[baudrate], device_id)
+    time.sleep(settle)
+    set_host_baudrate(client, baudrate)
+    if responds(client, device_id, verify_reads):
+        saved = persist and _request(client.write_register, SAVE, 1, device_id) is not None
+        if persist and not saved:
+            print(f"Hand {device_id} runs at {baudrate} baud but saving it failed, it will be back at {old} after a power cycle")
+        print(f"Hand {device_id} switched to {baudrate} baud")
+        _moved.setdefault(client, {})[device_id] = (baudrate, saved)
+        return True
+
+    print(f"Hand {device_id} did not answer at {baudrate} baud, reverting to {old}")
+    _revert(client, [device_id], baudrate, old, settle)
+    return False
+
+
+def _revert(client, device_ids, baudrate, old, settle):
+    """Put `device_ids` and the hands the client moved to `baudrate` back to `old`, host included; hands that saved `baudrate` save `old`."""
+    moved = _moved.get(client, {})
+    others = [device_id for device_id, (rate, saved) in moved.items() if rate == baudrate and device_id not in device_ids]
+    if others:
+        print(f"Moving hands {others} on the same bus back to {old} baud")
+    # whichever rate a hand ended up at, ask it to go back: first at the new rate, then at the old one
+    set_host_baudrate(client, baudrate)
+    if old in BAUD_INDEX:
+        for device_id in device_ids + others:
+            _request(client.write_register, REDU_RATIO, BAUD_INDEX[old], device_id)
+        time.sleep(settle)
+    set_host_baudrate(client, old)
+    if old in BAUD_INDEX:
+        for device_id in device_ids + others:
+            _request(client.write_register, REDU_RATIO, BAUD_INDEX[old], device_id)
+    for device_id in others:
+        if moved.pop(device_id)[1] and old in BAUD_INDEX and _request(client.write_register, SAVE, 1, device_id) is None:
+            print(f"Hand {device_id} is back at {old} baud but saving it failed, it will come up at {baudrate} after a power cycle")
@@ -0,0 +1,8 @@
+"""
+Local simulator of Inspire hands for testing and benchmarking without hardware.
+
+    python -m inspire_sdkpy.simulator --tcp 127.0.0.1:6000 --rtu --ids 1 2 --latency 0.001
+"""
+
+from .hand_model import SimulatedHand
+from .server import HandSimulator, LinkProfile, HandContext, PtyBridge
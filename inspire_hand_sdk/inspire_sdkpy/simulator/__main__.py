@@ -0,0 +1,42 @@
+import argparse
+import time
+
+from .server import HandSimulator, LinkProfile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated Inspire hands over ModbusTCP and/or RTU")
+    parser.add_argument('--tcp', default=None, help="host:port to serve ModbusTCP on, e.g. 127.0.0.1:6000")
+    parser.add_argument('--rtu', action='store_true', help="serve Modbus RTU on a new pty pair")
+    parser.add_argument('--baudrate', type=int, default=115200, help="RTU line rate to emulate")
+    parser.add_argument('--ids', type=int, nargs='+', default=[1], help="device ids, one hand each")
+    parser.add_argument('--latency', type=float, default=0.0, help="mean delay per transaction in seconds")
+    parser.add_argument('--jitter', type=float, default=0.0, help="+/- delay spread in seconds")
+    parser.add_argument('--service-time', type=float, default=0.0, help="per-request processing time of a hand in seconds")
+    parser.add_argument('--loss', type=float, default=0.0, help="probability of dropping a request")
+    parser.add_argument('--no-fc23', action='store_true', help="refuse Read/Write Multiple Registers like older firmware")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.tcp is None and not args.rtu:
+        args.tcp = '127.0.0.1:6000'
+
+    profile = LinkProfile(args.latency, args.jitter, args.service_time, args.loss, seed=args.seed)
+    sim = HandSimulator(args.ids, profile, seed=args.seed, fc23=not args.no_fc23)
+    if args.tcp:
+        host, port = args.tcp.rsplit(':', 1)
+        sim.start_tcp(host, int(port))
+    if args.rtu:
+        sim.start_rtu(args.baudrate)
+    try:
+        while True:
+            time.sleep(5)
+            print(f"Simulator: {sim.stats()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sim.stop()
+
+
+if __name__ == '__main__':
+    main()
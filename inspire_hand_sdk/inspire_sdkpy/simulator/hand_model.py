@@ -0,0 +1,150 @@
+"""
+Register image and simple dynamics of one simulated Inspire hand.
+
+The image follows the byte-addressed layout the SDK reads: ``n`` registers
+starting at ``addr`` are the ``2 * n`` bytes ``addr .. addr + 2n - 1``, big
+endian. Commands written to 1474-1533 drive the state block 1534-1623 and the
+tactile regions of ``data_sheet`` (3000+) on every access.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from ..inspire_hand_defaut import data_sheet
+
+IMAGE_BYTES = 6144
+
+# command block
+POS_SET, ANGLE_SET, FORCE_SET, SPEED_SET = 1474, 1486, 1498, 1522
+# state block
+POS_ACT, ANGLE_ACT, FORCE_ACT, CURRENT = 1534, 1546, 1582, 1594
+ERROR, STATUS, TEMP = 1606, 1612, 1618
+# config registers
+HAND_ID, REDU_RATIO, CLEAR_ERROR, SAVE, RESET_PARA, GESTURE_FORCE_CLB = 1000, 1002, 1004, 1005, 1006, 1009
+DEFAULT_SPEED_SET, DEFAULT_FORCE_SET, IP = 1032, 1044, 1700
+
+
+class SimulatedHand:
+    """One hand: a byte image plus first-order joint dynamics and synthetic touch.
+
+    Args:
+        device_id (int, optional): Modbus unit id, also stored in HAND_ID. Defaults to 1.
+        ip (tuple, optional): Four IP bytes stored at 1700. Defaults to (192, 168, 11, 210).
+        touch_noise (int, optional): Peak of the random taxel noise. Defaults to 3.
+        seed (int, optional): Random seed. Defaults to None.
+    """
+
+    def __init__(self, device_id=1, ip=(192, 168, 11, 210), touch_noise=3, seed=None):
+        self.device_id = device_id
+        self.image = bytearray(IMAGE_BYTES)
+        self.lock = threading.Lock()
+        self.rng = np.random.default_rng(seed)
+        self.touch_noise = touch_noise
+        self.saves = 0
+        self.writes = 0
+
+        self._set(HAND_ID, [device_id])
+        self._set(REDU_RATIO, [0])
+        self._set(DEFAULT_SPEED_SET, [1000] * 6)
+        self._set(DEFAULT_FORCE_SET, [1000] * 6)
+        self._set(IP, [ip[1] << 8 | ip[0], ip[3] << 8 | ip[2]])
+
+        self.angle = np.full(6, 1000.0)
+        self.angle_target = self.angle.copy()
+        self.speed = np.full(6, 1000.0)
+        self.force_limit = np.full(6, 1000.0)
+        self._set(ANGLE_SET, self.angle)
+        self._set(POS_SET, 1000 - self.angle)
+        self._set(SPEED_SET, self.speed)
+        self._set(FORCE_SET, self.force_limit)
+        self.errors = np.zeros(6, dtype=np.uint8)
+        self._last_tick = time.monotonic()
+        self.tick()
+
+    # raw access, used by the Modbus datastore
+    def read_registers(self, address, count):
+        with self.lock:
+            self.tick()
+            data = self.image[address:address + 2 * count]
+            return list(np.frombuffer(bytes(data), dtype='>u2').tolist())
+
+    def write_registers(self, address, values):
+        with self.lock:
+            self.tick()
+            self.writes += 1
+            self.image[address:address + 2 * len(values)] = np.asarray(values, dtype=np.int64).astype('>u2').tobytes()
+            self._apply_write(address, len(values))
+
+    def valid(self, address, count):
+        return 0 <= address and address + 2 * count <= IMAGE_BYTES
+
+    # helpers
+    def _set(self, address, values):
+        values = np.asarray(values, dtype=np.int64) & 0xFFFF
+        self.image[address:address + 2 * len(values)] = values.astype('>u2').tobytes()
+
+    def _set_bytes(self, address, values):
+        values = np.asarray(values, dtype=np.uint8)
+        self.image[address:address + len(values)] = values.tobytes()
+
+    def _get(self, address, count):
+        return np.frombuffer(bytes(self.image[address:address + 2 * count]), dtype='>i2').astype(np.int64)
+
+    def _overlaps(self, address, count, start, length=6):
+        return address < start + 2 * length and start < address + 2 * count
+
+    def _apply_write(self, address, count):
+        # -1 keeps the current value of a joint, as on the hand
+        if self._overlaps(address, count, ANGLE_SET):
+            target = self._get(ANGLE_SET, 6)
+            self.angle_target = np.where(target >= 0, np.clip(target, 0, 1000), self.angle_target)
+        if self._overlaps(address, count, POS_SET):
+            target = self._get(POS_SET, 6)
+            self.angle_target = np.where(target >= 0, 1000 - np.clip(target, 0, 1000), self.angle_target)
+        if self._overlaps(address, count, SPEED_SET):
+            speed = self._get(SPEED_SET, 6)
+            self.speed = np.where(speed >= 0, np.clip(speed, 0, 1000), self.speed)
+        if self._overlaps(address, count, FORCE_SET):
+            force = self._get(FORCE_SET, 6)
+            self.force_limit = np.where(force >= 0, np.clip(force, 0, 1000), self.force_limit)
+        if address <= CLEAR_ERROR < address + 2 * count:
+            self.errors[:] = 0
+        if address <= SAVE < address + 2 * count:
+            self.saves += 1
+        if address <= RESET_PARA < address + 2 * count:
+            self._set(DEFAULT_SPEED_SET, [1000] * 6)
+            self._set(DEFAULT_FORCE_SET, [1000] * 6)
+
+    def tick(self):
+        """Advance the dynamics to now and refresh the state and touch registers."""
+        now = time.monotonic()
+        dt = now - self._last_tick
+        self._last_tick = now
+
+        # full speed (1000) covers the whole 0..1000 range in about 0.8 s
+        step = self.speed * 1.25 * dt
+        error = self.angle_target - self.angle
+        moving = np.abs(error) > 0.5
+        self.angle += np.clip(error, -step, step)
+
+        closure = (1000.0 - self.angle) / 1000.0
+        force = np.minimum(closure * 400.0, self.force_limit) + self.rng.normal(0.0, 2.0, 6)
+        current = 50.0 + moving * 150.0 + force * 0.2
+
+        self._set(ANGLE_ACT, np.round(self.angle))
+        self._set(POS_ACT, np.round(1000 - self.angle))
+        self._set(FORCE_ACT, np.round(force))
+        self._set(CURRENT, np.round(current))
+        self._set_bytes(ERROR, self.errors)
+        self._set_bytes(STATUS, np.where(moving, 1, 2))
+        self._set_bytes(TEMP, np.full(6, 36))
+
+        for index, (name, addr, length, size, var) in enumerate(data_sheet):
+            count = length // 2
+            # regions of a closing finger press, finger index follows data_sheet order
+            finger = min(index // 3, 4)
+            pressure = closure[finger] * 800.0 if var != 'palm_touch' else closure[:4].mean() * 300.0
+            values = pressure * np.linspace(0.2, 1.0, count) + self.rng.integers(0, self.touch_noise + 1, count)
+            self._set(addr, np.round(values))
@@ -0,0 +1,282 @@
+"""
+Modbus front end of the simulator: pymodbus servers over TCP and over a
+pseudo-terminal RTU link, serving one SimulatedHand per device id.
+
+Every transaction can be delayed and dropped to mimic a real link:
+
+* ``latency`` / ``jitter``: network delay, overlaps between pipelined requests.
+* ``service_time``: time the hand spends on one request; a hand answers one
+  request at a time, so this part is serialized per device.
+* ``loss``: probability that a request gets no response at all (the client
+  times out).
+
+On the RTU link every hand also has a line rate, set by its REDU_RATIO
+register (1002) like on the real hand. A frame only gets through when the
+SDK's port is set to the rate of the hand it addresses, so switching the rate
+has to be done on both sides.
+"""
+
+import asyncio
+import os
+import random
+import select
+import termios
+import threading
+import time
+import tty
+
+from pymodbus.datastore import ModbusBaseSlaveContext, ModbusServerContext
+from pymodbus.exceptions import NoSuchSlaveException
+from pymodbus.server import ModbusSerialServer, ModbusTcpServer
+
+from ..serial_baud import BAUD_RATES, BAUD_INDEX
+from .hand_model import SimulatedHand, REDU_RATIO
+
+# termios speed constant -> bits per second
+TERMIOS_SPEEDS = {getattr(termios, f"B{rate}"): rate for rate in BAUD_RATES.values() if hasattr(termios, f"B{rate}")}
+
+
+class LinkProfile:
+    """Timing and loss of the simulated link.
+
+    Args:
+        latency (float, optional): Mean one-way delay added to each transaction, in seconds. Defaults to 0.
+        jitter (float, optional): Uniform +/- spread of the delay, in seconds. Defaults to 0.
+        service_time (float, optional): Per-request processing time of the hand, in seconds. Defaults to 0.
+        loss (float, optional): Probability in [0, 1] of dropping a request. Defaults to 0.
+        seed (int, optional): Random seed. Defaults to None.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, service_time=0.0, loss=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.service_time = service_time
+        self.loss = loss
+        self.rng = random.Random(seed)
+
+    def delay(self):
+        if not self.latency and not self.jitter:
+            return 0.0
+        return max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+
+    def dropped(self):
+        return self.loss > 0 and self.rng.random() < self.loss
+
+
+class HandContext(ModbusBaseSlaveContext):
+    """pymodbus datastore that maps holding registers onto a SimulatedHand.
+
+    Addresses are passed through unchanged (no +1 offset), in the hand's byte
+    addressing. With fc23=False, Read/Write Multiple Registers is refused
+    like on firmware without it.
+    """
+
+    def __init__(self, hand, profile=None, fc23=True):
+        self.hand = hand
+        self.profile = profile or LinkProfile()
+        self.fc23 = fc23
+        self.requests = 0
+        self.dropped = 0
+        self._busy = None
+
+    def reset(self):
+        pass
+
+    def validate(self, fc_as_hex, address, count=1):
+        if fc_as_hex == 23 and not self.fc23:
+            return False
+        return self.decode(fc_as_hex) == 'h' and self.hand.valid(address, count)
+
+    def getValues(self, fc_as_hex, address, count=1):
+        return self.hand.read_registers(address, count)
+
+    def setValues(self, fc_as_hex, address, values):
+        self.hand.write_registers(address, values)
+
+    async def _transaction(self):
+        self.requests += 1
+        profile = self.profile
+        delay = profile.delay()
+        if delay:
+            await asyncio.sleep(delay)
+        if profile.service_time:
+            if self._busy is None:
+                self._busy = asyncio.Lock()
+            async with self._busy:
+                await asyncio.sleep(profile.service_time)
+        if profile.dropped():
+            self.dropped += 1
+            # with ignore_missing_slaves the server sends nothing back
+            raise NoSuchSlaveException(self.hand.device_id)
+
+    async def async_getValues(self, fc_as_hex, address, count=1):
+        await self._transaction()
+        return self.getValues(fc_as_hex, address, count)
+
+    async def async_setValues(self, fc_as_hex, address, values):
+        # FC23 calls setValues then getValues: only delay the request once
+        if fc_as_hex != 23:
+            await self._transaction()
+        self.setValues(fc_as_hex, address, values)
+
+
+class PtyBridge:
+    """Two pseudo-terminals joined back to back, a virtual RS-485 cable.
+
+    The server opens ``server_port`` and the SDK opens ``client_port``. When
+    baudrate is given, bytes are delivered no faster than the line would carry
+    them (10 bit times per byte). With line_rate, each request is carried at
+    the rate of the device it addresses and dropped, reply included, when the
+    SDK's port is set to another rate.
+
+    Args:
+        baudrate (int, optional): Line rate to emulate, None forwards immediately. Defaults to None.
+        line_rate (callable, optional): Device rate for a request frame, None
+            does not check the SDK's port rate. Defaults to None.
+    """
+
+    def __init__(self, baudrate=None, line_rate=None):
+        self.baudrate = baudrate
+        self.line_rate = line_rate
+        self._reply_rate = baudrate
+        self._masters = []
+        self._slaves = []
+        names = []
+        for _ in range(2):
+            master, slave = os.openpty()
+            tty.setraw(slave)
+            self._masters.append(master)
+            self._slaves.append(slave)  # kept open so the masters never see EIO
+            names.append(os.ttyname(slave))
+        self.server_port, self.client_port = names
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._forward, daemon=True, name="inspire-sim-pty")
+        self._thread.start()
+
+    def host_rate(self):
+        """Rate the SDK set on its end, None if it is not a hand rate."""
+        return TERMIOS_SPEEDS.get(termios.tcgetattr(self._slaves[1])[4])
+
+    def _forward(self):
+        server, client = self._masters
+        peer = {server: client, client: server}
+        while not self._stop_event.is_set():
+            readable, _, _ = select.select(self._masters, [], [], 0.1)
+            for fd in readable:
+                try:
+                    data = os.read(fd, 4096)
+                except OSError:
+                    continue
+                rate = self.baudrate
+                if self.line_rate is not None:
+                    if fd == client:
+                        self._reply_rate = self.line_rate(data)
+                    rate = self._reply_rate
+                    if rate != self.host_rate():
+                        continue  # the UARTs do not agree: nothing readable arrives
+                if rate:
+                    time.sleep(len(data) * 10.0 / rate)
+                os.write(peer[fd], data)
+
+    def close(self):
+        self._stop_event.set()
+        self._thread.join(1.0)
+        for fd in self._masters + self._slaves:
+            os.close(fd)
+
+
+class HandSimulator:
+    """Simulated hands behind a ModbusTCP server or an RTU pty link.
+
+    The servers run on their own event loop thread, so the simulator can be
+    started in the same process as the SDK, e.g. from a benchmark:
+
+        sim = HandSimulator(device_ids=(1, 2), profile=LinkProfile(latency=0.001))
+        sim.start_tcp('127.0.0.1', 6000)
+        port = sim.start_rtu(baudrate=115200)  # serial port path for the SDK
+        ...
+        sim.stop()
+
+    Args:
+        device_ids (iterable, optional): Modbus unit ids served, one hand each. Defaults to (1,).
+        profile (LinkProfile, optional): Delay and loss applied to every hand. Defaults to no impairment.
+        seed (int, optional): Random seed of the hand models. Defaults to None.
+        fc23 (bool, optional): Whether the hands accept Read/Write Multiple Registers. Defaults to True.
+    """
+
+    def __init__(self, device_ids=(1,), profile=None, seed=None, fc23=True):
+        self.profile = profile or LinkProfile()
+        self.hands = {device_id: SimulatedHand(device_id, seed=seed) for device_id in device_ids}
+        self.contexts = {device_id: HandContext(hand, self.profile, fc23) for device_id, hand in self.hands.items()}
+        self.context = ModbusServerContext(slaves=self.contexts, single=False)
+        self.servers = []
+        self.bridges = []
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True, name="inspire-sim")
+        self._thread.start()
+
+    def _serve(self, server):
+        async def start():
+            if not await server.listen():
+                raise ConnectionError("simulator server failed to listen")
+            self.servers.append(server)
+        asyncio.run_coroutine_threadsafe(start(), self.loop).result(5.0)
+
+    def start_tcp(self, host='127.0.0.1', port=6000):
+        """Serve ModbusTCP on host:port."""
+        async def create():
+            return ModbusTcpServer(self.context, address=(host, port), ignore_missing_slaves=True)
+        server = asyncio.run_coroutine_threadsafe(create(), self.loop).result(5.0)
+        self._serve(server)
+        print(f"Simulator: ModbusTCP on {host}:{port}, ids {sorted(self.hands)}")
+        return port
+
+    def _line_rate(self, frame):
+        hand = self.hands.get(frame[0]) if frame else None
+        if hand is None:
+            return None
+        return BAUD_RATES.get(hand.read_registers(REDU_RATIO, 1)[0])
+
+    def start_rtu(self, baudrate=115200, emulate_baudrate=True):
+        """Serve Modbus RTU on a new pty pair.
+
+        The hands start at `baudrate`. If it is one of the hand's rates
+        (serial_baud.BAUD_RATES), requests only get through while the SDK's
+        port runs at the rate in the addressed hand's REDU_RATIO register.
+
+        Returns:
+            str: Serial port path for ModbusDataHandler(use_serial=True, serial_port=...).
+        """
+        line_rate = None
+        if emulate_baudrate and baudrate in BAUD_INDEX:
+            for hand in self.hands.values():
+                with hand.lock:
+                    hand._set(REDU_RATIO, [BAUD_INDEX[baudrate]])
+            line_rate = self._line_rate
+        bridge = PtyBridge(baudrate if emulate_baudrate else None, line_rate)
+        self.bridges.append(bridge)
+
+        async def create():
+            return ModbusSerialServer(self.context, framer='rtu', port=bridge.server_port, baudrate=baudrate, ignore_missing_slaves=True)
+        server = asyncio.run_coroutine_threadsafe(create(), self.loop).result(5.0)
+        self._serve(server)
+        print(f"Simulator: Modbus RTU on {bridge.client_port} at {baudrate} baud, ids {sorted(self.hands)}")
+        return bridge.client_port
+
+    def stats(self):
+        return {device_id: {'requests': ctx.requests, 'dropped': ctx.dropped, 'writes': ctx.hand.writes}
+                for device_id, ctx in self.contexts.items()}
+
+    def stop(self):
+        async def shutdown():
+            for server in self.servers:
+                await server.shutdown()
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(5.0)
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(1.0)
+            for bridge in self.bridges:
+                bridge.close()
+            self.servers = []
+            self.bridges = []
@@ -0,0 +1,189 @@
+"""
+Raw-socket ModbusTCP transport.
+
+The TCP counterpart of rtu_transport.RtuTransport: one persistent socket with
+TCP_NODELAY, FC3 request frames (MBAP header included) built once per
+(unit, address, count) with only the transaction id patched in per request,
+and responses received with ``recv_into`` into one preallocated buffer. No
+request, response or framer objects are created on the read path; the
+payload goes straight into the caller's register buffer
+(``read_holding_registers_into``).
+
+Transactions are strictly one at a time, as with the pymodbus client; a
+response whose transaction id does not match (the late answer to a request
+that timed out) is skipped. A failed transaction closes the socket and it
+stays closed: reopening it is left to connect(), which the handler's
+LinkSupervisor calls with backoff.
+"""
+
+import socket
+import struct
+
+from pymodbus.exceptions import ModbusIOException
+from pymodbus.pdu import ExceptionResponse
+from pymodbus.register_read_message import ReadHoldingRegistersResponse, ReadWriteMultipleRegistersResponse
+from pymodbus.register_write_message import WriteMultipleRegistersResponse, WriteSingleRegisterResponse
+
+MBAP = struct.Struct('>HHHB')            # transaction id, protocol id, length, unit id
+READ_REQUEST = struct.Struct('>HHHBBHH')  # MBAP + function code, address, count
+WRITE_REQUEST = struct.Struct('>HHHBBHHB')  # MBAP + function code, address, count, byte count
+SINGLE_REQUEST = struct.Struct('>HHHBBHH')  # MBAP + function code, address, value
+READWRITE_REQUEST = struct.Struct('>HHHBBHHHHB')  # MBAP + fc, read address, read count, write address, write count, byte count
+TID = struct.Struct('>H')
+MAX_FRAME_BYTES = 7 + 253
+
+
+class TcpTransport:
+    """ModbusTCP client on a plain socket for the Inspire hand's request shapes.
+
+    Args:
+        host (str): Hand IP.
+        port (int, optional): ModbusTcp port. Defaults to 6000.
+        timeout (float, optional): Seconds to wait for one response. Defaults to 1.0.
+    """
+
+    def __init__(self, host, port=6000, timeout=1.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.socket = None
+        self._tid = 0
+        self._frames = {}
+        self._rx = bytearray(MAX_FRAME_BYTES)
+        self._rx_view = memoryview(self._rx)
+
+    @property
+    def connected(self):
+        return self.socket is not None
+
+    def connect(self):
+        if self.socket is not None:
+            return True
+        try:
+            sock = socket.create_connection((self.host, self.port), self.timeout)
+        except OSError as e:
+            print(f"Could not connect to {self.host}:{self.port}: {e}")
+            return False
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.settimeout(self.timeout)
+        self.socket = sock
+        return True
+
+    def close(self):
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+
+    # framing
+    def _recv_exactly(self, view):
+        sock = self.socket
+        received = 0
+        size = len(view)
+        while received < size:
+            n = sock.recv_into(view[received:])
+            if n == 0:
+                raise ConnectionError("connection closed by the hand")
+            received += n
+
+    def _transact(self, request, function):
+        """Send a request frame (its transaction id already set) and receive the response PDU into self._rx[7:].
+
+        Returns:
+            int: 0 for a normal response, or the Modbus exception code.
+        Raises:
+            ModbusIOException: no response within the timeout, or the connection failed
+        """
+        if self.socket is None:
+            raise ModbusIOException(f"{self.host}:{self.port} is not connected")
+        tid = TID.unpack_from(request)[0]
+        view = self._rx_view
+        try:
+            self.socket.sendall(request)
+            while True:
+                self._recv_exactly(view[:MBAP.size])
+                rx_tid, protocol, length, unit = MBAP.unpack_from(self._rx)
+                if length < 2 or MBAP.size - 1 + length > MAX_FRAME_BYTES:
+                    raise ConnectionError(f"bad MBAP length {length}")
+                self._recv_exactly(view[MBAP.size:MBAP.size - 1 + length])
+                if rx_tid == tid:
+                    break
+        except (OSError, ConnectionError) as e:
+            # timeouts included: the stream may be out of step, start over
+            self.close()
+            raise ModbusIOException(f"{self.host}:{self.port}: {e}")
+        code = self._rx[MBAP.size]
+        if code == function:
+            return 0
+        if code == function | 0x80:
+            return self._rx[MBAP.size + 1]
+        self.close()
+        raise ModbusIOException(f"Unexpected function code {code} in the response to {function}")
+
+    def _next_tid(self):
+        self._tid = self._tid + 1 & 0xFFFF
+        return self._tid
+
+    def _read_request(self, address, count, unit):
+        key = (unit, address, count)
+        request = self._frames.get(key)
+        if request is None:
+            request = self._frames[key] = bytearray(READ_REQUEST.pack(0, 0, 6, unit, 3, address, count))
+        TID.pack_into(request, 0, self._next_tid())
+        return request
+
+    def _read(self, address, count, unit):
+        code = self._transact(self._read_request(address, count, unit), 3)
+        if not code and self._rx[MBAP.size + 1] != 2 * count:
+            self.close()
+            raise ModbusIOException(f"Unit {unit} returned {self._rx[MBAP.size + 1]} bytes for {count} registers")
+        return code
+
+    # hot path
+    def read_holding_registers_into(self, address, count, unit, out):
+        """FC3 read, copying the 2 * count payload bytes into the writable buffer `out`.
+
+        Returns:
+            bool: True on success, False on an exception response.
+        Raises:
+            ModbusIOException: no valid response
+        """
+        if self._read(address, count, unit):
+            return False
+        start = MBAP.size + 2
+        out[:] = self._rx_view[start:start + 2 * count]
+        return True
+
+    # pymodbus client subset
+    def read_holding_registers(self, address, count=1, slave=1):
+        code = self._read(address, count, slave)
+        if code:
+            return ExceptionResponse(3, code)
+        return ReadHoldingRegistersResponse(list(struct.unpack_from(f'>{count}H', self._rx, MBAP.size + 2)))
+
+    def write_registers(self, address, values, slave=1):
+        count = len(values)
+        request = WRITE_REQUEST.pack(self._next_tid(), 0, 7 + 2 * count, slave, 16, address, count, 2 * count) \
+            + struct.pack(f'>{count}H', *[v & 0xFFFF for v in values])
+        code = self._transact(request, 16)
+        if code:
+            return ExceptionResponse(16, code)
+        return WriteMultipleRegistersResponse(address, count)
+
+    def write_register(self, address, value, slave=1):
+        code = self._transact(SINGLE_REQUEST.pack(self._next_tid(), 0, 6, slave, 6, address, value & 0xFFFF), 6)
+        if code:
+            return ExceptionResponse(6, code)
+        return WriteSingleRegisterResponse(address, value)
+
+    def readwrite_registers(self, read_address=0, read_count=0, write_address=0, values=(), slave=1):
+        count = len(values)
+        request = READWRITE_REQUEST.pack(self._next_tid(), 0, 11 + 2 * count, slave, 23, read_address, read_count,
+                                         write_address, count, 2 * count) \
+            + struct.pack(f'>{count}H', *[v & 0xFFFF for v in values])
+        code = self._transact(request, 23)
+        if code:
+            return ExceptionResponse(23, code)
+        if self._rx[MBAP.size + 1] != 2 * read_count:
+            self.close()
+            raise ModbusIOException(f"Unit {slave} returned {self._rx[MBAP.size + 1]} bytes for {read_count} registers")
+        return ReadWriteMultipleRegistersResponse(list(struct.unpack_from(f'>{read_count}H', self._rx, MBAP.size + 2)))
@@ -0,0 +1,160 @@
+"""
+Per-taxel baseline and drift compensation.
+
+The unloaded value of every taxel drifts with temperature and shifts after
+impacts. TouchBaseline keeps a running baseline of each taxel of the flat
+touch frame (see touch_frame.py) and writes ``raw - baseline`` to the frame
+that is published, so every consumer gets compensated data.
+
+The baseline is an exponential moving average with a time constant in
+seconds (the smoothing factor follows the actual frame interval, so it does
+not depend on the read rate), and it only follows regions that are not in
+contact: a region whose largest compensated taxel exceeds its threshold keeps
+its baseline frozen until it is released, so a held object is not absorbed
+into the baseline.
+
+Baselines are saved every save_interval seconds (and by save()) to one .npy
+file per hand and loaded at startup, so a restarted driver is compensated
+from the first frame; without a saved file the first frame becomes the
+baseline.
+"""
+
+import math
+import os
+import re
+import time
+
+import numpy as np
+
+DEFAULT_BASELINE_DIR = os.path.join('~', '.inspire_hand', 'touch_baseline')
+
+
+def baseline_path(directory, hand_serial):
+    """File holding the baseline of the hand `hand_serial` in `directory`."""
+    name = re.sub(r'[^\w.-]', '_', str(hand_serial))
+    return os.path.join(os.path.expanduser(directory), f"touch_baseline_{name}.npy")
+
+
+class TouchBaseline:
+    """Drift compensation of a flat touch frame.
+
+    Args:
+        raw (np.ndarray): Flat int16 frame the hand's registers are decoded into, read at every update().
+        out (np.ndarray): Flat int16 frame written with raw - baseline at every update() (the published frame).
+        layout (TouchLayout): Offset index of both frames.
+        time_constant (float, optional): Seconds for the baseline to follow 63% of a step while out of contact. Defaults to 10.0.
+        threshold (int or dict, optional): Compensated value above which a region counts as in contact and its baseline is frozen, or {region pattern: value}. Defaults to 20.
+        path (str, optional): .npy file the baseline is loaded from and saved to, see baseline_path(). Defaults to None, not persisted.
+        save_interval (float, optional): Seconds between saves to `path`, None only on save(). Defaults to 60.0.
+        clock (callable, optional): Time source. Defaults to time.perf_counter.
+
+    Attributes:
+        baseline (np.ndarray): float32 baseline of every taxel (the packed region taxels, see TouchLayout.pack).
+        contact (np.ndarray): Per region (layout.vars order), True while its baseline is frozen.
+        loaded (bool): The baseline came from `path`.
+    """
+
+    def __init__(self, raw, out, layout, time_constant=10.0, threshold=20, path=None, save_interval=60.0, clock=None):
+        self.raw = raw
+        self.out = out
+        self.layout = layout
+        self.time_constant = time_constant
+        self.path = path
+        self.save_interval = save_interval
+        self.clock = clock or time.perf_counter
+        self.thresholds = layout.per_region(threshold, dtype=np.float32)
+        # the baseline works on the packed region taxels (see TouchLayout.pack), so gaps
+        # left in the frame by a data sheet of only some regions are skipped
+        self._starts = layout.starts
+        self._packed = layout.new_packed()
+        # region index of every taxel, to spread the per-region contact flags over them
+        self._taxel_region = layout.per_taxel(np.arange(len(layout.vars)))
+
+        size, regions = layout.count, len(layout.vars)
+        self.baseline = np.zeros(size, dtype=np.float32)
+        self._residual = np.zeros(size, dtype=np.float32)
+        self._step = np.zeros(size, dtype=np.float32)
+        self._frozen = np.zeros(size, dtype=bool)
+        self._region_max = np.zeros(regions, dtype=np.float32)
+        self.contact = np.zeros(regions, dtype=bool)
+        self._last = None
+        self._last_save = None
+        self.loaded = self.load()
+        self._ready = self.loaded
+        self.frames = 0
+
+    def load(self):
+        """Load the baseline from `path`; returns False when there is none or it does not fit this layout."""
+        if self.path is None or not os.path.exists(self.path):
+            return False
+        try:
+            baseline = np.load(self.path)
+        except (OSError, ValueError) as e:
+            print(f"Could not load the touch baseline {self.path}: {e}")
+            return False
+        if baseline.shape != self.baseline.shape:
+            print(f"Ignoring the touch baseline {self.path}: {baseline.size} taxels, expected {self.baseline.size}")
+            return False
+        np.copyto(self.baseline, baseline, casting='unsafe')
+        print(f"Loaded the touch baseline {self.path}")
+        return True
+
+    def save(self):
+        """Write the baseline to `path` (atomically); returns True on success."""
+        if self.path is None or not self._ready:
+            return False
+        directory = os.path.dirname(self.path)
+        tmp = self.path + '.tmp'
+        try:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp, 'wb') as f:
+                np.save(f, self.baseline)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Could not save the touch baseline {self.path}: {e}")
+            return False
+        return True
+
+    def update(self, now=None):
+        """Compensate the current raw frame into `out` and let the baseline of released regions follow it."""
+        if now is None:
+            now = self.clock()
+        residual = self._residual
+        raw = self.layout.pack(self.raw, self._packed)
+        if not self._ready:
+            np.copyto(self.baseline, raw, casting='unsafe')
+            self._ready = True
+        np.copyto(residual, raw, casting='unsafe')
+        residual -= self.baseline
+
+        np.maximum.reduceat(residual, self._starts, out=self._region_max)
+        np.greater(self._region_max, self.thresholds, out=self.contact)
+        if self._last is not None:
+            alpha = 1.0 - math.exp(-(now - self._last) / self.time_constant)
+            np.multiply(residual, alpha, out=self._step)
+            np.take(self.contact, self._taxel_region, out=self._frozen)
+            self._step[self._frozen] = 0.0
+            self.baseline += self._step
+        self._last = now
+
+        np.rint(residual, out=residual)
+        np.clip(residual, -32768, 32767, out=residual)
+        self.layout.unpack(residual, self.out)
+        self.frames += 1
+
+        if self.path is not None and self.save_interval is not None:
+            if self._last_save is None:
+                self._last_save = now
+            elif now - self._last_save >= self.save_interval:
+                self._last_save = now
+                self.save()
+
+    def stats(self):
+        return {
+            'frames': self.frames,
+            'loaded': self.loaded,
+            'regions_in_contact': int(self.contact.sum()),
+            'baseline_mean': float(self.baseline.mean()),
+            'path': self.path,
+        }
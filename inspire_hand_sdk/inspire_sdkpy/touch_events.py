@@ -0,0 +1,118 @@
+"""
+Contact events per tactile region.
+
+Reactive grasping needs to know that a region was touched or released, not
+the taxels themselves. TouchEventDetector runs in the handler's acquisition
+loop on the frame the sweep has just decoded (after drift compensation, if
+enabled) and before anything else is published, so an event leaves the
+driver one vectorized pass after the registers arrive.
+
+Per region, with the region peak (largest taxel) as the signal:
+
+* touch_on when the peak rises above ``on``, touch_off when it falls below
+  ``off`` (off < on, so noise around one threshold does not chatter);
+* pressure_spike when the peak rose by more than ``spike`` since the
+  previous frame.
+
+Frames without events publish nothing; the others publish one
+inspire_hand_touch_events message listing every event of the frame with the
+wall-clock time the frame was decoded.
+"""
+
+import time
+
+import numpy as np
+
+from .inspire_hand_defaut import get_inspire_hand_touch_events
+from .touch_frame import region_value
+
+TOUCH_ON, TOUCH_OFF, PRESSURE_SPIKE = 'touch_on', 'touch_off', 'pressure_spike'
+DEFAULT_ON, DEFAULT_SPIKE = 30, 200
+
+
+class TouchEventDetector:
+    """Hysteresis contact and spike events of every region of a flat touch frame.
+
+    Args:
+        frame (np.ndarray): Flat int16 frame, read in place at every update().
+        layout (TouchLayout): Offset index of `frame`.
+        on (int or dict, optional): Peak above which a region is touched, or {region pattern: value} (unlisted regions use 30). Defaults to 30.
+        off (int or dict, optional): Peak below which a touched region is released. Defaults to None, on // 2.
+        spike (int or dict, optional): Peak rise from one frame to the next reported as pressure_spike (unlisted regions of a dict use 200), None for no spike events. Defaults to 200.
+        clock (callable, optional): Wall-clock time source for the stamps. Defaults to time.time.
+
+    Attributes:
+        message (inspire_hand_touch_events): Events of the last update() that had any.
+        touched (np.ndarray): Per region (layout.vars order), current hysteresis state.
+        counts (dict): Events of each kind since start.
+    """
+
+    def __init__(self, frame, layout, on=DEFAULT_ON, off=None, spike=DEFAULT_SPIKE, clock=None):
+        self.frame = frame
+        self.layout = layout
+        self.vars = layout.vars
+        self.clock = clock or time.time
+        self.on = layout.per_region(on, DEFAULT_ON)
+        self.off = self.on // 2
+        if off is not None:
+            self.off = np.array([region_value(var, off, default) for var, default in zip(self.vars, self.off)], dtype=np.int32)
+        if (self.off >= self.on).any():
+            raise ValueError("the touch_off threshold of every region must be below its touch_on threshold")
+        self.spike = layout.per_region(spike, DEFAULT_SPIKE) if spike is not None else None
+        self._starts = layout.starts
+        self._packed = layout.new_packed()
+
+        regions = len(self.vars)
+        self._peak = np.zeros(regions, dtype=np.int32)
+        self._last_peak = np.zeros(regions, dtype=np.int32)
+        self._rise = np.zeros(regions, dtype=np.int32)
+        self.touched = np.zeros(regions, dtype=bool)
+        self._touch_on = np.zeros(regions, dtype=bool)
+        self._touch_off = np.zeros(regions, dtype=bool)
+        self._spike = np.zeros(regions, dtype=bool)
+        self._first = True
+        self.message = get_inspire_hand_touch_events()
+        self.counts = {TOUCH_ON: 0, TOUCH_OFF: 0, PRESSURE_SPIKE: 0}
+
+    def update(self, stamp=None):
+        """Detect the events of the current frame; returns the message, or None when there are none."""
+        peak = self._peak
+        np.maximum.reduceat(self.layout.pack(self.frame, self._packed), self._starts, out=peak)
+        touched = self.touched
+        np.greater(peak, self.on, out=self._touch_on)
+        self._touch_on &= ~touched
+        np.less(peak, self.off, out=self._touch_off)
+        self._touch_off &= touched
+        touched |= self._touch_on
+        touched &= ~self._touch_off
+
+        spike = self.spike is not None and not self._first
+        if spike:
+            np.subtract(peak, self._last_peak, out=self._rise)
+            np.greater(self._rise, self.spike, out=self._spike)
+        np.copyto(self._last_peak, peak)
+        self._first = False
+
+        any_spike = spike and self._spike.any()
+        if not (self._touch_on.any() or self._touch_off.any() or any_spike):
+            return None
+        region, event, peaks = [], [], []
+        kinds = [(TOUCH_ON, self._touch_on), (TOUCH_OFF, self._touch_off)]
+        if any_spike:
+            kinds.append((PRESSURE_SPIKE, self._spike))
+        for kind, mask in kinds:
+            for i in np.flatnonzero(mask):
+                region.append(self.vars[i])
+                event.append(kind)
+                peaks.append(int(peak[i]))
+            self.counts[kind] += int(np.count_nonzero(mask))
+        message = self.message
+        message.seq = (message.seq + 1) & 0xFFFFFFFF
+        message.stamp = self.clock() if stamp is None else stamp
+        message.region = region
+        message.event = event
+        message.peak = peaks
+        return message
+
+    def stats(self):
+        return dict(self.counts, touched=[var for var, t in zip(self.vars, self.touched) if t])
@@ -0,0 +1,108 @@
+"""
+Per-region contact features.
+
+Grasp policies mostly need a few numbers per tactile region, not the 1062 raw
+taxels. TouchFeatures reduces the flat touch frame (see touch_frame.py) to,
+for every region in data_sheet address order:
+
+* total: sum of all taxels;
+* peak: largest taxel;
+* area: taxels above the region's contact threshold;
+* centroid_row / centroid_col: centroid of the taxels above the threshold,
+  weighted by their pressure, in row/column units of the region matrix
+  (NaN while no taxel is above it);
+* contact: area of at least min_area taxels.
+
+Every feature is a whole-frame elementwise operation followed by one
+``reduceat`` over the region starts of the packed taxels (see
+TouchLayout.pack; with a data sheet of only some regions the taxels are
+gathered out of the frame first), so a frame costs a fixed dozen NumPy
+calls whatever the number of regions, all into preallocated arrays. The
+arrays are the fields of ``message`` (inspire_hand_touch_features), which the
+handler publishes on rt/inspire_hand/touch_features/<LR>.
+"""
+
+import numpy as np
+
+from .inspire_hand_defaut import get_inspire_hand_touch_features
+
+
+class TouchFeatures:
+    """Contact features of every region of a flat touch frame.
+
+    Args:
+        frame (np.ndarray): Flat int16 frame, read in place at every update() (e.g. the handler's touch_frame).
+        layout (TouchLayout): Offset index of `frame`.
+        threshold (int or dict, optional): Taxel value above which a taxel is in contact, or {region pattern: value}. Defaults to 0.
+        min_area (int, optional): Taxels in contact for the region's contact flag. Defaults to 1.
+
+    Attributes:
+        message (inspire_hand_touch_features): Message whose fields are the feature arrays below.
+        total, peak, area, centroid_row, centroid_col, contact (np.ndarray): One entry per region, layout.vars order.
+    """
+
+    def __init__(self, frame, layout, threshold=0, min_area=1):
+        self.frame = frame
+        self.layout = layout
+        self.vars = layout.vars
+        self.thresholds = layout.per_region(threshold, dtype=np.float32)
+        self.min_area = min_area
+        self._starts = layout.starts
+        self._packed = layout.new_packed()
+        self._taxel_threshold = layout.per_taxel(self.thresholds)
+        rows, cols = layout.coordinates()
+        self._rows = rows.astype(np.float32)
+        self._cols = cols.astype(np.float32)
+
+        size, regions = layout.count, len(self.vars)
+        self._pressure = np.zeros(size, dtype=np.float32)
+        self._above = np.zeros(size, dtype=bool)
+        self._weight = np.zeros(size, dtype=np.float32)
+        self._moment = np.zeros(size, dtype=np.float32)
+        self._weight_sum = np.zeros(regions, dtype=np.float32)
+        self._empty = np.zeros(regions, dtype=bool)
+
+        self.total = np.zeros(regions, dtype=np.float32)
+        self.peak = np.zeros(regions, dtype=np.int16)
+        self.area = np.zeros(regions, dtype=np.int16)
+        self.centroid_row = np.full(regions, np.nan, dtype=np.float32)
+        self.centroid_col = np.full(regions, np.nan, dtype=np.float32)
+        self.contact = np.zeros(regions, dtype=bool)
+
+        self.message = get_inspire_hand_touch_features()
+        for name in ('total', 'peak', 'area', 'centroid_row', 'centroid_col', 'contact'):
+            setattr(self.message, name, getattr(self, name))
+
+    def update(self):
+        """Recompute every feature from the current frame; returns the message."""
+        offsets = self._starts
+        pressure, above, weight, moment = self._pressure, self._above, self._weight, self._moment
+        taxels = self.layout.pack(self.frame, self._packed)
+        np.copyto(pressure, taxels, casting='unsafe')
+        np.add.reduceat(pressure, offsets, out=self.total)
+        np.maximum.reduceat(taxels, offsets, out=self.peak)
+        np.greater(pressure, self._taxel_threshold, out=above)
+        np.add.reduceat(above, offsets, dtype=np.int16, out=self.area)
+        np.greater_equal(self.area, self.min_area, out=self.contact)
+
+        np.multiply(pressure, above, out=weight)
+        np.add.reduceat(weight, offsets, out=self._weight_sum)
+        np.less_equal(self._weight_sum, 0, out=self._empty)
+        for coordinate, centroid in ((self._rows, self.centroid_row), (self._cols, self.centroid_col)):
+            np.multiply(weight, coordinate, out=moment)
+            np.add.reduceat(moment, offsets, out=centroid)
+            np.divide(centroid, self._weight_sum, out=centroid, where=~self._empty)
+            centroid[self._empty] = np.nan
+        self.message.seq = (self.message.seq + 1) & 0xFFFFFFFF
+        return self.message
+
+    def region(self, var):
+        """Features of one region as a dict."""
+        i = self.vars.index(var)
+        return {
+            'total': float(self.total[i]),
+            'peak': int(self.peak[i]),
+            'area': int(self.area[i]),
+            'centroid': (float(self.centroid_row[i]), float(self.centroid_col[i])),
+            'contact': bool(self.contact[i]),
+        }
@@ -0,0 +1,96 @@
+"""
+Change-driven publishing of the touch message.
+
+Out of contact most taxels read zero or hold still, yet every read() would
+publish all 1062 of them. TouchChangeFilter compares each complete touch
+frame with the last published one and lets it through only when some region
+moved by more than its threshold, or when the keyframe interval has passed
+(so late joiners and lossy readers converge). The comparison is one
+vectorized pass over the packed taxels of the frame (see TouchLayout.pack;
+the registers between the regions of a partial data sheet are left out): a
+difference into a preallocated buffer and a per-region ``np.maximum.reduceat``
+over the packed region starts.
+"""
+
+import time
+
+import numpy as np
+
+
+
+class TouchChangeFilter:
+    """Decides whether a touch frame is worth publishing.
+
+    Args:
+        frame (np.ndarray): Flat int16 frame, read in place at every update() (e.g. the handler's touch_frame).
+        layout (TouchLayout): Offset index of `frame`.
+        threshold (int or dict, optional): Largest change of any taxel of a
+            region that is still suppressed, or {var or fnmatch pattern:
+            threshold} (first match wins, unmatched regions use 0). Defaults to 0,
+            i.e. publish on any change.
+        keyframe_interval (float, optional): Seconds after which a frame is
+            published even without changes, None never forces one. Defaults to 1.0.
+        clock (callable, optional): Time source. Defaults to time.perf_counter.
+
+    Attributes:
+        published (int): Frames let through.
+        suppressed (int): Frames held back.
+        keyframes (int): Frames let through only because of the keyframe interval.
+        region_changes (dict): var -> frames let through because that region changed.
+    """
+
+    def __init__(self, frame, layout, threshold=0, keyframe_interval=1.0, clock=None):
+        self.keyframe_interval = keyframe_interval
+        self.clock = clock or time.perf_counter
+        self.frame = frame
+        self.layout = layout
+        self.vars = layout.vars
+        self.starts = layout.starts
+        self.thresholds = layout.per_region(threshold, dtype=np.int32)
+        self._packed = layout.new_packed()
+
+        self._last = np.zeros(layout.count, dtype=np.int32)
+        self._diff = np.zeros(layout.count, dtype=np.int32)
+        self._region_max = np.zeros(len(self.vars), dtype=np.int32)
+        self._changed = np.zeros(len(self.vars), dtype=bool)
+        self._last_publish = None
+        self.published = 0
+        self.suppressed = 0
+        self.keyframes = 0
+        self._region_counts = np.zeros(len(self.vars), dtype=np.int64)
+
+    def update(self, now=None):
+        """Check the current frame; True means publish it (it becomes the new reference)."""
+        if now is None:
+            now = self.clock()
+        taxels = self.layout.pack(self.frame, self._packed)
+        if self._last_publish is not None:
+            np.subtract(taxels, self._last, out=self._diff)
+            np.abs(self._diff, out=self._diff)
+            np.maximum.reduceat(self._diff, self.starts, out=self._region_max)
+            np.greater(self._region_max, self.thresholds, out=self._changed)
+            if self._changed.any():
+                self._region_counts += self._changed
+            elif self.keyframe_interval is not None and now - self._last_publish >= self.keyframe_interval:
+                self.keyframes += 1
+            else:
+                self.suppressed += 1
+                return False
+        np.copyto(self._last, taxels)
+        self._last_publish = now
+        self.published += 1
+        return True
+
+    @property
+    def region_changes(self):
+        return dict(zip(self.vars, self._region_counts.tolist()))
+
+    def stats(self):
+        total = self.published + self.suppressed
+        return {
+            'published': self.published,
+            'suppressed': self.suppressed,
+            'keyframes': self.keyframes,
+            'suppressed_ratio': self.suppressed / total if total else 0.0,
+            'region_changes': self.region_changes,
+        }
@@ -0,0 +1,154 @@
+"""
+Flat tactile frame.
+
+All tactile regions of ``data_sheet`` lie back to back in 3000-5123, so the
+whole hand is one ``int16[1062]`` frame. TouchLayout is the precomputed
+offset/shape index of that frame: every region is a zero-copy view into it,
+and whole-hand work (max, sum, normalization, change detection) is a single
+vector operation on the frame instead of one pass per region.
+
+On the driver side the frame is the touch decoder's register array itself;
+on the subscriber side it is the ``data`` of one ``inspire_hand_touch_frame``
+message, converted once:
+
+    layout = TouchLayout()
+    frame = layout.frame_from(msg.data)
+    regions = layout.views(frame)       # var -> matrix view, no copies
+
+A data sheet with only some of the regions leaves gaps in the frame (the
+registers between them, never read). Per-region reductions therefore work on
+the *packed* taxels, the regions back to back without gaps: ``pack()``
+returns the frame itself when it has no gaps and gathers the region taxels
+into a buffer otherwise, and ``starts`` are the region offsets in that packed
+order. The driver publishes such a sheet packed as well (only the taxels go
+on the wire) and ``frame_from`` spreads it back out into the gapped frame.
+"""
+
+import fnmatch
+
+import numpy as np
+
+from .inspire_hand_defaut import data_sheet
+from .read_planner import REGISTER_BYTES
+
+
+def region_value(var, value, default=0):
+    """Per-region setting: `value` itself, or from {var or fnmatch pattern: value} (first match wins, else `default`)."""
+    if not isinstance(value, dict):
+        return value
+    for pattern, v in value.items():
+        if fnmatch.fnmatchcase(var, pattern):
+            return v
+    return default
+
+
+class TouchLayout:
+    """Offset and shape index of the flat tactile frame.
+
+    Args:
+        data (list, optional): data_sheet style region list (name, addr, length, size, var). Defaults to data_sheet.
+
+    Attributes:
+        vars (list): Region names in frame order.
+        offsets (np.ndarray): First taxel of each region in the frame.
+        sizes (np.ndarray): Taxels of each region.
+        starts (np.ndarray): First taxel of each region in the packed taxels.
+        shapes (dict): var -> matrix shape.
+        base (int): Register address of taxel 0.
+        size (int): Length of the frame, gaps between regions included.
+        count (int): Taxels of all regions, i.e. length of the packed taxels.
+        contiguous (bool): The frame has no gaps, so the packed taxels are the frame itself.
+        taxels (np.ndarray): Frame index of every packed taxel.
+    Raises:
+        ValueError: raise when regions overlap
+    """
+
+    def __init__(self, data=data_sheet):
+        regions = sorted(data, key=lambda region: region[1])
+        self.base = regions[0][1]
+        self.vars = []
+        offsets, sizes = [], []
+        self.shapes = {}
+        end = 0
+        for name, addr, length, size, var in regions:
+            offset = (addr - self.base) // REGISTER_BYTES
+            if offset < end:
+                raise ValueError(f"touch region {var} overlaps the previous one")
+            self.vars.append(var)
+            offsets.append(offset)
+            sizes.append(length // REGISTER_BYTES)
+            self.shapes[var] = tuple(size)
+            end = offset + length // REGISTER_BYTES
+        self.offsets = np.array(offsets, dtype=np.intp)
+        self.sizes = np.array(sizes, dtype=np.intp)
+        self.starts = np.concatenate(([0], np.cumsum(self.sizes)[:-1])).astype(np.intp)
+        self.size = end
+        self.count = int(self.sizes.sum())
+        self.contiguous = self.count == self.size
+        self.taxels = np.concatenate([np.arange(offset, offset + count) for offset, count in zip(offsets, sizes)])
+        self.index = {var: (int(offset), int(count)) for var, offset, count in zip(self.vars, offsets, sizes)}
+
+    def new_frame(self):
+        return np.zeros(self.size, dtype=np.int16)
+
+    def new_packed(self, dtype=np.int16):
+        """Buffer for pack(), None when the frame has no gaps and pack() needs none."""
+        return None if self.contiguous else np.zeros(self.count, dtype=dtype)
+
+    def pack(self, frame, out=None):
+        """The region taxels of `frame` back to back: `frame` itself without gaps, else gathered into `out` (see new_packed)."""
+        if self.contiguous:
+            return frame
+        return np.take(frame, self.taxels, out=out)
+
+    def unpack(self, packed, frame):
+        """Write packed taxels back to their places in `frame` (cast to its dtype)."""
+        if self.contiguous:
+            np.copyto(frame, packed, casting='unsafe')
+        else:
+            np.put(frame, self.taxels, packed)
+
+    def frame_from(self, values, out=None):
+        """Frame from a received sequence of taxels, into `out` if given.
+
+        A sheet with gaps is received packed (`count` taxels) and unpacked into the gapped frame.
+        """
+        if not self.contiguous:
+            if out is None:
+                out = self.new_frame()
+            self.unpack(np.asarray(values, dtype=np.int16), out)
+            return out
+        if out is None:
+            return np.asarray(values, dtype=np.int16)
+        out[:] = values
+        return out
+
+    def region(self, frame, var):
+        """Matrix view of one region of `frame`."""
+        offset, count = self.index[var]
+        return frame[offset:offset + count].reshape(self.shapes[var])
+
+    def views(self, frame):
+        """var -> matrix view of every region of `frame`; build once per frame buffer and keep."""
+        return {var: self.region(frame, var) for var in self.vars}
+
+    def per_region(self, value, default=0, dtype=np.int32):
+        """Array in vars order of a setting given as a number or {region pattern: value}, see region_value()."""
+        return np.array([region_value(var, value, default) for var in self.vars], dtype=dtype)
+
+    def per_taxel(self, values):
+        """Expand one value per region (vars order) to one value per packed taxel."""
+        return np.repeat(values, self.sizes)
+
+    def coordinates(self):
+        """(rows, cols): the matrix row and column of every packed taxel within its region."""
+        rows, cols = [], []
+        for var in self.vars:
+            r, c = np.indices(self.shapes[var])
+            rows.append(r.ravel())
+            cols.append(c.ravel())
+        return np.concatenate(rows), np.concatenate(cols)
+
+    def reduce(self, ufunc, frame, out=None):
+        """Per-region reduction in one call, e.g. layout.reduce(np.maximum, frame) -> region peaks in vars order."""
+        return ufunc.reduceat(self.pack(frame), self.starts, out=out)
@@ -0,0 +1,57 @@
+import multiprocessing
+import os
+import socket
+import sys
+
+import pytest
+
+# run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope='session')
+def dds():
+    """DDS participant for handlers created with initDDS=False."""
+    channel = pytest.importorskip('unitree_sdk2py.core.channel')
+    channel.ChannelFactoryInitialize(0)
+
+
+@pytest.fixture
+def simulator():
+    """(HandSimulator, port) serving hand 1 over ModbusTCP on localhost."""
+    from inspire_sdkpy.simulator import HandSimulator
+    sim = HandSimulator((1,), seed=0)
+    port = sim.start_tcp('127.0.0.1', free_port())
+    yield sim, port
+    sim.stop()
+
+
+def _serve(conn, port):
+    from inspire_sdkpy.simulator import HandSimulator
+    sim = HandSimulator((1,), seed=0)
+    try:
+        sim.start_tcp('127.0.0.1', port)
+        conn.send(port)
+        conn.recv()
+    finally:
+        sim.stop()
+
+
+@pytest.fixture
+def remote_simulator():
+    """Port of a simulator in a child process, so it neither competes for the GIL nor shows up in tracemalloc."""
+    port = free_port()
+    conn, child_conn = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_serve, args=(child_conn, port), daemon=True)
+    process.start()
+    assert conn.poll(10), "simulator did not start"
+    conn.recv()
+    yield port
+    conn.send(None)
+    process.join(5)
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('inspire_sdkpy', reason='needs the SDK dependencies (cyclonedds, unitree_sdk2py, PyQt5)')
+
+from inspire_sdkpy.inspire_sdk_async import AsyncModbusDataHandler
+
+
+def test_state_only_handler(dds, simulator):
+    sim, port = simulator
+
+    async def main():
+        handler = AsyncModbusDataHandler(data=[], ip='127.0.0.1', port=port, initDDS=False)
+        await handler.connect()
+        try:
+            result = await handler.read()
+        finally:
+            handler.close()
+        return handler, result
+
+    handler, result = asyncio.run(main())
+    assert handler.pub is None
+    assert list(result['states']['ANGLE_ACT']) == [a - 0x10000 if a & 0x8000 else a for a in sim.hands[1].read_registers(1546, 6)]
+
+
+def test_incomplete_sweeps_are_not_published_and_run_reconnects(dds, simulator):
+    sim, port = simulator
+    writes = []
+
+    async def main():
+        handler = AsyncModbusDataHandler(ip='127.0.0.1', port=port, initDDS=False, timeout=0.2)
+        await handler.connect()
+        handler.state_pub.Write = writes.append
+        await handler.read()
+        assert len(writes) == 1
+        handler.client.transport.abort()
+        await asyncio.sleep(0.05)
+        await handler.read()
+        # the connection is gone: nothing new is published
+        assert len(writes) == 1
+        runner = asyncio.create_task(handler.run(rate=100))
+        try:
+            for _ in range(100):
+                await asyncio.sleep(0.02)
+                if len(writes) > 1:
+                    break
+        finally:
+            runner.cancel()
+            handler.close()
+        return handler
+
+    handler = asyncio.run(main())
+    assert handler.reconnects == 1
+    assert len(writes) > 1
+
+
+@pytest.mark.parametrize('pdu', [b'', b'\x03', b'\x83', b'\x03\x02\x00'], ids=['empty', 'function only', 'truncated exception', 'short payload'])
+def test_malformed_responses_are_failed_reads(dds, pdu, capsys):
+    handler = AsyncModbusDataHandler(data=[], ip='127.0.0.1', initDDS=False)
+
+    async def execute(unit, request):
+        return pdu
+
+    handler.client.execute = execute
+
+    async def main():
+        out = bytearray(4)
+        results = [await handler._read_block(1546, 2, out) for _ in range(3)]
+        written = await handler.client.write_registers(1486, [1, 2], 1)
+        return results, written
+
+    results, written = asyncio.run(main())
+    assert results == [False] * 3
+    assert written is False
+    # one line for the three failures
+    assert capsys.readouterr().out.count("Error reading registers") == 1
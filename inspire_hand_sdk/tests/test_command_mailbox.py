@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip('inspire_sdkpy', reason='needs the SDK dependencies (cyclonedds, unitree_sdk2py, PyQt5)')
+
+from inspire_sdkpy.command_mailbox import CommandMailbox
+from inspire_sdkpy.inspire_hand_defaut import get_inspire_hand_ctrl
+
+
+def ctrl(mode, value):
+    msg = get_inspire_hand_ctrl()
+    msg.mode = mode
+    for name in ('angle_set', 'pos_set', 'force_set', 'speed_set'):
+        setattr(msg, name, [value] * 6)
+    return msg
+
+
+def test_newest_value_per_mode_wins():
+    box = CommandMailbox(deadline=None)
+    box.post(ctrl(0b0001, 100), received=0.0)
+    box.post(ctrl(0b0101, 200), received=0.1)
+    msg, received = box.take(now=0.2)
+    assert msg.mode == 0b0101
+    assert list(msg.angle_set) == [200] * 6
+    assert list(msg.force_set) == [200] * 6
+    assert received == 0.1
+    assert box.superseded == 1
+    assert box.take(now=0.3) is None
+
+
+def test_angle_and_position_exclude_each_other():
+    box = CommandMailbox(deadline=None)
+    box.post(ctrl(0b0001, 100), received=0.0)
+    box.post(ctrl(0b0010, 300), received=0.1)
+    msg, received = box.take(now=0.2)
+    assert msg.mode == 0b0010
+    assert list(msg.pos_set) == [300] * 6
+
+
+def test_stale_commands_are_dropped():
+    box = CommandMailbox(deadline=0.1)
+    box.post(ctrl(0b0001, 100), received=0.0)
+    box.post(ctrl(0b0100, 500), received=0.25)
+    msg, received = box.take(now=0.3)
+    assert msg.mode == 0b0100
+    assert box.stale == 1
+    assert box.stats() == {'posted': 2, 'superseded': 0, 'stale': 1, 'delivered': 1}
+
+
+def test_control_rate_limits_takes():
+    box = CommandMailbox(control_rate=100, deadline=None)
+    assert box.due(now=0.0)
+    box.take(now=0.0)
+    assert not box.due(now=0.005)
+    assert box.due(now=0.0101)
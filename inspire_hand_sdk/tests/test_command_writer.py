@@ -0,0 +1,46 @@
+import pytest
+
+pytest.importorskip('inspire_sdkpy', reason='needs the SDK dependencies (cyclonedds, unitree_sdk2py, PyQt5)')
+
+from inspire_sdkpy.command_writer import COMMAND_REGISTERS, COMMAND_START, CommandWriter
+from inspire_sdkpy.inspire_hand_defaut import get_inspire_hand_ctrl
+
+
+def command(mode, **groups):
+    msg = get_inspire_hand_ctrl()
+    for name, value in groups.items():
+        setattr(msg, name, [value] * 6)
+    msg.mode = mode
+    return msg
+
+
+@pytest.mark.parametrize('mode, writes', [
+    (0b0001, [(1486, 6)]),
+    (0b0011, [(1474, 12)]),
+    (0b0111, [(1474, 18)]),
+    (0b0110, [(1474, 6), (1498, 6)]),
+    (0b1100, [(1498, 6), (1522, 6)]),
+    (0b1111, [(1474, 18), (1522, 6)]),
+], ids=['angle', 'pos+angle', 'pos+angle+force', 'pos+force', 'force+speed', 'all'])
+def test_only_adjacent_requested_groups_are_merged(mode, writes):
+    writer = CommandWriter()
+    writer.load(range(COMMAND_REGISTERS))
+    msg = command(mode, pos_set=100, angle_set=200, force_set=300, speed_set=400)
+    plan = writer.plan(msg)
+    assert [(address, len(values)) for address, values in plan] == writes
+    # nothing but the requested values: no -1 fill, no cached registers
+    assert all(value in (100, 200, 300, 400) for address, values in plan for value in values)
+
+
+def test_writes_leave_other_groups_to_other_writers():
+    from inspire_sdkpy.simulator.hand_model import SimulatedHand
+    hand = SimulatedHand(1)
+    writer = CommandWriter()
+    writer.load(hand.read_registers(COMMAND_START, COMMAND_REGISTERS))
+    # another client moves the angle target after the cache was filled
+    hand.write_registers(1486, [500] * 6)
+    for address, values in writer.plan(command(0b0110, pos_set=100, force_set=300)):
+        hand.write_registers(address, values)
+    assert hand.read_registers(1474, 6) == [100] * 6
+    assert hand.read_registers(1486, 6) == [500] * 6
+    assert hand.read_registers(1498, 6) == [300] * 6
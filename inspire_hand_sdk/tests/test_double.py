@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+pytest.importorskip('inspire_sdkpy', reason='needs the SDK dependencies (cyclonedds, unitree_sdk2py, PyQt5)')
+
+from inspire_sdkpy.inspire_sdk_double import ModbusDataHandlerDouble
+from inspire_sdkpy.simulator import HandSimulator
+
+from conftest import free_port
+
+
+@pytest.fixture
+def double(dds):
+    sim = HandSimulator((1, 2), seed=0)
+    port = sim.start_tcp('127.0.0.1', free_port())
+    handler = ModbusDataHandlerDouble(data=[], ip='127.0.0.1', port=port, initDDS=False, metrics_interval=None, transport='lean')
+    yield sim, handler
+    handler.close()
+    sim.stop()
+
+
+def test_registers_go_to_the_hand_with_the_device_id(double):
+    sim, handler = double
+    assert handler.write_registers(1498, [300] * 6, device_id=2)
+    assert sim.hands[2].read_registers(1498, 6) == [300] * 6
+    assert sim.hands[1].read_registers(1498, 6) != [300] * 6
+    assert handler.read_registers(1498, 6, device_id=2) == [300] * 6
+
+
+def test_unknown_device_id_is_rejected(double):
+    sim, handler = double
+    with pytest.raises(ValueError):
+        handler.write_registers(1498, [300] * 6, device_id=3)
+    with pytest.raises(ValueError):
+        handler.read_registers(1498, 6, device_id=3)
+    assert sim.hands[2].read_registers(1498, 6) != [300] * 6
+
+
+def test_options_reach_both_hands_and_the_old_attributes_remain(double):
+    sim, handler = double
+    assert handler.shared_link
+    assert all(hand.metrics_pub is None and not hand.read_touch for hand in handler.hands)
+    assert handler.client is handler.hands[1].client
+    assert handler.history is handler.hands[0].history
+    assert handler.states_structure == handler.hands[1].states_structure
+
+
+def test_shared_link_is_closed_once(double):
+    sim, handler = double
+    closes = []
+    client = handler.client
+    close = client.close
+    client.close = lambda: closes.append(1) or close()
+    handler.close()
+    assert closes == [1]
+
+
+def test_acquisition_thread_takes_both_hands(double):
+    from inspire_sdkpy.acquisition import AcquisitionThread
+    sim, handler = double
+    thread = AcquisitionThread(handler, rate=200)
+    thread.start()
+    try:
+        for _ in range(200):
+            snapshot = thread.latest_copy()
+            if snapshot is not None:
+                break
+            time.sleep(0.01)
+    finally:
+        thread.stop()
+    assert [list(hand['states']['ANGLE_ACT']) for hand in snapshot.data] == [list(hand['states']['ANGLE_ACT']) for hand in handler.read()]
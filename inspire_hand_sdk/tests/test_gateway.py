@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+pytest.importorskip('inspire_sdkpy', reason='needs the SDK dependencies (cyclonedds, unitree_sdk2py, PyQt5)')
+
+from inspire_sdkpy.gateway import HandGateway, _Hand, _LinkWorker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingHandler:
+    def __init__(self):
+        self.reads = 0
+
+    def read(self):
+        self.reads += 1
+
+
+def test_first_read_schedules_the_next_one_a_period_later():
+    clock = Clock()
+    handler = CountingHandler()
+    worker = _LinkWorker(('tcp', '127.0.0.1', 6000), [_Hand('r', handler, 100)], 1.0, print, clock)
+    assert worker.step() == 0.0
+    assert worker.step() == pytest.approx(0.01)
+    assert handler.reads == 1
+    clock.now += 0.01
+    worker.step()
+    assert handler.reads == 2
+    assert worker.hands[0].late == 0
+
+
+@pytest.fixture
+def rtu_port(dds):
+    from inspire_sdkpy.simulator import HandSimulator
+    sim = HandSimulator((1,), seed=0)
+    port = sim.start_rtu(115200, emulate_baudrate=False)
+    yield port
+    sim.stop()
+
+
+def test_budget_applies_to_a_bus_named_through_a_symlink(rtu_port, tmp_path):
+    alias = str(tmp_path / 'hand_bus')
+    os.symlink(rtu_port, alias)
+    hands = [{'name': 'r', 'use_serial': True, 'serial_port': alias}]
+    for budget_name in (alias, rtu_port):
+        gateway = HandGateway(hands, initDDS=False, budget={budget_name: 0.25}, data=[], metrics_interval=None, transport='lean')
+        try:
+            assert gateway.links[alias].budget == 0.25
+        finally:
+            gateway.stop()
+    with pytest.raises(ValueError):
+        HandGateway(hands, initDDS=False, budget={'/dev/no_such_bus': 0.5}, data=[], metrics_interval=None, transport='lean')
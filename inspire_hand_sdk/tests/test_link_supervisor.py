@@ -0,0 +1,68 @@
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip('inspire_sdkpy', reason='needs the SDK dependencies (cyclonedds, unitree_sdk2py, PyQt5)')
+
+from inspire_sdkpy.inspire_sdk import ModbusDataHandler
+from inspire_sdkpy.link_supervisor import CONNECTED, DEGRADED, LinkSupervisor
+
+
+def test_errors_are_logged_once_per_interval(capsys):
+    link = LinkSupervisor(client=None, name='r', log_interval=60.0)
+    for _ in range(100):
+        link.error("Error reading registers")
+    lines = capsys.readouterr().out.splitlines()
+    assert lines == ["Modbus link r: Error reading registers"]
+    assert link.errors == 100
+    link._last_log -= 60.0
+    link.error("Error reading registers")
+    assert "99 more errors" in capsys.readouterr().out
+
+
+def test_exception_response_is_not_a_success(dds, simulator):
+    sim, port = simulator
+    handler = ModbusDataHandler(data=[], ip='127.0.0.1', port=port, initDDS=False, metrics_interval=None, transport='lean')
+    try:
+        out = np.zeros(2, dtype=np.uint8)
+        assert handler.read_registers_into(1546, 1, out)
+        assert handler.link.state == CONNECTED
+        assert not handler.read_registers_into(60000, 1, out)
+        assert handler.link.failures == 1
+        assert handler.link.state == DEGRADED
+    finally:
+        handler.link.close()
+        handler.client.close()
+
+
+def test_reconnect_holds_the_link_lock():
+    lock = threading.Lock()
+    held = []
+
+    class Client:
+        def close(self):
+            held.append(lock.locked())
+
+        def connect(self):
+            held.append(lock.locked())
+            return True
+
+    link = LinkSupervisor(Client(), name='r', probe=lambda: held.append(lock.locked()) or True, lock=lock, lost_after=1)
+    link.record(False)
+    link._thread.join(1)
+    assert link.state == CONNECTED
+    assert held == [True, True, True]
+
+
+def test_transport_leaves_reconnecting_to_the_supervisor(dds, simulator):
+    sim, port = simulator
+    handler = ModbusDataHandler(data=[], ip='127.0.0.1', port=port, initDDS=False, metrics_interval=None, transport='lean')
+    try:
+        handler.client.close()
+        assert handler.read_registers(1000, 1) is None
+        assert not handler.client.connected
+        assert handler.link.failures == 1
+    finally:
+        handler.link.close()
+        handler.client.close()
@@ -0,0 +1,45 @@
+import sys
+import threading
+
+import pytest
+
+pytest.importorskip('inspire_sdkpy', reason='needs the SDK dependencies (cyclonedds, unitree_sdk2py, PyQt5)')
+
+from inspire_sdkpy.metrics import LatencyHistogram
+
+
+def test_percentiles_are_bucket_upper_bounds():
+    histogram = LatencyHistogram()
+    for us in range(1, 101):
+        histogram.record(us * 1e-6)
+    summary = histogram.summary()
+    assert summary['count'] == 100
+    assert 50 <= summary['p50_us'] <= 50 * 2 ** (1 / 8)
+    assert summary['max_us'] == pytest.approx(100)
+
+
+def test_windows_add_up_with_a_second_writer():
+    # switch threads often, so record() and window() interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    histogram = LatencyHistogram()
+    per_thread = 20000
+
+    def write():
+        for _ in range(per_thread):
+            histogram.record(1e-4)
+
+    threads = [threading.Thread(target=write) for _ in range(2)]
+    try:
+        for thread in threads:
+            thread.start()
+        counted = 0
+        while any(thread.is_alive() for thread in threads):
+            counted += histogram.window()['count']
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    counted += histogram.window()['count']
+    assert counted == histogram.count == 2 * per_thread
+    assert sum(histogram.counts) == histogram.count
@@ -0,0 +1,65 @@
+import tracemalloc
+
+import pytest
+
+pytest.importorskip('inspire_sdkpy', reason='needs the SDK dependencies (cyclonedds, unitree_sdk2py, PyQt5)')
+
+from inspire_sdkpy import inspire_sdk
+from inspire_sdkpy.inspire_sdk import ModbusDataHandler
+
+WARMUP = 50
+CYCLES = 200
+# Metric counters are rebound to new int/float objects as they grow, so a
+# handful of blocks (one per counter) may change owner during the window;
+# anything allocated per cycle would show up as CYCLES or more.
+MAX_BLOCKS = 32
+
+
+def new_blocks(handler):
+    """(blocks, bytes) still allocated after CYCLES read() calls, counting only allocations made under read()."""
+    for _ in range(WARMUP):
+        handler.read()
+    only_read = [tracemalloc.Filter(True, inspire_sdk.__file__, all_frames=True)]
+    tracemalloc.start(25)
+    try:
+        # lazily built caches are filled by now, but run a few traced cycles before the first snapshot too
+        for _ in range(10):
+            handler.read()
+        before = tracemalloc.take_snapshot().filter_traces(only_read)
+        for _ in range(CYCLES):
+            handler.read()
+        after = tracemalloc.take_snapshot().filter_traces(only_read)
+    finally:
+        tracemalloc.stop()
+    diff = after.compare_to(before, 'filename')
+    return sum(stat.count_diff for stat in diff), sum(stat.size_diff for stat in diff)
+
+
+@pytest.mark.parametrize('transport', ['pymodbus', 'lean'])
+def test_read_steady_state_does_not_allocate(dds, remote_simulator, transport):
+    handler = ModbusDataHandler(ip='127.0.0.1', port=remote_simulator, initDDS=False, metrics_interval=None, transport=transport)
+    try:
+        result = handler.read()
+        touch = result['touch']['palm_touch']
+        blocks, size = new_blocks(handler)
+        # the result and its arrays are reused, not rebuilt
+        assert handler.read() is result
+        assert result['touch']['palm_touch'] is touch
+    finally:
+        handler.link.close()
+        handler.client.close()
+    assert blocks <= MAX_BLOCKS, f"{blocks} blocks ({size} bytes) left allocated by {CYCLES} read() cycles"
+    assert size / CYCLES < 16, f"{size} bytes left allocated by {CYCLES} read() cycles"
+
+
+def test_read_decodes_simulated_registers(dds, simulator):
+    sim, port = simulator
+    handler = ModbusDataHandler(ip='127.0.0.1', port=port, initDDS=False, metrics_interval=None, transport='lean')
+    try:
+        result = handler.read()
+        angles = sim.hands[1].read_registers(1546, 6)
+        assert list(result['states']['ANGLE_ACT']) == [a - 0x10000 if a & 0x8000 else a for a in angles]
+        assert result['touch']['palm_touch'].shape == (14, 8)
+    finally:
+        handler.link.close()
+        handler.client.close()
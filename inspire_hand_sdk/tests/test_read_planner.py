@@ -0,0 +1,76 @@
+import pytest
+
+pytest.importorskip('inspire_sdkpy', reason='needs the SDK dependencies (cyclonedds, unitree_sdk2py, PyQt5)')
+
+from inspire_sdkpy.inspire_hand_defaut import data_sheet
+from inspire_sdkpy.read_planner import (AdaptiveReadPlan, MAX_READ_REGISTERS, ReadField, ReadPlan,
+                                        fields_from_data_sheet)
+
+
+def fake_bus(fail=()):
+    """read_block over registers whose value is their own address, failing at the given addresses."""
+    calls = []
+
+    def read_block(address, count):
+        calls.append((address, count))
+        if address in fail:
+            return None
+        return [address + 2 * i for i in range(count)]
+    return read_block, calls
+
+
+def test_adjacent_fields_merge_into_one_span():
+    plan = ReadPlan([ReadField('b', 1012, 3), ReadField('a', 1000, 6)])
+    assert len(plan.spans) == 1
+    assert plan.blocks == [(1000, 9, 0, 0)]
+
+
+def test_gap_is_bridged_only_up_to_max_gap():
+    fields = [ReadField('a', 1000, 2), ReadField('b', 1008, 2)]  # 2 registers apart
+    assert len(ReadPlan(fields, max_gap=1).spans) == 2
+    plan = ReadPlan(fields, max_gap=2)
+    assert plan.blocks == [(1000, 6, 0, 0)]
+
+
+def test_spans_are_split_at_the_request_limit():
+    plan = ReadPlan(fields_from_data_sheet(data_sheet))
+    assert plan.register_count == 1062
+    assert all(count <= MAX_READ_REGISTERS for address, count, index, offset in plan.blocks)
+    assert sum(count for address, count, index, offset in plan.blocks) == 1062
+    assert len(plan) == -(-1062 // MAX_READ_REGISTERS)
+
+
+def test_execute_slices_fields_across_blocks():
+    plan = ReadPlan([ReadField('a', 1000, 100), ReadField('b', 1200, 100)], max_registers=64)
+    read_block, calls = fake_bus()
+    values = plan.execute(read_block)
+    assert values['a'] == [1000 + 2 * i for i in range(100)]
+    assert values['b'] == [1200 + 2 * i for i in range(100)]
+    assert len(calls) == 4
+
+
+def test_execute_leaves_out_fields_of_failed_spans():
+    plan = ReadPlan([ReadField('a', 1000, 2), ReadField('b', 2000, 2)])
+    read_block, calls = fake_bus(fail={2000})
+    assert set(plan.execute(read_block)) == {'a'}
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        ReadPlan([], max_gap=-1)
+    with pytest.raises(ValueError):
+        ReadPlan([], max_registers=MAX_READ_REGISTERS + 1)
+
+
+def test_adaptive_plan_keeps_the_faster_candidate():
+    now = [0.0]
+    plan = AdaptiveReadPlan([ReadField('a', 1000, 2), ReadField('b', 1100, 2)], trials=3, clock=lambda: now[0])
+    assert len(plan.wide) == 1 and len(plan.narrow) == 2
+
+    def sweep(p):
+        now[0] += 0.001 * len(p)  # one ms per request
+        return True
+    for _ in range(6):
+        plan.run(sweep)
+    assert plan.plan is plan.wide
+    assert plan.costs['wide'] < plan.costs['narrow']
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('inspire_sdkpy', reason='needs the SDK dependencies (cyclonedds, unitree_sdk2py, PyQt5)')
+
+from inspire_sdkpy.read_planner import ReadField, ReadPlan
+from inspire_sdkpy.register_codec import RegisterDecoder, decode_registers
+
+
+def make_decoder():
+    fields = [ReadField('angle', 1546, 6, 'short'), ReadField('status', 1612, 3, 'byte'),
+              ReadField('tip', 3000, 9, 'short', (3, 3))]
+    return RegisterDecoder(fields), fields
+
+
+def test_short_fields_are_signed_views():
+    decoder, fields = make_decoder()
+    decoder.load(1546, [1, 0xFFFF, 1000, 0x8000, 0, 2])
+    assert list(decoder.values['angle']) == [1, -1, 1000, -32768, 0, 2]
+
+
+def test_byte_fields_unpack_high_byte_first():
+    decoder, fields = make_decoder()
+    decoder.load(1612, [0x0102, 0x0304, 0x0506])
+    assert list(decoder.values['status']) == [1, 2, 3, 4, 5, 6]
+
+
+def test_matrices_are_views_of_the_register_array():
+    decoder, fields = make_decoder()
+    matrix = decoder.matrices['tip']
+    decoder.load(3000, list(range(9)))
+    assert matrix.shape == (3, 3)
+    assert matrix[2, 2] == 8
+    assert np.shares_memory(matrix, decoder.registers)
+
+
+def test_fill_keeps_failed_spans_and_marks_them_stale():
+    decoder, fields = make_decoder()
+    plan = ReadPlan(fields)
+    assert decoder.fill(plan, lambda address, count: [7] * count)
+    assert not decoder.stale
+
+    def failing(address, count):
+        return None if address == 3000 else [9] * count
+    assert not decoder.fill(plan, failing)
+    assert decoder.stale == {'tip'}
+    assert list(decoder.values['angle']) == [9] * 6
+    assert list(decoder.values['tip']) == [7] * 9
+
+
+def test_fill_into_receives_wire_bytes():
+    decoder, fields = make_decoder()
+    plan = ReadPlan([fields[0]])
+
+    def read_into(address, count, out):
+        out[:] = np.arange(count, dtype='>u2').view(np.uint8)
+        return True
+    assert decoder.fill_into(plan, read_into)
+    assert list(decoder.values['angle']) == [0, 1, 2, 3, 4, 5]
+
+
+def test_copy_is_independent():
+    decoder, fields = make_decoder()
+    decoder.load(3000, [5] * 9)
+    copy = decoder.copy()
+    decoder.load(3000, [6] * 9)
+    assert (copy['tip'] == 5).all()
+
+
+def test_decode_registers():
+    assert list(decode_registers([0xFFFE, 3])) == [-2, 3]
+    assert list(decode_registers([0x0A0B], 'byte')) == [10, 11]
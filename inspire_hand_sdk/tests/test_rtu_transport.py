@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('inspire_sdkpy', reason='needs the SDK dependencies (cyclonedds, unitree_sdk2py, PyQt5)')
+
+import serial
+
+from inspire_sdkpy.rtu_transport import RtuTransport
+from inspire_sdkpy.simulator import HandSimulator
+
+
+@pytest.fixture
+def transport():
+    sim = HandSimulator((1,), seed=0)
+    port = sim.start_rtu(115200, emulate_baudrate=False)
+    client = RtuTransport(port, 115200)
+    assert client.connect()
+    yield sim, client
+    client.close()
+    sim.stop()
+
+
+def test_reads_do_not_reconfigure_the_port(transport, monkeypatch):
+    sim, client = transport
+    calls = []
+    reconfigure = serial.Serial._reconfigure_port
+    monkeypatch.setattr(serial.Serial, '_reconfigure_port', lambda self, *args: calls.append(1) or reconfigure(self, *args))
+    out = np.zeros(12, dtype=np.uint8)
+    for count in (6, 3, 6, 1):
+        assert client.read_holding_registers_into(1546, count, 1, out[:2 * count])
+    assert not calls
+    assert list(out.view('>u2')[:6]) == sim.hands[1].read_registers(1546, 6)
+    client.set_baudrate(921600)
+    assert client.socket.timeout == client.response_timeout < RtuTransport(client.port, 115200).response_timeout
@@ -0,0 +1,93 @@
+import pytest
+
+pytest.importorskip('inspire_sdkpy', reason='needs the SDK dependencies (cyclonedds, unitree_sdk2py, PyQt5)')
+
+from inspire_sdkpy.inspire_hand_defaut import get_inspire_hand_ctrl
+from inspire_sdkpy.inspire_sdk import ModbusDataHandler
+from inspire_sdkpy import scheduler as scheduler_module
+from inspire_sdkpy.scheduler import MultiRateScheduler
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def handler(dds, simulator):
+    sim, port = simulator
+    handlers = []
+
+    def make(**kwargs):
+        handler = ModbusDataHandler(ip='127.0.0.1', port=port, initDDS=False, metrics_interval=None, transport='lean', **kwargs)
+        handlers.append(handler)
+        return handler
+
+    yield sim, make
+    for handler in handlers:
+        handler.link.close()
+        handler.client.close()
+
+
+def angle_command(value):
+    msg = get_inspire_hand_ctrl()
+    msg.angle_set = [value] * 6
+    msg.mode = 0b0001
+    return msg
+
+
+def test_combined_cycle_command_rides_on_a_state_read(handler):
+    sim, make = handler
+    hand = make(combined_cycle=True)
+    assert hand.combined_cycle
+    clock = Clock()
+    scheduler = MultiRateScheduler(hand, {'angle_act': 100}, clock=clock)
+    hand.write_registers_callback(angle_command(500))
+    assert hand._pending_writes
+    scheduler.step()
+    assert not hand._pending_writes
+    assert sim.hands[1].read_registers(1486, 6) == [500] * 6
+    assert hand.commands.stats()['commands'] == 1
+
+
+def test_combined_cycle_command_without_a_due_state_read(handler):
+    sim, make = handler
+    hand = make(combined_cycle=True)
+    clock = Clock()
+    scheduler = MultiRateScheduler(hand, {'angle_act': 1, 'palm_touch': 100}, clock=clock)
+    scheduler.step()
+    clock.now = 0.01
+    hand.write_registers_callback(angle_command(700))
+    scheduler.step()
+    assert not hand._pending_writes
+    assert sim.hands[1].read_registers(1486, 6) == [700] * 6
+
+
+def test_mailbox_commands_are_written_by_the_scheduler(handler):
+    sim, make = handler
+    hand = make(control_rate=1000, command_deadline=None)
+    scheduler = MultiRateScheduler(hand, {'angle_act': 100}, clock=Clock())
+    hand.write_registers_callback(angle_command(300))
+    hand.write_registers_callback(angle_command(400))
+    scheduler.step()
+    assert sim.hands[1].read_registers(1486, 6) == [400] * 6
+    assert hand.mailbox.stats() == {'posted': 2, 'superseded': 1, 'stale': 0, 'delivered': 1}
+
+
+def test_plan_cache_is_bounded(handler, monkeypatch):
+    sim, make = handler
+    hand = make()
+    monkeypatch.setattr(scheduler_module, 'MAX_PLANS', 4)
+    clock = Clock()
+    rates = {'angle_act': 300, 'force_act': 170, 'pos_act': 110, 'finger*_tip_touch': 70, 'palm_touch': 30}
+    scheduler = MultiRateScheduler(hand, rates, max_reads=3, clock=clock)
+    fixed = {decoder: len(decoder._targets) for decoder in scheduler.decoders.values()}
+    for step in range(300):
+        clock.now = step * 0.001
+        scheduler.step()
+    assert len(scheduler._plans) == 4
+    for decoder, before in fixed.items():
+        assert len(decoder._targets) <= before + 4
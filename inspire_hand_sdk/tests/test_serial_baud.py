@@ -0,0 +1,77 @@
+import pytest
+
+pytest.importorskip('inspire_sdkpy', reason='needs the SDK dependencies (cyclonedds, unitree_sdk2py, PyQt5)')
+
+from pymodbus.client import ModbusSerialClient
+
+from inspire_sdkpy.serial_baud import REDU_RATIO, BAUD_INDEX, host_baudrate, responds, set_host_baudrate, switch_baudrate
+from inspire_sdkpy.simulator import HandSimulator
+
+
+@pytest.fixture
+def bus():
+    """(simulator, connected pymodbus client) on an RTU bus with hand 1 at 115200 baud."""
+    sim = HandSimulator((1,), seed=0)
+    port = sim.start_rtu(115200)
+    client = ModbusSerialClient(method='rtu', port=port, baudrate=115200, timeout=0.2)
+    assert client.connect()
+    yield sim, client
+    client.close()
+    sim.stop()
+
+
+def test_host_timing_follows_the_rate(bus):
+    sim, client = bus
+    set_host_baudrate(client, 19200)
+    reference = ModbusSerialClient(method='rtu', port='unused', baudrate=19200)
+    for name in ('_t0', '_recv_interval', 'silent_interval', 'inter_byte_timeout'):
+        assert getattr(client, name) == pytest.approx(getattr(reference, name))
+    set_host_baudrate(client, 921600)
+    assert client._recv_interval == 0.001
+    assert client.socket.baudrate == 921600
+
+
+def test_failed_hand_takes_the_bus_back_to_the_old_rate(bus):
+    sim, client = bus
+    assert switch_baudrate(client, 1, 921600, persist=False)
+    assert sim.hands[1].read_registers(REDU_RATIO, 1) == [BAUD_INDEX[921600]]
+    # hand 2 is not on the bus: hand 1 has to follow the host back
+    assert not switch_baudrate(client, 2, 921600, current=115200, persist=False, verify_reads=1)
+    assert host_baudrate(client) == 115200
+    assert sim.hands[1].read_registers(REDU_RATIO, 1) == [BAUD_INDEX[115200]]
+    assert responds(client, 1)
+
+
+def test_revert_saves_the_old_rate_on_hands_that_saved_the_new_one(bus):
+    sim, client = bus
+    assert switch_baudrate(client, 1, 921600, persist=True)
+    assert sim.hands[1].saves == 1
+    assert not switch_baudrate(client, 2, 921600, current=115200, persist=True, verify_reads=1)
+    assert sim.hands[1].read_registers(REDU_RATIO, 1) == [BAUD_INDEX[115200]]
+    assert sim.hands[1].saves == 2
+
+
+def test_double_follows_the_bus_back(dds):
+    from inspire_sdkpy.inspire_sdk_double import ModbusDataHandlerDouble
+    sim = HandSimulator((1, 2), seed=0)
+    right = sim.hands[2]
+    write_registers = right.write_registers
+
+    def stuck(address, values):
+        write_registers(address, values)
+        right._set(REDU_RATIO, [BAUD_INDEX[115200]])
+
+    # hand 2 ignores the switch: both hands end up back at 115200, without touch
+    right.write_registers = stuck
+    port = sim.start_rtu(115200)
+    try:
+        double = ModbusDataHandlerDouble(use_serial=True, serial_port=port, baudrate=115200, high_baudrate=921600, persist_baudrate=False,
+                                         initDDS=False, metrics_interval=None, transport='lean')
+        try:
+            assert [hand.baudrate for hand in double.hands] == [115200, 115200]
+            assert not any(hand.read_touch for hand in double.hands)
+            assert not double.read()[0]['touch']
+        finally:
+            double.close()
+    finally:
+        sim.stop()
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('inspire_sdkpy', reason='needs the SDK dependencies (cyclonedds, unitree_sdk2py, PyQt5)')
+
+from inspire_sdkpy.inspire_hand_defaut import data_sheet
+from inspire_sdkpy.touch_baseline import TouchBaseline
+from inspire_sdkpy.touch_frame import TouchLayout
+
+TIPS = [region for region in data_sheet if region[4].endswith('_tip_touch')]
+
+
+def make_baseline(data, **kwargs):
+    layout = TouchLayout(data)
+    raw = np.zeros(layout.size, dtype='>i2')
+    out = np.zeros(layout.size, dtype='>i2')
+    return TouchBaseline(raw, out, layout, **kwargs), raw, out, layout
+
+
+@pytest.mark.parametrize('data', [data_sheet, TIPS], ids=['full', 'tips'])
+def test_first_frame_becomes_the_baseline(data):
+    baseline, raw, out, layout = make_baseline(data)
+    raw[layout.taxels] = 100
+    baseline.update(now=0.0)
+    assert not out.any()
+    raw[layout.taxels] = 103
+    baseline.update(now=0.1)
+    assert (out[layout.taxels] == 3).all()
+
+
+def test_subset_sheet_freezes_only_regions_in_contact():
+    baseline, raw, out, layout = make_baseline(TIPS, time_constant=1.0, threshold=20)
+    baseline.update(now=0.0)
+    pressed, released = layout.vars[2], layout.vars[3]
+    layout.region(raw, pressed)[1, 1] = 500
+    layout.region(raw, released)[...] = 10
+    for step in range(1, 50):
+        baseline.update(now=step * 0.1)
+    assert list(np.flatnonzero(baseline.contact)) == [2]
+    assert layout.region(out, pressed)[1, 1] == 500
+    assert abs(layout.region(out, released)).max() <= 1
+    # the gaps between the tips are never written
+    gaps = np.ones(layout.size, dtype=bool)
+    gaps[layout.taxels] = False
+    assert not out[gaps].any()
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('inspire_sdkpy', reason='needs the SDK dependencies (cyclonedds, unitree_sdk2py, PyQt5)')
+
+from inspire_sdkpy.inspire_hand_defaut import data_sheet
+from inspire_sdkpy.touch_events import DEFAULT_ON, TouchEventDetector
+from inspire_sdkpy.touch_frame import TouchLayout
+
+
+def make_detector(data=data_sheet, **kwargs):
+    layout = TouchLayout(data)
+    frame = np.zeros(layout.size, dtype='>i2')
+    return TouchEventDetector(frame, layout, clock=lambda: 0.0, **kwargs), frame, layout
+
+
+def test_unlisted_regions_use_the_default_threshold():
+    detector, frame, layout = make_detector(on={'palm_touch': 80})
+    assert detector.on[layout.vars.index('palm_touch')] == 80
+    assert (np.delete(detector.on, layout.vars.index('palm_touch')) == DEFAULT_ON).all()
+    assert (detector.off < detector.on).all()
+
+
+def test_hysteresis_and_spike():
+    detector, frame, layout = make_detector(on=30, off=10, spike=100)
+    tip = layout.region(frame, layout.vars[0])
+    assert detector.update() is None
+    tip[1, 1] = 50
+    message = detector.update()
+    assert list(zip(message.region, message.event)) == [(layout.vars[0], 'touch_on')]
+    tip[1, 1] = 20
+    assert detector.update() is None
+    tip[1, 1] = 300
+    message = detector.update()
+    assert list(zip(message.region, message.event, message.peak)) == [(layout.vars[0], 'pressure_spike', 300)]
+    tip[1, 1] = 5
+    message = detector.update()
+    assert list(zip(message.region, message.event)) == [(layout.vars[0], 'touch_off')]
+
+
+def test_subset_sheet():
+    tips = [region for region in data_sheet if region[4].endswith('_tip_touch')]
+    detector, frame, layout = make_detector(tips)
+    layout.region(frame, layout.vars[4])[2, 0] = 40
+    message = detector.update()
+    assert message.region == [layout.vars[4]]
+    assert message.peak == [40]
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('inspire_sdkpy', reason='needs the SDK dependencies (cyclonedds, unitree_sdk2py, PyQt5)')
+
+from inspire_sdkpy.inspire_hand_defaut import data_sheet
+from inspire_sdkpy.touch_features import TouchFeatures
+from inspire_sdkpy.touch_frame import TouchLayout
+
+TIPS = [region for region in data_sheet if region[4].endswith('_tip_touch')]
+
+
+def test_full_sheet_is_contiguous():
+    layout = TouchLayout()
+    assert layout.contiguous
+    assert layout.size == layout.count == 1062
+    assert list(layout.starts) == list(layout.offsets)
+
+
+def test_subset_sheet_indexes_the_region_taxels():
+    layout = TouchLayout(TIPS)
+    assert not layout.contiguous
+    assert layout.count == 45
+    assert layout.size > layout.count
+    frame = np.zeros(layout.size, dtype='>i2')
+    for i, var in enumerate(layout.vars):
+        layout.region(frame, var)[...] = i + 1
+    packed = layout.pack(frame, layout.new_packed())
+    assert list(packed) == list(layout.per_taxel(np.arange(1, 6)))
+    assert list(layout.reduce(np.maximum, frame)) == [1, 2, 3, 4, 5]
+
+
+def test_features_of_a_subset_sheet():
+    layout = TouchLayout(TIPS)
+    frame = np.zeros(layout.size, dtype='>i2')
+    features = TouchFeatures(frame, layout, threshold=5)
+    tip = layout.region(frame, layout.vars[1])
+    tip[0, 2] = 10
+    tip[2, 2] = 30
+    features.update()
+    assert features.region(layout.vars[1]) == {
+        'total': 40.0, 'peak': 30, 'area': 2, 'centroid': (1.5, 2.0), 'contact': True}
+    assert not features.contact[[0, 2, 3, 4]].any()
+    assert np.isnan(features.centroid_row[0])
+
+
+def test_subset_sheet_publishes_the_packed_taxels(dds, simulator):
+    from inspire_sdkpy.inspire_sdk import ModbusDataHandler
+    sim, port = simulator
+    hand = ModbusDataHandler(data=TIPS, ip='127.0.0.1', port=port, initDDS=False, metrics_interval=None, transport='lean', touch_format='frame')
+    try:
+        result = hand.read()
+    finally:
+        hand.link.close()
+        hand.client.close()
+    sent = hand.frame_pub.last.data
+    assert len(sent) == 45
+    layout = TouchLayout(TIPS)
+    frame = layout.frame_from(sent)
+    for var in layout.vars:
+        assert (layout.region(frame, var) == result['touch'][var]).all()
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('inspire_sdkpy', reason='needs the SDK dependencies (cyclonedds, unitree_sdk2py, PyQt5)')
+
+from inspire_sdkpy.inspire_hand_defaut import data_sheet
+from inspire_sdkpy.touch_filter import TouchChangeFilter
+from inspire_sdkpy.touch_frame import TouchLayout
+
+TIPS = [region for region in data_sheet if region[4].endswith('_tip_touch')]
+
+
+def make_filter(data, **kwargs):
+    layout = TouchLayout(data)
+    frame = np.zeros(layout.size, dtype='>i2')
+    return TouchChangeFilter(frame, layout, clock=lambda: 0.0, **kwargs), frame, layout
+
+
+def test_region_threshold():
+    touch_filter, frame, layout = make_filter(data_sheet, threshold={'palm_touch': 50}, keyframe_interval=None)
+    assert touch_filter.update()
+    layout.region(frame, 'palm_touch')[0, 0] = 40
+    assert not touch_filter.update()
+    layout.region(frame, 'palm_touch')[0, 0] = 60
+    assert touch_filter.update()
+    assert touch_filter.region_changes['palm_touch'] == 1
+
+
+def test_subset_sheet_ignores_the_gaps():
+    touch_filter, frame, layout = make_filter(TIPS, threshold=5, keyframe_interval=None)
+    assert touch_filter.update()
+    gaps = np.ones(layout.size, dtype=bool)
+    gaps[layout.taxels] = False
+    frame[gaps] = 1000
+    assert not touch_filter.update()
+    layout.region(frame, layout.vars[1])[0, 0] = 10
+    assert touch_filter.update()
+    assert [var for var, count in touch_filter.region_changes.items() if count] == [layout.vars[1]]